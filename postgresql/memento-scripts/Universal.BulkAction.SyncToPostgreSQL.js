@@ -2,7 +2,7 @@
  * UNIVERZÁLNY Bulk Action: Sync knižnice do PostgreSQL
  *
  * Typ:         Bulk Action (UNIVERSAL - funguje pre VŠETKY knižnice!)
- * Verzia:      4.0
+ * Verzia:      4.3
  *
  * POUŽITIE:
  * 1. Skopíruj tento script do KAŽDEJ knižnice ktorú chceš syncovať
@@ -19,6 +19,10 @@
  * - Debug logging s limitom (50KB)
  *
  * CHANGELOG:
+ * v4.3 - BATCH SYNC!
+ *      - Záznamy sa posielajú po dávkach na /api/memento/sync/batch
+ *      - Jedna transakcia na dávku namiesto jedného requestu na záznam
+ *      - Server vracia výsledok pre každý záznam (chyby sa stále logujú)
  * v4.2 - SPRÁVNA OPRAVA!
  *      - lib().title a lib().id sú PROPERTIES (BEZ zátvoriek!)
  *      - Opravená detekcia library názvu a ID
@@ -37,7 +41,7 @@
     // ======================================
     // KONFIGURÁCIA (AUTOMATICKÁ!)
     // ======================================
-    var SCRIPT_VERSION = '4.2';
+    var SCRIPT_VERSION = '4.3';
 
     // AUTOMATICKY ZISTI KNIŽNICU
     var currentLibrary = lib();
@@ -52,6 +56,7 @@
         libraryId: libraryId,
         libraryName: libraryName,
 
+        batchSize: 100,     // Počet záznamov v jednom requeste (max 500 na serveri)
         batchDelay: 100,
         showProgress: true,
         continueOnError: true
@@ -213,21 +218,37 @@
     }
 
     // ======================================
-    // SYNC ENTRY
+    // SYNC BATCH
     // ======================================
 
-    function syncEntry(e) {
-        try {
-            var entryData = extractEntryData(e);
+    function syncBatch(batchEntries) {
+        var results = [];
+        var payloadEntries = [];
+
+        for (var k = 0; k < batchEntries.length; k++) {
+            try {
+                payloadEntries.push(extractEntryData(batchEntries[k]));
+            } catch (err) {
+                results.push({
+                    success: false,
+                    entryId: batchEntries[k].id,
+                    error: err.toString()
+                });
+            }
+        }
 
-            // UNIVERSAL ROUTE: uses library name, server maps to correct table
-            var url = CONFIG.apiUrl + '/api/memento/sync';
+        if (payloadEntries.length === 0) {
+            return results;
+        }
+
+        try {
+            // UNIVERSAL BATCH ROUTE: uses library name, server maps to correct table
+            var url = CONFIG.apiUrl + '/api/memento/sync/batch';
 
-            // Add library metadata
             var payload = {
                 library_id: CONFIG.libraryId,
                 library_name: CONFIG.libraryName,
-                entry: entryData
+                entries: payloadEntries
             };
 
             var httpClient = http();
@@ -239,24 +260,38 @@
             var result = httpClient.post(url, JSON.stringify(payload));
 
             if (result && (result.code === 200 || result.code === 201)) {
-                return { success: true, entryId: e.id };
+                var body = JSON.parse(result.body);
+                for (var m = 0; m < body.results.length; m++) {
+                    var r = body.results[m];
+                    results.push({
+                        success: r.success,
+                        entryId: r.entry_id,
+                        error: r.error
+                    });
+                }
             } else {
-                addLog('❌ Sync failed: ' + result.code + ' - ' + result.body);
-                return {
-                    success: false,
-                    entryId: e.id,
-                    error: 'HTTP ' + result.code,
-                    details: result.body
-                };
+                addLog('❌ Batch sync failed: ' + result.code + ' - ' + result.body);
+                for (var n = 0; n < payloadEntries.length; n++) {
+                    results.push({
+                        success: false,
+                        entryId: payloadEntries[n].id,
+                        error: 'HTTP ' + result.code,
+                        details: result.body
+                    });
+                }
             }
         } catch (err) {
-            addLog('❌ Sync exception: ' + err.toString());
-            return {
-                success: false,
-                entryId: e.id,
-                error: err.toString()
-            };
+            addLog('❌ Batch sync exception: ' + err.toString());
+            for (var q = 0; q < payloadEntries.length; q++) {
+                results.push({
+                    success: false,
+                    entryId: payloadEntries[q].id,
+                    error: err.toString()
+                });
+            }
         }
+
+        return results;
     }
 
     // ======================================
@@ -296,32 +331,40 @@
 
     var startTime = new Date();
 
-    for (var i = 0; i < totalEntries; i++) {
-        var e = allEntries[i];
+    var stopSync = false;
 
-        // Progress every 50 records
-        if (totalEntries >= 50) {
-            if (i % 50 === 0 || i === totalEntries - 1) {
-                message('🔄 ' + (i + 1) + '/' + totalEntries + ' - ✅ ' + stats.success + ' ❌ ' + stats.failed);
-            }
+    for (var i = 0; i < totalEntries && !stopSync; i += CONFIG.batchSize) {
+        var batchEnd = Math.min(i + CONFIG.batchSize, totalEntries);
+        var batchEntries = [];
+        for (var b = i; b < batchEnd; b++) {
+            batchEntries.push(allEntries[b]);
         }
 
-        var result = syncEntry(e);
+        var batchResults = syncBatch(batchEntries);
 
-        if (result.success) {
-            stats.success++;
-        } else {
-            stats.failed++;
-            stats.errors.push(result);
-            addLog('❌ ' + e.id + ': ' + result.error);
+        for (var c = 0; c < batchResults.length; c++) {
+            var result = batchResults[c];
 
-            if (!CONFIG.continueOnError) {
-                break;
+            if (result.success) {
+                stats.success++;
+            } else {
+                stats.failed++;
+                stats.errors.push(result);
+                addLog('❌ ' + result.entryId + ': ' + result.error);
+
+                if (!CONFIG.continueOnError) {
+                    stopSync = true;
+                }
             }
         }
 
+        // Progress after every batch
+        if (CONFIG.showProgress && totalEntries > CONFIG.batchSize) {
+            message('🔄 ' + batchEnd + '/' + totalEntries + ' - ✅ ' + stats.success + ' ❌ ' + stats.failed);
+        }
+
         // Delay between requests
-        if (CONFIG.batchDelay > 0 && i < totalEntries - 1) {
+        if (CONFIG.batchDelay > 0 && batchEnd < totalEntries) {
             var start = new Date().getTime();
             while (new Date().getTime() < start + CONFIG.batchDelay) {}
         }
@@ -0,0 +1,216 @@
+-- ==================================================
+-- Incremental entry counters for memento_sync_metadata
+-- ==================================================
+-- Keeps memento_sync_metadata.entry_count (active entries per table) up to
+-- date from statement-level triggers instead of running
+-- SELECT COUNT(*) ... WHERE status = 'active' after every synced entry.
+--
+-- Deltas are computed from transition tables, so a multi-row statement
+-- (batch sync) touches the metadata row once, and statements that do not
+-- change the number of active rows do not touch it at all.
+--
+-- The triggers go on every entry table (the tables with the
+-- MementoBaseMixin columns), whether it has been synced yet or not; a table
+-- created later gets them when its first memento_sync_metadata row is
+-- inserted.
+--
+-- memento_reconcile_entry_counts() recomputes exact counts and fixes drift.
+-- The sync API runs it periodically (ENTRY_COUNT_RECONCILE_INTERVAL).
+--
+-- Requires PostgreSQL 10+ (transition tables). Safe to re-run.
+-- ==================================================
+
+\c memento_mirror
+
+-- ==================================================
+-- 1. TRIGGER FUNCTIONS
+-- ==================================================
+
+CREATE OR REPLACE FUNCTION memento_count_entries_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    delta INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO delta FROM new_rows WHERE status = 'active';
+
+    IF delta <> 0 THEN
+        UPDATE memento_sync_metadata
+        SET entry_count = COALESCE(entry_count, 0) + delta
+        WHERE table_name = TG_TABLE_NAME;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION memento_count_entries_update()
+RETURNS TRIGGER AS $$
+DECLARE
+    delta INTEGER;
+BEGIN
+    -- Status flips only: active -> deleted = -1, deleted -> active = +1
+    SELECT
+        (SELECT COUNT(*) FROM new_rows WHERE status = 'active')
+        - (SELECT COUNT(*) FROM old_rows WHERE status = 'active')
+    INTO delta;
+
+    IF delta <> 0 THEN
+        UPDATE memento_sync_metadata
+        SET entry_count = COALESCE(entry_count, 0) + delta
+        WHERE table_name = TG_TABLE_NAME;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION memento_count_entries_delete()
+RETURNS TRIGGER AS $$
+DECLARE
+    delta INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO delta FROM old_rows WHERE status = 'active';
+
+    IF delta <> 0 THEN
+        UPDATE memento_sync_metadata
+        SET entry_count = COALESCE(entry_count, 0) - delta
+        WHERE table_name = TG_TABLE_NAME;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ==================================================
+-- 2. RECONCILIATION
+-- ==================================================
+
+-- Recompute exact counts; returns only the tables that had drifted
+CREATE OR REPLACE FUNCTION memento_reconcile_entry_counts()
+RETURNS TABLE (drift_table VARCHAR, stored_count INTEGER, actual_count INTEGER) AS $$
+DECLARE
+    r RECORD;
+    stored INTEGER;
+    actual INTEGER;
+BEGIN
+    FOR r IN
+        SELECT DISTINCT m.table_name
+        FROM memento_sync_metadata m
+        WHERE to_regclass(m.table_name) IS NOT NULL
+        ORDER BY m.table_name
+    LOOP
+        -- Lock first: writers that already applied a delta are waited for,
+        -- writers that have not yet applied one will apply it after us
+        SELECT m.entry_count INTO stored
+        FROM memento_sync_metadata m
+        WHERE m.table_name = r.table_name
+        LIMIT 1
+        FOR UPDATE;
+
+        EXECUTE format('SELECT COUNT(*) FROM %I WHERE status = ''active''', r.table_name)
+        INTO actual;
+
+        IF stored IS DISTINCT FROM actual THEN
+            UPDATE memento_sync_metadata m
+            SET entry_count = actual
+            WHERE m.table_name = r.table_name;
+
+            drift_table := r.table_name;
+            stored_count := stored;
+            actual_count := actual;
+            RETURN NEXT;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ==================================================
+-- 3. APPLY TRIGGERS TO ALL SYNCED TABLES
+-- ==================================================
+
+-- Install (or re-install) the counter triggers on one table
+CREATE OR REPLACE FUNCTION memento_install_entry_counters(p_table TEXT)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_count_ins_%s ON %I', p_table, p_table);
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_count_upd_%s ON %I', p_table, p_table);
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_count_del_%s ON %I', p_table, p_table);
+
+    EXECUTE format(
+        'CREATE TRIGGER trg_count_ins_%s AFTER INSERT ON %I '
+        'REFERENCING NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION memento_count_entries_insert()',
+        p_table, p_table
+    );
+    EXECUTE format(
+        'CREATE TRIGGER trg_count_upd_%s AFTER UPDATE ON %I '
+        'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION memento_count_entries_update()',
+        p_table, p_table
+    );
+    EXECUTE format(
+        'CREATE TRIGGER trg_count_del_%s AFTER DELETE ON %I '
+        'REFERENCING OLD TABLE AS old_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION memento_count_entries_delete()',
+        p_table, p_table
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tables first synced after this migration (created after it, or not
+-- matched below): install the triggers with their first metadata row
+CREATE OR REPLACE FUNCTION memento_sync_metadata_install_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF to_regclass(NEW.table_name) IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = to_regclass(NEW.table_name)
+          AND tgname = 'trg_count_ins_' || NEW.table_name
+    ) THEN
+        PERFORM memento_install_entry_counters(NEW.table_name);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sync_metadata_install_counters ON memento_sync_metadata;
+CREATE TRIGGER trg_sync_metadata_install_counters
+    AFTER INSERT ON memento_sync_metadata
+    FOR EACH ROW EXECUTE FUNCTION memento_sync_metadata_install_counters();
+
+-- Every entry table (models.TABLE_TO_MODEL), synced yet or not: the tables
+-- with the MementoBaseMixin columns. Counts of tables without a metadata
+-- row are taken when the row is created (memento_to_pg._update_metadata).
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT c.table_name
+        FROM information_schema.columns c
+        JOIN information_schema.tables t
+          ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+        WHERE c.table_schema = current_schema()
+          AND t.table_type = 'BASE TABLE'
+          AND c.column_name IN ('status', 'memento_modified_time', 'sync_source')
+        GROUP BY c.table_name
+        HAVING COUNT(*) = 3
+        UNION
+        SELECT DISTINCT table_name
+        FROM memento_sync_metadata
+        WHERE to_regclass(table_name) IS NOT NULL
+        ORDER BY 1
+    LOOP
+        PERFORM memento_install_entry_counters(r.table_name);
+        RAISE NOTICE 'Entry counter triggers installed on %', r.table_name;
+    END LOOP;
+END $$;
+
+-- Initialize counts
+SELECT * FROM memento_reconcile_entry_counts();
+
+-- Verify
+SELECT table_name, entry_count
+FROM memento_sync_metadata
+ORDER BY table_name;
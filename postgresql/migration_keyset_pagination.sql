@@ -0,0 +1,21 @@
+-- ==================================================
+-- Indexes for keyset pagination of logs and conflicts
+-- ==================================================
+-- GET /api/memento/logs and /api/memento/conflicts page newest first by
+-- (sync_time, id) / (conflict_time, id) with opaque cursors
+-- (sync-api/pagination.py) instead of LIMIT/OFFSET. These indexes serve
+-- the order and the `(time, id) < (cursor)` condition with one range scan
+-- per page, however deep.
+--
+-- On the partitioned memento_sync_log (migration_sync_log_partitions.sql)
+-- the index is created on every partition. Safe to re-run.
+-- ==================================================
+
+\c memento_mirror
+
+CREATE INDEX IF NOT EXISTS idx_sync_log_time_id ON memento_sync_log(sync_time DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_conflicts_time_id ON memento_sync_conflicts(conflict_time DESC, id DESC);
+
+-- Verify
+SELECT indexname, tablename FROM pg_indexes
+WHERE indexname IN ('idx_sync_log_time_id', 'idx_conflicts_time_id');
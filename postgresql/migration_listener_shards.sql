@@ -0,0 +1,36 @@
+-- ==================================================
+-- Shard leases for several pg_listener.py processes
+-- ==================================================
+-- With LISTENER_SHARDS > 0 every outbox / retry row belongs to one hash
+-- bucket (shard) of its entry:
+--
+--     (hashtext(table_name || ':' || entry_id) & 2147483647) % LISTENER_SHARDS
+--
+-- A listener only claims rows of shards it holds a lease on, so changes of
+-- one entry are never processed by two listeners at once.
+--
+-- Listeners heartbeat in memento_listener_instances and rebalance the
+-- shards between the live ones (see sync-api/listener_shards.py). Shard
+-- rows are created by the listeners; all of them must use the same
+-- LISTENER_SHARDS.
+--
+-- Requires migration_sync_outbox.sql. Safe to re-run.
+-- ==================================================
+
+\c memento_mirror
+
+CREATE TABLE IF NOT EXISTS memento_listener_instances (
+    listener_id VARCHAR(255) PRIMARY KEY,    -- host:pid
+    started_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    heartbeat_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS memento_listener_shards (
+    shard INTEGER PRIMARY KEY,
+    owner VARCHAR(255),                      -- listener_id; NULL = free
+    lease_until TIMESTAMP,
+    assigned_at TIMESTAMP
+);
+
+-- Verify
+SELECT shard, owner, lease_until FROM memento_listener_shards ORDER BY shard;
@@ -0,0 +1,88 @@
+-- ==================================================
+-- Shared token buckets for the Memento API rate limit
+-- ==================================================
+-- The Memento API allows MEMENTO_RATE_LIMIT requests per minute per API
+-- key. Every process that calls it (pg_listener.py, the sync API, CLI
+-- scripts) takes tokens from the same buckets stored here, so bursts
+-- from several processes together stay within the limit.
+--
+-- memento_take_tokens() takes one token from every given bucket (e.g. the
+-- global bucket and a per-library bucket) atomically: either all buckets
+-- have a token and all are decremented, or nothing is taken and the
+-- function returns the seconds to wait before trying again.
+--
+-- Used by sync-api/rate_limiter.py (MEMENTO_RATE_LIMIT_BACKEND=postgres).
+-- Safe to re-run.
+-- ==================================================
+
+\c memento_mirror
+
+-- ==================================================
+-- 1. BUCKET TABLE
+-- ==================================================
+
+CREATE TABLE IF NOT EXISTS memento_rate_limit_buckets (
+    bucket VARCHAR(255) PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+-- ==================================================
+-- 2. TAKE TOKENS
+-- ==================================================
+
+-- Returns 0 when a token was taken from every bucket, otherwise the
+-- seconds until all buckets will have a token (nothing is taken)
+CREATE OR REPLACE FUNCTION memento_take_tokens(
+    p_buckets VARCHAR[],
+    p_rates DOUBLE PRECISION[],        -- tokens per second, per bucket
+    p_capacities DOUBLE PRECISION[]    -- burst capacity, per bucket
+)
+RETURNS DOUBLE PRECISION AS $$
+DECLARE
+    v_now TIMESTAMPTZ := clock_timestamp();
+    v_tokens DOUBLE PRECISION[] := '{}';
+    v_wait DOUBLE PRECISION := 0;
+    v_current DOUBLE PRECISION;
+    v_updated TIMESTAMPTZ;
+    i INTEGER;
+BEGIN
+    -- Create missing buckets full
+    INSERT INTO memento_rate_limit_buckets (bucket, tokens, updated_at)
+    SELECT b.bucket, b.capacity, v_now
+    FROM unnest(p_buckets, p_capacities) AS b(bucket, capacity)
+    ON CONFLICT (bucket) DO NOTHING;
+
+    -- Lock in a fixed order (callers pass buckets sorted) to avoid deadlocks
+    FOR i IN 1 .. array_length(p_buckets, 1) LOOP
+        SELECT tokens, updated_at INTO v_current, v_updated
+        FROM memento_rate_limit_buckets
+        WHERE bucket = p_buckets[i]
+        FOR UPDATE;
+
+        -- Refill since the last update, capped at capacity
+        v_current := LEAST(
+            p_capacities[i],
+            v_current + GREATEST(EXTRACT(EPOCH FROM (v_now - v_updated)), 0) * p_rates[i]
+        );
+        v_tokens := v_tokens || v_current;
+
+        IF v_current < 1 THEN
+            v_wait := GREATEST(v_wait, (1 - v_current) / p_rates[i]);
+        END IF;
+    END LOOP;
+
+    FOR i IN 1 .. array_length(p_buckets, 1) LOOP
+        UPDATE memento_rate_limit_buckets
+        SET tokens = CASE WHEN v_wait = 0 THEN v_tokens[i] - 1 ELSE v_tokens[i] END,
+            updated_at = v_now
+        WHERE bucket = p_buckets[i];
+    END LOOP;
+
+    RETURN v_wait;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Verify
+SELECT memento_take_tokens(ARRAY['migration-test']::VARCHAR[], ARRAY[1.0]::DOUBLE PRECISION[], ARRAY[1.0]::DOUBLE PRECISION[]) AS wait_seconds;
+DELETE FROM memento_rate_limit_buckets WHERE bucket = 'migration-test';
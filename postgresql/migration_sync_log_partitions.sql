@@ -0,0 +1,191 @@
+-- ==================================================
+-- Monthly partitions and retention for memento_sync_log
+-- ==================================================
+-- memento_sync_log grew by one row per synced entry without any cleanup,
+-- and /api/memento/logs and /stats filter on sync_time over the whole
+-- table.
+--
+-- This converts it to a table range-partitioned by month on sync_time:
+--
+--     memento_sync_log_2026_10    [2026-10-01, 2026-11-01)
+--     memento_sync_log_default    rows outside all monthly partitions
+--
+-- memento_sync_log_maintain(months_ahead, retention_days) creates the
+-- partitions of the current and the next months_ahead months and drops
+-- monthly partitions whose rows are all older than retention_days - one
+-- DROP TABLE instead of a DELETE and the vacuum after it. The sync API runs
+-- it at startup and every SYNC_LOG_PARTITION_INTERVAL seconds
+-- (sync-api/sync_log_partitions.py).
+--
+-- Existing data: the old table is renamed, a partition is created for
+-- every month it has rows of, the rows are copied over and the old table
+-- is dropped - all in one transaction. The id sequence is kept, so ids
+-- continue. The primary key becomes (id, sync_time), as partitioned tables
+-- require the partition key in it.
+--
+-- Requires PostgreSQL 11+. Safe to re-run.
+-- ==================================================
+
+\c memento_mirror
+
+-- ==================================================
+-- 1. PARTITION MAINTENANCE
+-- ==================================================
+
+-- Create the monthly partition containing p_month (FALSE if it exists).
+-- Rows of that month already in the default partition are moved into it.
+CREATE OR REPLACE FUNCTION memento_sync_log_create_partition(p_month DATE)
+RETURNS BOOLEAN AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::date;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    partition_name TEXT := 'memento_sync_log_' || to_char(p_month, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE memento_sync_log INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+
+    IF to_regclass('memento_sync_log_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (
+                 DELETE FROM memento_sync_log_default
+                 WHERE sync_time >= %L AND sync_time < %L
+                 RETURNING *
+             )
+             INSERT INTO %I SELECT * FROM moved',
+            month_start, month_end, partition_name
+        );
+    END IF;
+
+    EXECUTE format(
+        'ALTER TABLE memento_sync_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_end
+    );
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create partitions up to p_months_ahead months ahead and drop monthly
+-- partitions entirely older than p_retention_days (0 = keep everything)
+CREATE OR REPLACE FUNCTION memento_sync_log_maintain(
+    p_months_ahead INTEGER DEFAULT 2,
+    p_retention_days INTEGER DEFAULT 0
+)
+RETURNS TABLE (action TEXT, partition_name TEXT) AS $$
+DECLARE
+    month_start DATE;
+    cutoff TIMESTAMP;
+    part RECORD;
+BEGIN
+    FOR i IN 0..GREATEST(p_months_ahead, 0) LOOP
+        month_start := (date_trunc('month', NOW()) + make_interval(months => i))::date;
+
+        IF memento_sync_log_create_partition(month_start) THEN
+            action := 'created';
+            partition_name := 'memento_sync_log_' || to_char(month_start, 'YYYY_MM');
+            RETURN NEXT;
+        END IF;
+    END LOOP;
+
+    IF p_retention_days > 0 THEN
+        cutoff := NOW() - make_interval(days => p_retention_days);
+
+        FOR part IN
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'memento_sync_log'::regclass
+              AND c.relname ~ '^memento_sync_log_[0-9]{4}_[0-9]{2}$'
+            ORDER BY c.relname
+        LOOP
+            -- Upper bound of a partition = first day of the following month
+            IF to_date(right(part.relname, 7), 'YYYY_MM') + INTERVAL '1 month' <= cutoff THEN
+                EXECUTE format('DROP TABLE %I', part.relname);
+                action := 'dropped';
+                partition_name := part.relname;
+                RETURN NEXT;
+            END IF;
+        END LOOP;
+
+        -- Stray rows outside the monthly partitions
+        DELETE FROM memento_sync_log_default WHERE sync_time < cutoff;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ==================================================
+-- 2. CONVERT EXISTING TABLE
+-- ==================================================
+
+DO $$
+DECLARE
+    id_sequence TEXT;
+    month_start DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'memento_sync_log'::regclass) = 'p' THEN
+        RAISE NOTICE 'memento_sync_log is already partitioned';
+        RETURN;
+    END IF;
+
+    ALTER TABLE memento_sync_log RENAME TO memento_sync_log_old;
+    ALTER TABLE memento_sync_log_old DROP CONSTRAINT IF EXISTS memento_sync_log_pkey;
+    DROP INDEX IF EXISTS idx_sync_log_entry, idx_sync_log_time, idx_sync_log_errors;
+
+    UPDATE memento_sync_log_old SET sync_time = NOW() WHERE sync_time IS NULL;
+
+    CREATE TABLE memento_sync_log (LIKE memento_sync_log_old INCLUDING DEFAULTS)
+        PARTITION BY RANGE (sync_time);
+    ALTER TABLE memento_sync_log ALTER COLUMN sync_time SET NOT NULL;
+    ALTER TABLE memento_sync_log ADD PRIMARY KEY (id, sync_time);
+
+    -- Keep the id sequence (it would be dropped with the old table)
+    id_sequence := pg_get_serial_sequence('memento_sync_log_old', 'id');
+    IF id_sequence IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY memento_sync_log.id', id_sequence);
+    END IF;
+
+    CREATE TABLE memento_sync_log_default PARTITION OF memento_sync_log DEFAULT;
+
+    -- One partition per month with data, up to the current one
+    SELECT date_trunc('month', COALESCE(MIN(sync_time), NOW()))::date
+    INTO month_start
+    FROM memento_sync_log_old;
+
+    WHILE month_start <= date_trunc('month', NOW()) LOOP
+        PERFORM memento_sync_log_create_partition(month_start);
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+
+    INSERT INTO memento_sync_log SELECT * FROM memento_sync_log_old;
+    DROP TABLE memento_sync_log_old;
+
+    RAISE NOTICE 'memento_sync_log converted to monthly partitions';
+END;
+$$;
+
+-- ==================================================
+-- 3. INDEXES (created on every partition)
+-- ==================================================
+
+CREATE INDEX IF NOT EXISTS idx_sync_log_entry ON memento_sync_log(library_id, entry_id);
+CREATE INDEX IF NOT EXISTS idx_sync_log_time ON memento_sync_log(sync_time DESC);
+CREATE INDEX IF NOT EXISTS idx_sync_log_errors ON memento_sync_log(success) WHERE success = false;
+
+-- ==================================================
+-- 4. UPCOMING PARTITIONS
+-- ==================================================
+
+SELECT * FROM memento_sync_log_maintain(2, 0);
+
+-- Verify
+SELECT c.relname AS partition, pg_get_expr(c.relpartbound, c.oid) AS bounds
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'memento_sync_log'::regclass
+ORDER BY c.relname;
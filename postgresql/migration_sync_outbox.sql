@@ -0,0 +1,111 @@
+-- ==================================================
+-- Durable outbox for PostgreSQL → Memento sync
+-- ==================================================
+-- notify_memento_change() used to send the change itself via pg_notify,
+-- which is fire-and-forget: changes made while pg_listener.py was
+-- disconnected or restarting were lost.
+--
+-- Now every change is written to memento_sync_outbox in the same
+-- transaction as the data change, and NOTIFY is only a wake-up signal
+-- (identical payloads are collapsed to one notification per transaction).
+--
+-- pg_listener.py claims rows in batches with FOR UPDATE SKIP LOCKED and a
+-- lease (locked_until), deletes them once synced, and polls the table
+-- periodically, so several listener processes can share the load and a
+-- backlog drains after an outage.
+--
+-- The trg_sync_* triggers are recreated to fire on DELETE as well, so
+-- entries deleted in PostgreSQL are deleted in Memento too.
+--
+-- The trigger notifies the fixed channel 'memento_sync_channel' (the
+-- default of PG_NOTIFY_CHANNEL). If the listener uses another channel,
+-- change the pg_notify() call below to match.
+--
+-- Requires LISTENER_OUTBOX=true (default) in the listener. Safe to re-run.
+-- ==================================================
+
+\c memento_mirror
+
+-- ==================================================
+-- 1. OUTBOX TABLE
+-- ==================================================
+
+CREATE TABLE IF NOT EXISTS memento_sync_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(255) NOT NULL,
+    entry_id VARCHAR(255) NOT NULL,
+    operation VARCHAR(10) NOT NULL,          -- 'INSERT', 'UPDATE', 'DELETE'
+    pg_modified_time TIMESTAMP NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMP,                  -- claim lease; NULL = available
+    locked_by VARCHAR(255)
+);
+
+-- Failures are tracked in memento_sync_retry, not on the outbox row
+ALTER TABLE memento_sync_outbox
+    DROP COLUMN IF EXISTS attempts,
+    DROP COLUMN IF EXISTS last_error;
+
+-- Claims scan the primary key (oldest first); no further indexes so the
+-- trigger insert stays cheap
+
+-- ==================================================
+-- 2. TRIGGER FUNCTION
+-- ==================================================
+
+-- Same name as before, so the existing trg_sync_* triggers pick it up
+CREATE OR REPLACE FUNCTION notify_memento_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Skip if this change came from Memento sync (avoid loop). A deleted
+    -- row has no NEW; the Memento -> PostgreSQL sync marks its own
+    -- deletes with the transaction-local memento_sync.source setting.
+    IF TG_OP = 'DELETE' THEN
+        IF current_setting('memento_sync.source', true) = 'memento' THEN
+            RETURN OLD;
+        END IF;
+    ELSIF NEW.sync_source = 'memento' THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO memento_sync_outbox (table_name, entry_id, operation, pg_modified_time)
+    VALUES (TG_TABLE_NAME, COALESCE(NEW.id, OLD.id), TG_OP, NOW());
+
+    -- Wake-up only; the outbox row is the source of truth. The channel is
+    -- fixed here and must match PG_NOTIFY_CHANNEL of the listener.
+    PERFORM pg_notify('memento_sync_channel', 'outbox');
+
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql;
+
+-- ==================================================
+-- 3. TRIGGERS (INSERT, UPDATE and DELETE)
+-- ==================================================
+
+-- schema.sql creates the trg_sync_* triggers for INSERT OR UPDATE only
+DO $$
+DECLARE
+    trg RECORD;
+BEGIN
+    FOR trg IN
+        SELECT t.tgname, c.relname
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE t.tgfoid = 'notify_memento_change'::regproc
+          AND NOT t.tgisinternal
+          AND n.nspname = 'public'
+    LOOP
+        EXECUTE format('DROP TRIGGER %I ON %I', trg.tgname, trg.relname);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I '
+            'FOR EACH ROW EXECUTE FUNCTION notify_memento_change()',
+            trg.tgname, trg.relname
+        );
+    END LOOP;
+END;
+$$;
+
+-- Verify
+SELECT COUNT(*) AS pending_outbox_rows FROM memento_sync_outbox;
@@ -0,0 +1,63 @@
+-- ==================================================
+-- Retry scheduler and dead-letter queue for PostgreSQL → Memento sync
+-- ==================================================
+-- A failed sync used to be logged in memento_sync_log and dropped.
+--
+-- Now pg_listener.py records every failed entry in memento_sync_retry
+-- (one row per entry) with an exponential backoff and jitter:
+--
+--     next_attempt_at = NOW() + RETRY_DELAY * 2^(attempts - 1) * (0.5 .. 1.0)
+--
+-- Due rows are claimed with FOR UPDATE SKIP LOCKED (next_attempt_at doubles
+-- as the claim lease) and synced again. After MAX_RETRY_ATTEMPTS failures
+-- the row moves to memento_sync_dead_letter, where it stays until it is
+-- replayed via POST /api/memento/dead-letters/replay.
+--
+-- Safe to re-run.
+-- ==================================================
+
+\c memento_mirror
+
+-- ==================================================
+-- 1. RETRY TABLE
+-- ==================================================
+
+CREATE TABLE IF NOT EXISTS memento_sync_retry (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(255) NOT NULL,
+    entry_id VARCHAR(255) NOT NULL,
+    operation VARCHAR(10) NOT NULL,          -- 'insert', 'update', 'delete'
+    attempts INTEGER NOT NULL DEFAULT 0,     -- failed attempts so far
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(255),
+    last_error TEXT,
+    first_failed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    UNIQUE (table_name, entry_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_memento_sync_retry_due
+    ON memento_sync_retry (next_attempt_at);
+
+-- ==================================================
+-- 2. DEAD-LETTER TABLE
+-- ==================================================
+
+CREATE TABLE IF NOT EXISTS memento_sync_dead_letter (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(255) NOT NULL,
+    entry_id VARCHAR(255) NOT NULL,
+    operation VARCHAR(10) NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    first_failed_at TIMESTAMP NOT NULL,
+    dead_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_memento_sync_dead_letter_table
+    ON memento_sync_dead_letter (table_name, dead_at DESC);
+
+-- Verify
+SELECT
+    (SELECT COUNT(*) FROM memento_sync_retry) AS pending_retries,
+    (SELECT COUNT(*) FROM memento_sync_dead_letter) AS dead_letters;
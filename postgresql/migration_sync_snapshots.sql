@@ -0,0 +1,27 @@
+-- ==================================================
+-- Last synced field state per entry (delta pushes to Memento)
+-- ==================================================
+-- PostgreSQL → Memento used to PATCH every non-null column of an entry on
+-- every change, even when only updated_at moved.
+--
+-- memento_sync_snapshots keeps the user field values last synced in either
+-- direction (see sync-api/sync_snapshots.py). The PG → Memento sync sends
+-- only the columns that differ from it and skips the API call when none
+-- do. Entries without a snapshot are sent in full, as before.
+--
+-- Safe to re-run.
+-- ==================================================
+
+\c memento_mirror
+
+CREATE TABLE IF NOT EXISTS memento_sync_snapshots (
+    table_name VARCHAR(255) NOT NULL,
+    entry_id VARCHAR(255) NOT NULL,
+    fields JSONB NOT NULL DEFAULT '{}'::jsonb,
+    direction VARCHAR(20) NOT NULL,          -- 'memento_to_pg' or 'pg_to_memento' (last writer)
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (table_name, entry_id)
+);
+
+-- Verify
+SELECT COUNT(*) AS snapshots FROM memento_sync_snapshots;
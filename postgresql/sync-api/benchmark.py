@@ -0,0 +1,254 @@
+"""
+Sync Benchmarks - Measure latency of the sync hot paths
+
+Runs synthetic entries through the real sync handlers against the
+configured PostgreSQL database (see config.py). Benchmark rows use the
+'bench-' ID prefix and are removed again when the run finishes.
+
+Usage:
+    python benchmark.py sync-entry --entries 200
+    python benchmark.py sync-entry --entries 1000 --sessions 8
+    python benchmark.py field-parse --runs 20000
+    python benchmark.py memento-http --requests 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import timeit
+import logging
+from typing import Dict, Any, List
+
+from sqlalchemy import event, text
+
+from database import engine, SessionLocal, dispose
+from memento_to_pg import MementoToPostgreSQLSync
+from models import Employee, CashBook
+from conversion_plans import classify_column_type, get_conversion_plan
+from memento_client import MementoHttpClient
+from config import Config
+
+BENCH_PREFIX = 'bench-'
+
+# Dochádzka is the busiest library in production
+BENCH_LIBRARY_ID = 'zNoMvrv8U'
+BENCH_LIBRARY_NAME = 'Dochádzka'
+BENCH_TABLE = 'memento_attendance'
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def print_latencies(title: str, latencies_ms: List[float]) -> None:
+    """Print latency summary in milliseconds"""
+    print(f"\n=== {title} ===")
+    print(f"  Samples: {len(latencies_ms)}")
+    print(f"  Mean:    {statistics.mean(latencies_ms):8.2f} ms")
+    print(f"  p50:     {percentile(latencies_ms, 50):8.2f} ms")
+    print(f"  p95:     {percentile(latencies_ms, 95):8.2f} ms")
+    print(f"  p99:     {percentile(latencies_ms, 99):8.2f} ms")
+
+
+def make_attendance_entry(index: int) -> Dict[str, Any]:
+    """Build a synthetic Dochádzka entry as sent by the Memento scripts"""
+    return {
+        'id': f"{BENCH_PREFIX}{index:06d}",
+        'status': 'active',
+        'createdTime': '2026-03-18T06:55:00.000Z',
+        'modifiedTime': '2026-03-18T15:05:00.000Z',
+        'fields': {
+            'Dátum': '2026-03-18',
+            'Príchod': '1970-01-01T07:00:00.000Z',
+            'Odchod': '1970-01-01T15:30:00.000Z',
+            'Počet pracovníkov': 3,
+            'Odpracované': '8.5',
+            'Poznámka': f"benchmark entry {index}",
+        }
+    }
+
+
+# Parsed Memento field values for the largest models (already mapped to columns)
+FIELD_PARSE_SAMPLES = {
+    Employee: {
+        'record_number': '42', 'first_name': 'Ján', 'last_name': 'Novák', 'nick': 'Jano',
+        'position': 'Záhradník', 'mobile': 905123456, 'email': 'jan@example.sk',
+        'sms_enabled': 'sms', 'email_enabled': '', 'telegram_enabled': True,
+        'is_active': True, 'is_driver': False, 'worked_hours': '168.5', 'earned': 2100.0,
+        'bonuses': '150', 'paid_out': 1800, 'gross_salary': '2250.00',
+        'current_hourly_rate': '12.5', 'balance': -120.5, 'attendance_rating': 4.0,
+        'notes': None, 'view_mode': 'Tlač',
+    },
+    CashBook: {
+        'date': '2026-03-18T00:00:00.000Z', 'transaction_type': 'Výdavok',
+        'order_id': {'id': 'ord123'}, 'sum': '125.40', 'sum_total': 150.48, 'vat': '25.08',
+        'description': 'Materiál', 'note': '', 'is_vat': 'true', 'vat_rate': 'základná',
+        'vat_rate_value': 20, 'obligation_payment': False, 'offset_claim': '',
+        'record_to_customer': 'nie',
+    },
+}
+
+
+async def cleanup() -> None:
+    """Remove benchmark rows"""
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DELETE FROM {BENCH_TABLE} WHERE id LIKE :prefix"), {'prefix': f"{BENCH_PREFIX}%"})
+        await conn.execute(text("DELETE FROM memento_sync_log WHERE entry_id LIKE :prefix"), {'prefix': f"{BENCH_PREFIX}%"})
+        await conn.execute(text("DELETE FROM memento_sync_snapshots WHERE entry_id LIKE :prefix"), {'prefix': f"{BENCH_PREFIX}%"})
+
+
+async def bench_sync_entry(args) -> None:
+    """
+    Per-entry latency of MementoToPostgreSQLSync.sync_entry
+
+    With --sessions N the entries are split over N sessions syncing
+    concurrently (as parallel API requests do) and the throughput is
+    reported as well.
+    """
+    counters = {'statements': 0, 'commits': 0}
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counters['statements'] += 1
+
+    @event.listens_for(engine.sync_engine, 'commit')
+    def count_commit(conn):
+        counters['commits'] += 1
+
+    entries = [make_attendance_entry(i) for i in range(args.entries)]
+    sessions = max(1, args.sessions)
+    latencies_ms = []
+
+    async def sync_entries(chunk: List[Dict[str, Any]]) -> None:
+        async with SessionLocal() as db:
+            sync_handler = MementoToPostgreSQLSync(db)
+
+            for entry in chunk:
+                start = time.perf_counter()
+                result = await sync_handler.sync_entry(
+                    library_id=BENCH_LIBRARY_ID,
+                    library_name=BENCH_LIBRARY_NAME,
+                    table_name=BENCH_TABLE,
+                    entry_data=entry
+                )
+                latencies_ms.append((time.perf_counter() - start) * 1000)
+
+                if not result['success']:
+                    raise RuntimeError(f"Sync failed: {result.get('error')}")
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(sync_entries(entries[i::sessions]) for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+
+        print_latencies(f"sync_entry ({BENCH_TABLE}, {sessions} session(s))", latencies_ms)
+        print(f"  Throughput:       {len(entries) / elapsed:.0f} entries/s")
+        print(f"  Statements/entry: {counters['statements'] / len(entries):.1f}")
+        print(f"  Commits/entry:    {counters['commits'] / len(entries):.1f}")
+
+    finally:
+        await cleanup()
+        await dispose()
+
+
+async def bench_field_parse(args) -> None:
+    """Per-entry field conversion: per-field type dispatch vs conversion plan"""
+    # Converters log at INFO level - keep logging out of the measurement
+    logging.disable(logging.CRITICAL)
+
+    def per_field_dispatch(model_class, fields):
+        # Column lookup and type classification for every field (pre-plan behaviour)
+        columns = model_class.__table__.columns
+        return {name: classify_column_type(columns[name])(value, name) for name, value in fields.items()}
+
+    def plan_dispatch(model_class, fields):
+        plan = get_conversion_plan(model_class)
+        return {name: plan[name](value, name) for name, value in fields.items()}
+
+    print(f"\n=== Field conversion per entry ({args.runs} runs) ===")
+    for model_class, fields in FIELD_PARSE_SAMPLES.items():
+        assert per_field_dispatch(model_class, fields) == plan_dispatch(model_class, fields)
+
+        before = timeit.timeit(lambda: per_field_dispatch(model_class, fields), number=args.runs)
+        after = timeit.timeit(lambda: plan_dispatch(model_class, fields), number=args.runs)
+
+        print(
+            f"  {model_class.__name__:10} {len(fields):3} fields  "
+            f"per-field: {before / args.runs * 1e6:7.2f} µs  "
+            f"plan: {after / args.runs * 1e6:7.2f} µs  "
+            f"({before / after:.1f}x)"
+        )
+
+    await dispose()
+
+
+async def bench_memento_http(args) -> None:
+    """Outbound Memento API latency: new session per event vs pooled client"""
+    url = args.url or f"{Config.MEMENTO_API_BASE_URL}/libraries/{BENCH_LIBRARY_ID}/entries"
+    # Stay under the Memento rate limit so 429s do not skew the numbers
+    interval = 60.0 / Config.MEMENTO_RATE_LIMIT if args.interval is None else args.interval
+
+    async def timed_get(client: MementoHttpClient) -> float:
+        session = await client.get_session()
+        start = time.perf_counter()
+        async with session.get(url) as response:
+            await response.read()
+        return (time.perf_counter() - start) * 1000
+
+    # Before: every event created (and closed) its own session
+    per_event_ms = []
+    for i in range(args.requests):
+        client = MementoHttpClient()
+        try:
+            per_event_ms.append(await timed_get(client))
+        finally:
+            await client.close()
+        await asyncio.sleep(interval)
+
+    # After: one pooled client owned by the listener
+    pooled_ms = []
+    client = MementoHttpClient()
+    try:
+        for i in range(args.requests):
+            pooled_ms.append(await timed_get(client))
+            await asyncio.sleep(interval)
+        stats = client.stats()
+    finally:
+        await client.close()
+
+    print_latencies(f"Session per event ({url})", per_event_ms)
+    print_latencies(f"Pooled client ({url})", pooled_ms)
+    print(f"  Connections:  {stats['connections_created']} new / {stats['connections_reused']} reused")
+
+    await dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memento sync benchmarks")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    sync_entry_parser = subparsers.add_parser('sync-entry', help="Per-entry latency of sync_entry()")
+    sync_entry_parser.add_argument('--entries', type=int, default=200, help="Number of entries to sync")
+    sync_entry_parser.add_argument('--sessions', type=int, default=1, help="Concurrent sessions the entries are split over")
+    sync_entry_parser.set_defaults(func=bench_sync_entry)
+
+    field_parse_parser = subparsers.add_parser('field-parse', help="Field conversion per entry (no database writes)")
+    field_parse_parser.add_argument('--runs', type=int, default=20000, help="Number of conversions per model")
+    field_parse_parser.set_defaults(func=bench_field_parse)
+
+    http_parser = subparsers.add_parser('memento-http', help="Outbound Memento API latency (real API calls)")
+    http_parser.add_argument('--requests', type=int, default=20, help="Requests per mode")
+    http_parser.add_argument('--url', help="URL to GET (default: entries of the benchmark library)")
+    http_parser.add_argument('--interval', type=float, help="Seconds between requests (default: MEMENTO_RATE_LIMIT pacing)")
+    http_parser.set_defaults(func=bench_memento_http)
+
+    args = parser.parse_args()
+    asyncio.run(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Bulk Sync - Full library re-sync in one streamed request
+
+POST /api/memento/bulk-sync/{library_id} accepts the entries of a library
+as a streamed body and syncs them while the body is still being received:
+
+- NDJSON (default): one entry JSON object per line
+- JSON array: Content-Type application/json, body [entry, entry, ...]
+
+Entries are parsed incrementally (the body is never held in memory as a
+whole), written in chunks of BULK_SYNC_CHUNK_SIZE entries with one commit
+per chunk (MementoToPostgreSQLSync.sync_entries), and progress is logged
+every BULK_SYNC_PROGRESS_INTERVAL entries.
+
+Example:
+    curl -X POST -H "X-API-Key: ..." -H "Content-Type: application/x-ndjson" \\
+         --data-binary @entries.ndjson \\
+         https://.../api/memento/bulk-sync/zNoMvrv8U
+"""
+
+import codecs
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel
+from sqlalchemy import update
+
+from auth import verify_api_key
+from config import Config
+from database import get_db
+from models import SyncMetadata
+from memento_to_pg import MementoToPostgreSQLSync
+from universal_sync_endpoint import BatchEntryResult
+import sys
+sys.path.append('..')
+from library_mapping import get_table_name, get_slovak_name_by_id, LIBRARY_MAP
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Failed entries listed in the response (all failures are in memento_sync_log)
+MAX_REPORTED_FAILURES = 100
+
+
+class BulkSyncResponse(BaseModel):
+    """Response model for bulk sync"""
+    success: bool
+    library_id: str
+    library_name: str
+    table_name: str
+    total: int
+    succeeded: int
+    failed: int
+    chunks: int
+    duration_seconds: float
+    failures: List[BatchEntryResult]
+    error: Optional[str] = None
+
+
+# ==================================================
+# INCREMENTAL PARSERS
+# ==================================================
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parse NDJSON from a byte stream, one JSON value per non-empty line
+
+    Args:
+        chunks: Request body chunks
+
+    Yields:
+        Parsed JSON values
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split('\n')
+        buffer = lines.pop()
+
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+    buffer += decoder.decode(b'', final=True)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parse a top-level JSON array from a byte stream, element by element
+
+    Args:
+        chunks: Request body chunks
+
+    Yields:
+        Parsed array elements
+
+    Raises:
+        ValueError: If the body is not a JSON array or is truncated
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    json_decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        pos = 0
+
+        while True:
+            # Skip whitespace and element separators
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Request body is not a JSON array")
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                value, pos = json_decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element not complete yet - wait for more data
+                break
+            yield value
+
+        buffer = buffer[pos:]
+
+    raise ValueError("JSON array is truncated or malformed")
+
+
+# ==================================================
+# ENDPOINT
+# ==================================================
+
+def resolve_library(library_id: str) -> Dict[str, str]:
+    """
+    Resolve library name and table name for a Memento library ID
+
+    Raises:
+        HTTPException: If the library or its table is not mapped
+    """
+    library_name = get_slovak_name_by_id(library_id)
+    if not library_name:
+        for name, data in LIBRARY_MAP.items():
+            if data.get('id') == library_id:
+                library_name = name
+                break
+
+    if not library_name:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Library ID {library_id} not found in mapping"
+        )
+
+    table_name = get_table_name(library_name)
+    if not table_name:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Table mapping not found for library: {library_name}"
+        )
+
+    return {'library_name': library_name, 'table_name': table_name}
+
+
+@router.post("/api/memento/bulk-sync/{library_id}", response_model=BulkSyncResponse)
+async def bulk_sync_library(
+    library_id: str,
+    request: Request,
+    db=Depends(get_db),
+    _=Depends(verify_api_key)
+):
+    """
+    Bulk sync a whole library from a streamed NDJSON or JSON array body
+
+    Each chunk of BULK_SYNC_CHUNK_SIZE entries is committed on its own, so
+    a parse error or disconnect mid-stream keeps the chunks already
+    written; the response then has success=false and the error.
+    """
+    library = resolve_library(library_id)
+    library_name = library['library_name']
+    table_name = library['table_name']
+
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('application/json'):
+        entries = iter_json_array(request.stream())
+    else:
+        entries = iter_ndjson(request.stream())
+
+    logger.info(f"Bulk sync started: library='{library_name}' ({library_id}) -> {table_name}")
+
+    sync_handler = MementoToPostgreSQLSync(db)
+    chunk_size = max(1, Config.BULK_SYNC_CHUNK_SIZE)
+    progress_interval = max(1, Config.BULK_SYNC_PROGRESS_INTERVAL)
+
+    totals = {'total': 0, 'succeeded': 0, 'failed': 0, 'chunks': 0}
+    failures: List[BatchEntryResult] = []
+    error = None
+    start = time.perf_counter()
+
+    async def flush(chunk: List[Dict[str, Any]]) -> None:
+        results = await sync_handler.sync_entries(
+            library_id=library_id,
+            library_name=library_name,
+            table_name=table_name,
+            entries=chunk
+        )
+
+        reported = totals['total']
+        totals['total'] += len(results)
+        totals['chunks'] += 1
+        for result in results:
+            if result['success']:
+                totals['succeeded'] += 1
+            else:
+                totals['failed'] += 1
+                if len(failures) < MAX_REPORTED_FAILURES:
+                    failures.append(BatchEntryResult(
+                        entry_id=result.get('entry_id'),
+                        success=False,
+                        error=result.get('error')
+                    ))
+
+        if totals['total'] // progress_interval > reported // progress_interval:
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Bulk sync {library_name}: {totals['total']} entries "
+                f"({totals['succeeded']} ok, {totals['failed']} failed, "
+                f"{totals['total'] / elapsed if elapsed else 0:.0f} entries/s)"
+            )
+
+    chunk: List[Dict[str, Any]] = []
+    try:
+        async for entry in entries:
+            if not isinstance(entry, dict):
+                raise ValueError(f"Entry #{totals['total'] + len(chunk) + 1} is not a JSON object")
+
+            chunk.append(entry)
+            if len(chunk) >= chunk_size:
+                await flush(chunk)
+                chunk = []
+
+        if chunk:
+            await flush(chunk)
+
+    except Exception as e:
+        error = f"Bulk sync stopped after {totals['total']} entries: {e}"
+        logger.error(f"Bulk sync {library_name}: {error}")
+        await db.rollback()
+
+    if totals['succeeded']:
+        await db.execute(
+            update(SyncMetadata)
+            .where(SyncMetadata.library_id == library_id)
+            .values(last_bulk_sync=datetime.now())
+        )
+        await db.commit()
+
+    duration = time.perf_counter() - start
+    logger.info(
+        f"Bulk sync finished: {library_name} - {totals['total']} entries in {totals['chunks']} chunks, "
+        f"{totals['failed']} failed, {duration:.1f}s"
+    )
+
+    return BulkSyncResponse(
+        success=error is None and totals['failed'] == 0,
+        library_id=library_id,
+        library_name=library_name,
+        table_name=table_name,
+        total=totals['total'],
+        succeeded=totals['succeeded'],
+        failed=totals['failed'],
+        chunks=totals['chunks'],
+        duration_seconds=round(duration, 3),
+        failures=failures,
+        error=error
+    )
@@ -6,7 +6,7 @@ database connections, API keys, and sync settings.
 """
 
 import os
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -39,6 +39,13 @@ class Config:
             f"@{cls.PG_HOST}:{cls.PG_PORT}/{cls.PG_DATABASE}"
         )
 
+    # Connection pool (per process - keep workers * (size + overflow) < max_connections)
+    DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT: int = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING: bool = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
     @classmethod
     def get_async_pg_url(cls) -> str:
         """Get PostgreSQL connection URL for asyncpg"""
@@ -57,6 +64,16 @@ class Config:
     # Rate limiting for Memento API (requests per minute)
     MEMENTO_RATE_LIMIT: int = int(os.getenv('MEMENTO_RATE_LIMIT', '10'))
 
+    # Requests allowed in a burst before MEMENTO_RATE_LIMIT pacing applies
+    MEMENTO_RATE_BURST: int = int(os.getenv('MEMENTO_RATE_BURST', '5'))
+
+    # Additional limit per library (requests per minute, 0 = none)
+    MEMENTO_RATE_LIMIT_PER_LIBRARY: int = int(os.getenv('MEMENTO_RATE_LIMIT_PER_LIBRARY', '0'))
+
+    # 'postgres' = buckets shared by all processes (migration_rate_limiter.sql),
+    # 'local' = per process
+    MEMENTO_RATE_LIMIT_BACKEND: str = os.getenv('MEMENTO_RATE_LIMIT_BACKEND', 'postgres')
+
     # ========== SYNC API CONFIGURATION ==========
     # API key for authenticating incoming requests from Memento triggers
     SYNC_API_KEY: str = os.getenv('SYNC_API_KEY', 'CHANGE_THIS_IN_PRODUCTION')
@@ -68,9 +85,20 @@ class Config:
     API_HOST: str = os.getenv('API_HOST', '0.0.0.0')
 
     # ========== SYNC BEHAVIOR ==========
-    # Conflict resolution strategy: 'memento_wins', 'pg_wins', 'timestamp'
+    # Conflict resolution strategy: 'memento_wins', 'pg_wins', 'timestamp',
+    # 'merge' = field-level three-way merge against the last synced state
+    # (memento_sync_snapshots); only fields changed on both sides are
+    # conflicts, the newer side wins those
     CONFLICT_RESOLUTION: str = os.getenv('CONFLICT_RESOLUTION', 'memento_wins')
 
+    # PG → Memento conflict checks:
+    # 'remote' = GET the entry and check before every update,
+    # 'local' = no check (and no merge) for entries synced from Memento within
+    # the last CONFLICT_CHECK_MAX_AGE seconds; the GET is only made if the
+    # entry never came from Memento or its last sync is older than that
+    CONFLICT_CHECK_MODE: str = os.getenv('CONFLICT_CHECK_MODE', 'remote')
+    CONFLICT_CHECK_MAX_AGE: int = int(os.getenv('CONFLICT_CHECK_MAX_AGE', '3600'))
+
     # Enable/disable PostgreSQL → Memento sync
     ENABLE_PG_TO_MEMENTO: bool = os.getenv('ENABLE_PG_TO_MEMENTO', 'true').lower() == 'true'
 
@@ -86,6 +114,9 @@ class Config:
     # Retry delay in seconds (exponential backoff)
     RETRY_DELAY: int = int(os.getenv('RETRY_DELAY', '5'))
 
+    # Upper bound for the backoff between retries (seconds)
+    RETRY_MAX_DELAY: int = int(os.getenv('RETRY_MAX_DELAY', '3600'))
+
     # ========== LOGGING CONFIGURATION ==========
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE: Optional[str] = os.getenv('LOG_FILE', '/opt/memento-sync/logs/sync.log')
@@ -94,13 +125,83 @@ class Config:
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
+    # One JSON object per log line instead of LOG_FORMAT
+    LOG_STRUCTURED: bool = os.getenv('LOG_STRUCTURED', 'false').lower() == 'true'
+
+    # Per-entry/per-field debug traces: request header that turns them on,
+    # libraries (IDs or Slovak names, comma separated) always traced and
+    # fraction of requests traced at random (0.0 - 1.0)
+    LOG_TRACE_HEADER: str = os.getenv('LOG_TRACE_HEADER', 'X-Debug-Trace')
+    LOG_TRACE_LIBRARIES: List[str] = [
+        name.strip() for name in os.getenv('LOG_TRACE_LIBRARIES', '').split(',') if name.strip()
+    ]
+    LOG_TRACE_SAMPLE_RATE: float = float(os.getenv('LOG_TRACE_SAMPLE_RATE', '0.0'))
+
+    # Write-behind buffer for memento_sync_log rows (sync_log_buffer.py):
+    # flushed with one COPY every SYNC_LOG_FLUSH_ROWS rows or
+    # SYNC_LOG_FLUSH_INTERVAL milliseconds; beyond SYNC_LOG_BUFFER_MAX
+    # buffered rows logs are written synchronously
+    SYNC_LOG_BUFFER: bool = os.getenv('SYNC_LOG_BUFFER', 'true').lower() == 'true'
+    SYNC_LOG_FLUSH_ROWS: int = int(os.getenv('SYNC_LOG_FLUSH_ROWS', '500'))
+    SYNC_LOG_FLUSH_INTERVAL: int = int(os.getenv('SYNC_LOG_FLUSH_INTERVAL', '1000'))
+    SYNC_LOG_BUFFER_MAX: int = int(os.getenv('SYNC_LOG_BUFFER_MAX', '20000'))
+
+    # Monthly memento_sync_log partitions (migration_sync_log_partitions.sql):
+    # maintenance interval in seconds (0 = disabled), months created in
+    # advance and days of logs kept (0 = keep everything)
+    SYNC_LOG_PARTITION_INTERVAL: int = int(os.getenv('SYNC_LOG_PARTITION_INTERVAL', '86400'))
+    SYNC_LOG_PARTITIONS_AHEAD: int = int(os.getenv('SYNC_LOG_PARTITIONS_AHEAD', '2'))
+    SYNC_LOG_RETENTION_DAYS: int = int(os.getenv('SYNC_LOG_RETENTION_DAYS', '90'))
+
     # ========== POSTGRESQL LISTENER ==========
-    # PostgreSQL NOTIFY channel name
+    # PostgreSQL NOTIFY channel name (notify_memento_change() in
+    # migration_sync_outbox.sql notifies 'memento_sync_channel'; keep them equal)
     PG_NOTIFY_CHANNEL: str = os.getenv('PG_NOTIFY_CHANNEL', 'memento_sync_channel')
 
     # Listener reconnect delay (seconds)
     LISTENER_RECONNECT_DELAY: int = int(os.getenv('LISTENER_RECONNECT_DELAY', '5'))
 
+    # Concurrent sync workers (events of one entry always go to the same worker)
+    LISTENER_WORKERS: int = int(os.getenv('LISTENER_WORKERS', '4'))
+
+    # Pending events per worker queue before notifications wait (backpressure)
+    LISTENER_QUEUE_SIZE: int = int(os.getenv('LISTENER_QUEUE_SIZE', '1000'))
+
+    # Changes of one entry within this window (seconds) are synced once (0 = off)
+    LISTENER_COALESCE_WINDOW: float = float(os.getenv('LISTENER_COALESCE_WINDOW', '2.0'))
+
+    # Queued updates of one table a worker syncs together (one row/snapshot
+    # query and one conflict check per batch; 1 = per event)
+    LISTENER_BATCH_SIZE: int = int(os.getenv('LISTENER_BATCH_SIZE', '20'))
+
+    # Read changes from memento_sync_outbox (migration_sync_outbox.sql);
+    # false = legacy mode, changes only arrive as NOTIFY payloads
+    LISTENER_OUTBOX: bool = os.getenv('LISTENER_OUTBOX', 'true').lower() == 'true'
+
+    # Outbox rows claimed per batch and claim lease (seconds, renewed every lease / 3
+    # while a claimed row is queued)
+    LISTENER_OUTBOX_BATCH_SIZE: int = int(os.getenv('LISTENER_OUTBOX_BATCH_SIZE', '100'))
+    LISTENER_OUTBOX_LEASE: int = int(os.getenv('LISTENER_OUTBOX_LEASE', '300'))
+
+    # Poll the outbox this often (seconds) even without NOTIFY wake-ups
+    LISTENER_OUTBOX_POLL_INTERVAL: float = float(os.getenv('LISTENER_OUTBOX_POLL_INTERVAL', '5'))
+
+    # Check memento_sync_retry (migration_sync_retry.sql) for due retries this often (seconds)
+    LISTENER_RETRY_POLL_INTERVAL: float = float(os.getenv('LISTENER_RETRY_POLL_INTERVAL', '10'))
+
+    # Split outbox/retry work between several listener processes by entry
+    # hash (migration_listener_shards.sql; same value in every listener,
+    # 0 = off - only one listener may run) and shard lease (seconds)
+    LISTENER_SHARDS: int = int(os.getenv('LISTENER_SHARDS', '0'))
+    LISTENER_SHARD_LEASE: int = int(os.getenv('LISTENER_SHARD_LEASE', '30'))
+
+    # Listener metrics: Prometheus endpoint (/metrics, /stats; port 0 = off),
+    # textfile collector path (written every heartbeat) and heartbeat log interval
+    LISTENER_METRICS_HOST: str = os.getenv('LISTENER_METRICS_HOST', '127.0.0.1')
+    LISTENER_METRICS_PORT: int = int(os.getenv('LISTENER_METRICS_PORT', '9464'))
+    LISTENER_METRICS_FILE: Optional[str] = os.getenv('LISTENER_METRICS_FILE') or None
+    LISTENER_HEARTBEAT_INTERVAL: float = float(os.getenv('LISTENER_HEARTBEAT_INTERVAL', '60'))
+
     # ========== BULK SYNC SETTINGS ==========
     # Chunk size for bulk sync operations
     BULK_SYNC_CHUNK_SIZE: int = int(os.getenv('BULK_SYNC_CHUNK_SIZE', '50'))
@@ -108,11 +209,23 @@ class Config:
     # Progress report interval (number of entries)
     BULK_SYNC_PROGRESS_INTERVAL: int = int(os.getenv('BULK_SYNC_PROGRESS_INTERVAL', '10'))
 
+    # Maximum number of entries accepted by /api/memento/sync/batch
+    SYNC_BATCH_MAX_ENTRIES: int = int(os.getenv('SYNC_BATCH_MAX_ENTRIES', '500'))
+
+    # Entry count reconciliation interval in seconds (0 = disabled)
+    ENTRY_COUNT_RECONCILE_INTERVAL: int = int(os.getenv('ENTRY_COUNT_RECONCILE_INTERVAL', '3600'))
+
     # ========== WEBHOOK SETTINGS ==========
     # Timeout for HTTP requests to Memento (seconds)
     HTTP_TIMEOUT: int = int(os.getenv('HTTP_TIMEOUT', '30'))
 
-    # Webhook retry configuration
+    # Pooled Memento HTTP client (memento_client.py)
+    HTTP_POOL_SIZE: int = int(os.getenv('HTTP_POOL_SIZE', '10'))
+    HTTP_KEEPALIVE_TIMEOUT: int = int(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '60'))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv('HTTP_DNS_CACHE_TTL', '300'))
+
+    # Webhook retry configuration (also: in-request retries of transient
+    # Memento API errors - 429, 5xx, connection errors)
     WEBHOOK_MAX_RETRIES: int = int(os.getenv('WEBHOOK_MAX_RETRIES', '3'))
     WEBHOOK_RETRY_DELAY: int = int(os.getenv('WEBHOOK_RETRY_DELAY', '2'))
 
@@ -145,11 +258,13 @@ PostgreSQL:
   Database: {cls.PG_DATABASE}
   User: {cls.PG_USER}
   Password: {'*' * len(cls.PG_PASSWORD)}
+  Pool: size={cls.DB_POOL_SIZE}, overflow={cls.DB_MAX_OVERFLOW}, recycle={cls.DB_POOL_RECYCLE}s, pre-ping={cls.DB_POOL_PRE_PING}
 
 Memento API:
   Base URL: {cls.MEMENTO_API_BASE_URL}
   API Key: {cls.MEMENTO_API_KEY[:8]}...
-  Rate Limit: {cls.MEMENTO_RATE_LIMIT} requests/minute
+  Rate Limit: {cls.MEMENTO_RATE_LIMIT} requests/minute (burst {cls.MEMENTO_RATE_BURST}, {cls.MEMENTO_RATE_LIMIT_BACKEND})
+  Per-Library Limit: {cls.MEMENTO_RATE_LIMIT_PER_LIBRARY or 'none'}
 
 Sync API:
   Host: {cls.API_HOST}:{cls.API_PORT}
@@ -157,21 +272,38 @@ Sync API:
 
 Sync Behavior:
   Conflict Resolution: {cls.CONFLICT_RESOLUTION}
+  Conflict Check: {cls.CONFLICT_CHECK_MODE}{f' (GET after {cls.CONFLICT_CHECK_MAX_AGE}s)' if cls.CONFLICT_CHECK_MODE == 'local' else ''}
   Memento → PG: {'Enabled' if cls.ENABLE_MEMENTO_TO_PG else 'Disabled'}
   PG → Memento: {'Enabled' if cls.ENABLE_PG_TO_MEMENTO else 'Disabled'}
   Sync Deleted: {'Yes' if cls.SYNC_DELETED_ENTRIES else 'No'}
+  Retries: {cls.MAX_RETRY_ATTEMPTS} attempts, backoff {cls.RETRY_DELAY}s - {cls.RETRY_MAX_DELAY}s (in-request {cls.WEBHOOK_MAX_RETRIES} x {cls.WEBHOOK_RETRY_DELAY}s)
 
 Logging:
   Level: {cls.LOG_LEVEL}
   File: {cls.LOG_FILE or 'stdout'}
+  Structured: {'Yes' if cls.LOG_STRUCTURED else 'No'}
+  Trace Libraries: {', '.join(cls.LOG_TRACE_LIBRARIES) or 'none'}
+  Trace Sample Rate: {cls.LOG_TRACE_SAMPLE_RATE}
+  Sync Log Buffer: {f'{cls.SYNC_LOG_FLUSH_ROWS} rows / {cls.SYNC_LOG_FLUSH_INTERVAL}ms (max {cls.SYNC_LOG_BUFFER_MAX})' if cls.SYNC_LOG_BUFFER else 'off'}
+  Sync Log Retention: {f'{cls.SYNC_LOG_RETENTION_DAYS} days' if cls.SYNC_LOG_RETENTION_DAYS else 'unlimited'} (partitions checked every {cls.SYNC_LOG_PARTITION_INTERVAL}s)
 
 PostgreSQL Listener:
   Channel: {cls.PG_NOTIFY_CHANNEL}
   Reconnect Delay: {cls.LISTENER_RECONNECT_DELAY}s
+  Workers: {cls.LISTENER_WORKERS} (queue size {cls.LISTENER_QUEUE_SIZE})
+  Coalesce Window: {cls.LISTENER_COALESCE_WINDOW}s
+  Batch Size: {cls.LISTENER_BATCH_SIZE}
+  Outbox: {'Enabled' if cls.LISTENER_OUTBOX else 'Disabled'} (batch {cls.LISTENER_OUTBOX_BATCH_SIZE}, lease {cls.LISTENER_OUTBOX_LEASE}s, poll {cls.LISTENER_OUTBOX_POLL_INTERVAL}s)
+  Retry Poll: {cls.LISTENER_RETRY_POLL_INTERVAL}s
+  Shards: {cls.LISTENER_SHARDS or 'off'} (lease {cls.LISTENER_SHARD_LEASE}s)
+  Metrics: {f'http://{cls.LISTENER_METRICS_HOST}:{cls.LISTENER_METRICS_PORT}/metrics' if cls.LISTENER_METRICS_PORT else 'off'}{f', file {cls.LISTENER_METRICS_FILE}' if cls.LISTENER_METRICS_FILE else ''}
+  Heartbeat: {cls.LISTENER_HEARTBEAT_INTERVAL}s
 
 Bulk Sync:
   Chunk Size: {cls.BULK_SYNC_CHUNK_SIZE}
   Progress Interval: {cls.BULK_SYNC_PROGRESS_INTERVAL} entries
+  Batch Max Entries: {cls.SYNC_BATCH_MAX_ENTRIES}
+  Entry Count Reconcile: {cls.ENTRY_COUNT_RECONCILE_INTERVAL}s
 """
 
 
@@ -4,33 +4,129 @@ Conflict Resolver - Detects and resolves sync conflicts
 When both Memento and PostgreSQL have modifications to the same entry,
 this module determines which version wins based on timestamps and
 configured resolution strategy.
+
+With CONFLICT_RESOLUTION=merge there is no whole-record winner: field
+changes of both sides since the last synced state (memento_sync_snapshots)
+are merged (merge_fields) and only fields changed on both sides are logged
+as conflicts.
+
+Entries can be checked in batches (check_conflicts / resolve_conflicts):
+one query per table for all of them, and rows the caller already loaded
+are not read again.
 """
 
 import logging
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import SyncConflict, TABLE_TO_MODEL
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# (table_name, entry_id)
+EntryKey = Tuple[str, str]
+
+# Result of a conflict check: (has_conflict, resolution, conflict_data)
+ConflictCheck = Tuple[bool, Optional[str], Optional[Dict[str, Any]]]
+
 
 class ConflictResolver:
     """Handles conflict detection and resolution"""
 
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: AsyncSession):
         self.db = db_session
         self.config = Config()
 
+    async def load_entries(
+        self,
+        keys: Iterable[EntryKey],
+        loaded: Optional[Dict[EntryKey, Any]] = None
+    ) -> Dict[EntryKey, Any]:
+        """
+        Fetch PostgreSQL rows of several entries, one query per table
+
+        Fetched rows are detached from the session: they are read-only
+        copies that a later rollback does not expire (an expired row would
+        need a lazy refresh, which AsyncSession cannot do).
+
+        Args:
+            keys: (table_name, entry_id) pairs
+            loaded: Rows the caller already has - not fetched again
+
+        Returns:
+            (table_name, entry_id) -> row; entries not in PostgreSQL and of
+            unknown tables are missing
+        """
+        entries = dict(loaded or {})
+        missing: Dict[str, List[str]] = {}
+
+        for table_name, entry_id in keys:
+            if (table_name, entry_id) not in entries:
+                missing.setdefault(table_name, []).append(entry_id)
+
+        for table_name, entry_ids in missing.items():
+            model_class = TABLE_TO_MODEL.get(table_name)
+            if not model_class:
+                logger.error(f"Unknown table: {table_name}")
+                continue
+
+            result = await self.db.execute(select(model_class).where(model_class.id.in_(set(entry_ids))))
+            for pg_entry in result.scalars():
+                self.db.expunge(pg_entry)
+                entries[(table_name, pg_entry.id)] = pg_entry
+
+        return entries
+
+    async def check_conflicts(
+        self,
+        checks: List[Tuple[str, str, Optional[datetime]]],
+        loaded: Optional[Dict[EntryKey, Any]] = None
+    ) -> Dict[EntryKey, ConflictCheck]:
+        """
+        Check several entries for conflicts between PostgreSQL and Memento
+
+        Args:
+            checks: (table_name, entry_id, memento_modified_time) tuples
+            loaded: (table_name, entry_id) -> rows the caller already loaded
+
+        Returns:
+            (table_name, entry_id) -> (has_conflict, resolution, conflict_data),
+            as returned by check_conflict()
+        """
+        results: Dict[EntryKey, ConflictCheck] = {}
+
+        try:
+            entries = await self.load_entries(((table_name, entry_id) for table_name, entry_id, _ in checks), loaded)
+        except Exception as e:
+            logger.error(f"Error loading entries for conflict check: {e}", exc_info=True)
+            await self.db.rollback()
+            return {(table_name, entry_id): (False, None, None) for table_name, entry_id, _ in checks}
+
+        for table_name, entry_id, memento_modified_time in checks:
+            try:
+                results[(table_name, entry_id)] = self._detect_conflict(
+                    table_name=table_name,
+                    entry_id=entry_id,
+                    pg_entry=entries.get((table_name, entry_id)),
+                    memento_modified_time=memento_modified_time
+                )
+            except Exception as e:
+                logger.error(f"Error checking conflict for {table_name}:{entry_id}: {e}", exc_info=True)
+                results[(table_name, entry_id)] = (False, None, None)
+
+        return results
+
     async def check_conflict(
         self,
         table_name: str,
         entry_id: str,
         pg_modified_time: datetime,
-        memento_modified_time: Optional[datetime] = None
-    ) -> Tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
+        memento_modified_time: Optional[datetime] = None,
+        pg_entry: Optional[Any] = None
+    ) -> ConflictCheck:
         """
         Check if there's a conflict between PostgreSQL and Memento versions
 
@@ -39,6 +135,7 @@ class ConflictResolver:
             entry_id: Entry ID
             pg_modified_time: PostgreSQL modification timestamp
             memento_modified_time: Memento modification timestamp (if known)
+            pg_entry: PostgreSQL row, if already loaded
 
         Returns:
             Tuple of (has_conflict, resolution, conflict_data)
@@ -46,65 +143,64 @@ class ConflictResolver:
             - resolution: 'memento_wins', 'pg_wins', or None
             - conflict_data: Details about the conflict
         """
-        try:
-            # Get model class
-            model_class = TABLE_TO_MODEL.get(table_name)
-            if not model_class:
-                raise ValueError(f"Unknown table: {table_name}")
-
-            # Fetch current entry from PostgreSQL
-            pg_entry = self.db.query(model_class).filter_by(id=entry_id).first()
-
-            if not pg_entry:
-                # Entry doesn't exist in PostgreSQL - no conflict
-                return False, None, None
+        loaded = {(table_name, entry_id): pg_entry} if pg_entry is not None else None
+        results = await self.check_conflicts([(table_name, entry_id, memento_modified_time)], loaded)
+        return results[(table_name, entry_id)]
 
-            # Get PostgreSQL timestamp
-            pg_ts = pg_entry.memento_modified_time if hasattr(pg_entry, 'memento_modified_time') else None
+    def _detect_conflict(
+        self,
+        table_name: str,
+        entry_id: str,
+        pg_entry: Optional[Any],
+        memento_modified_time: Optional[datetime]
+    ) -> ConflictCheck:
+        """Compare the Memento timestamp with the one PostgreSQL last synced"""
+        if not pg_entry:
+            # Entry doesn't exist in PostgreSQL - no conflict
+            return False, None, None
 
-            # If we don't have Memento timestamp yet, we'll get it later
-            if memento_modified_time is None:
-                # No conflict yet (we don't know Memento state)
-                return False, None, None
+        # Get PostgreSQL timestamp
+        pg_ts = pg_entry.memento_modified_time if hasattr(pg_entry, 'memento_modified_time') else None
 
-            # Check if timestamps are different
-            if pg_ts and memento_modified_time:
-                # Convert to comparable format (remove microseconds)
-                pg_ts_compare = pg_ts.replace(microsecond=0)
-                memento_ts_compare = memento_modified_time.replace(microsecond=0)
+        # If we don't have Memento timestamp yet, we'll get it later
+        if memento_modified_time is None:
+            # No conflict yet (we don't know Memento state)
+            return False, None, None
 
-                if pg_ts_compare == memento_ts_compare:
-                    # Same timestamp - no conflict
-                    return False, None, None
+        # Check if timestamps are different
+        if pg_ts and memento_modified_time:
+            # Convert to comparable format (remove microseconds)
+            pg_ts_compare = pg_ts.replace(microsecond=0)
+            memento_ts_compare = memento_modified_time.replace(microsecond=0)
 
-                # Timestamps differ - conflict detected!
-                logger.warning(
-                    f"Conflict detected for {table_name}:{entry_id} - "
-                    f"PG: {pg_ts_compare}, Memento: {memento_ts_compare}"
-                )
+            if pg_ts_compare == memento_ts_compare:
+                # Same timestamp - no conflict
+                return False, None, None
 
-                # Determine resolution based on strategy
-                resolution = self._resolve_conflict(
-                    pg_ts=pg_ts_compare,
-                    memento_ts=memento_ts_compare
-                )
+            # Timestamps differ - conflict detected!
+            logger.warning(
+                f"Conflict detected for {table_name}:{entry_id} - "
+                f"PG: {pg_ts_compare}, Memento: {memento_ts_compare}"
+            )
 
-                conflict_data = {
-                    'table_name': table_name,
-                    'entry_id': entry_id,
-                    'pg_modified': pg_ts_compare.isoformat(),
-                    'memento_modified': memento_ts_compare.isoformat(),
-                    'resolution': resolution,
-                    'pg_sync_source': pg_entry.sync_source if hasattr(pg_entry, 'sync_source') else None
-                }
+            # Determine resolution based on strategy
+            resolution = self._resolve_conflict(
+                pg_ts=pg_ts_compare,
+                memento_ts=memento_ts_compare
+            )
 
-                return True, resolution, conflict_data
+            conflict_data = {
+                'table_name': table_name,
+                'entry_id': entry_id,
+                'pg_modified': pg_ts_compare.isoformat(),
+                'memento_modified': memento_ts_compare.isoformat(),
+                'resolution': resolution,
+                'pg_sync_source': pg_entry.sync_source if hasattr(pg_entry, 'sync_source') else None
+            }
 
-            return False, None, None
+            return True, resolution, conflict_data
 
-        except Exception as e:
-            logger.error(f"Error checking conflict for {table_name}:{entry_id}: {e}", exc_info=True)
-            return False, None, None
+        return False, None, None
 
     def _resolve_conflict(
         self,
@@ -119,7 +215,7 @@ class ConflictResolver:
             memento_ts: Memento timestamp
 
         Returns:
-            Resolution: 'memento_wins', 'pg_wins', or 'timestamp'
+            Resolution: 'memento_wins', 'pg_wins', or 'merge'
         """
         strategy = self.config.CONFLICT_RESOLUTION
 
@@ -138,11 +234,76 @@ class ConflictResolver:
             else:
                 return 'pg_wins'
 
+        elif strategy == 'merge':
+            # Field-level merge by the caller (merge_fields)
+            return 'merge'
+
         else:
             # Default: Memento wins
             logger.warning(f"Unknown conflict resolution strategy: {strategy}, defaulting to memento_wins")
             return 'memento_wins'
 
+    def merge_fields(
+        self,
+        base: Optional[Dict[str, Any]],
+        pg_fields: Dict[str, Any],
+        memento_fields: Dict[str, Any],
+        pg_ts: Optional[datetime],
+        memento_ts: Optional[datetime]
+    ) -> Tuple[List[str], List[str], Dict[str, Dict[str, Any]]]:
+        """
+        Three-way merge of an entry's field values (sync_snapshots form)
+
+        A field changed on one side only (compared to base, the last synced
+        state) takes that side's value. A field changed on both sides to
+        different values is a collision; the side with the newer timestamp
+        wins it. Without a base every differing field is a collision.
+        Columns Memento did not report count as unchanged there.
+
+        Args:
+            base: Last synced field values (None = never synced)
+            pg_fields: Current PostgreSQL field values
+            memento_fields: Current Memento field values
+            pg_ts: PostgreSQL modification timestamp
+            memento_ts: Memento modification timestamp
+
+        Returns:
+            Tuple of (to_memento, to_pg, collisions)
+            - to_memento: Columns whose PostgreSQL value goes to Memento
+            - to_pg: Columns whose Memento value goes to PostgreSQL
+            - collisions: column -> {'base', 'pg', 'memento', 'winner'}
+        """
+        base = base or {}
+        memento_newer = bool(pg_ts and memento_ts and _naive(memento_ts) > _naive(pg_ts))
+
+        to_memento: List[str] = []
+        to_pg: List[str] = []
+        collisions: Dict[str, Dict[str, Any]] = {}
+
+        for column in sorted(set(pg_fields) | set(memento_fields)):
+            base_value = base.get(column)
+            pg_value = pg_fields.get(column)
+            memento_value = memento_fields[column] if column in memento_fields else base_value
+
+            if pg_value == memento_value:
+                continue
+
+            if pg_value == base_value:
+                to_pg.append(column)
+            elif memento_value == base_value:
+                to_memento.append(column)
+            else:
+                winner = 'memento' if memento_newer else 'postgresql'
+                collisions[column] = {
+                    'base': base_value,
+                    'pg': pg_value,
+                    'memento': memento_value,
+                    'winner': winner
+                }
+                (to_pg if memento_newer else to_memento).append(column)
+
+        return to_memento, to_pg, collisions
+
     async def log_conflict(
         self,
         library_id: str,
@@ -161,34 +322,55 @@ class ConflictResolver:
             conflict_data: Conflict details
             resolution: Resolution strategy applied
         """
-        try:
-            conflict = SyncConflict(
-                library_id=library_id,
-                library_name=library_name,
-                entry_id=entry_id,
-                memento_modified_time=datetime.fromisoformat(conflict_data['memento_modified']),
-                pg_modified_time=datetime.fromisoformat(conflict_data['pg_modified']),
-                resolution=resolution,
-                conflict_data=conflict_data,
-                resolved=True,  # Auto-resolved based on strategy
-                resolved_at=datetime.now()
-            )
+        await self.log_conflicts(library_id, library_name, [(entry_id, conflict_data, resolution)])
+
+    async def log_conflicts(
+        self,
+        library_id: str,
+        library_name: str,
+        conflicts: List[Tuple[str, Dict[str, Any], str]]
+    ) -> None:
+        """
+        Log several conflicts of one library in a single commit
 
-            self.db.add(conflict)
-            self.db.commit()
+        Args:
+            library_id: Memento library ID
+            library_name: Library name
+            conflicts: (entry_id, conflict_data, resolution) tuples
+        """
+        if not conflicts:
+            return
 
-            logger.info(f"Logged conflict for {library_name}:{entry_id} - Resolution: {resolution}")
+        try:
+            for entry_id, conflict_data, resolution in conflicts:
+                self.db.add(SyncConflict(
+                    library_id=library_id,
+                    library_name=library_name,
+                    entry_id=entry_id,
+                    memento_modified_time=datetime.fromisoformat(conflict_data['memento_modified']),
+                    pg_modified_time=datetime.fromisoformat(conflict_data['pg_modified']),
+                    resolution=resolution,
+                    conflict_data=conflict_data,
+                    resolved=True,  # Auto-resolved based on strategy
+                    resolved_at=datetime.now()
+                ))
+
+            await self.db.commit()
+
+            for entry_id, _, resolution in conflicts:
+                logger.info(f"Logged conflict for {library_name}:{entry_id} - Resolution: {resolution}")
 
         except Exception as e:
             logger.error(f"Error logging conflict: {e}", exc_info=True)
-            self.db.rollback()
+            await self.db.rollback()
 
     async def should_skip_sync(
         self,
         table_name: str,
         entry_id: str,
         source: str,
-        memento_modified_time: Optional[datetime] = None
+        memento_modified_time: Optional[datetime] = None,
+        pg_entry: Optional[Any] = None
     ) -> Tuple[bool, Optional[str]]:
         """
         Check if sync should be skipped due to conflict
@@ -198,17 +380,18 @@ class ConflictResolver:
             entry_id: Entry ID
             source: Sync source ('memento' or 'postgresql')
             memento_modified_time: Memento timestamp (if known)
+            pg_entry: PostgreSQL row, if already loaded
 
         Returns:
             Tuple of (should_skip, reason)
         """
         try:
             # Get current entry from PostgreSQL
-            model_class = TABLE_TO_MODEL.get(table_name)
-            if not model_class:
-                return False, None
+            if pg_entry is None:
+                if table_name not in TABLE_TO_MODEL:
+                    return False, None
 
-            pg_entry = self.db.query(model_class).filter_by(id=entry_id).first()
+                pg_entry = (await self.load_entries([(table_name, entry_id)])).get((table_name, entry_id))
 
             if not pg_entry:
                 # Entry doesn't exist - don't skip
@@ -249,7 +432,8 @@ class ConflictResolver:
         table_name: str,
         entry_id: str,
         pg_modified_time: datetime,
-        memento_modified_time: datetime
+        memento_modified_time: datetime,
+        pg_entry: Optional[Any] = None
     ) -> str:
         """
         Detect conflict, resolve it, and return which version to use
@@ -261,41 +445,81 @@ class ConflictResolver:
             entry_id: Entry ID
             pg_modified_time: PostgreSQL timestamp
             memento_modified_time: Memento timestamp
+            pg_entry: PostgreSQL row, if already loaded
 
         Returns:
-            Resolution: 'memento_wins' or 'pg_wins'
+            Resolution: 'memento_wins', 'pg_wins' or 'merge'
         """
-        has_conflict, resolution, conflict_data = await self.check_conflict(
-            table_name=table_name,
-            entry_id=entry_id,
-            pg_modified_time=pg_modified_time,
-            memento_modified_time=memento_modified_time
+        loaded = {(table_name, entry_id): pg_entry} if pg_entry is not None else None
+        resolutions = await self.resolve_conflicts(
+            library_id=library_id,
+            library_name=library_name,
+            checks=[(table_name, entry_id, memento_modified_time)],
+            loaded=loaded
         )
+        return resolutions[(table_name, entry_id)]
 
-        if has_conflict:
-            # Log the conflict
-            await self.log_conflict(
-                library_id=library_id,
-                library_name=library_name,
-                entry_id=entry_id,
-                conflict_data=conflict_data,
-                resolution=resolution
-            )
+    async def resolve_conflicts(
+        self,
+        library_id: str,
+        library_name: str,
+        checks: List[Tuple[str, str, Optional[datetime]]],
+        loaded: Optional[Dict[EntryKey, Any]] = None
+    ) -> Dict[EntryKey, str]:
+        """
+        Detect and resolve conflicts of several entries of one library
+
+        One query per table (rows in loaded are reused) and one commit for
+        all logged conflicts.
+
+        Args:
+            library_id: Memento library ID
+            library_name: Library name
+            checks: (table_name, entry_id, memento_modified_time) tuples
+            loaded: (table_name, entry_id) -> rows the caller already loaded
 
+        Returns:
+            (table_name, entry_id) -> 'memento_wins', 'pg_wins' or 'merge'
+        """
+        results = await self.check_conflicts(checks, loaded)
+        resolutions: Dict[EntryKey, str] = {}
+        conflicts = []
+
+        for key, (has_conflict, resolution, conflict_data) in results.items():
+            if has_conflict:
+                # Merges log their field collisions themselves
+                if resolution != 'merge':
+                    conflicts.append((key[1], conflict_data, resolution))
+                resolutions[key] = resolution
+            elif self.config.CONFLICT_RESOLUTION == 'merge':
+                # Nothing to merge - PostgreSQL changes are pushed
+                resolutions[key] = 'pg_wins'
+            else:
+                # No conflict - use configured default
+                resolutions[key] = self.config.CONFLICT_RESOLUTION
+
+        # Log the conflicts
+        await self.log_conflicts(library_id, library_name, conflicts)
+
+        for entry_id, _, resolution in conflicts:
             logger.warning(
                 f"Conflict resolved for {library_name}:{entry_id} - "
                 f"Winner: {resolution}"
             )
 
-            return resolution
+        return resolutions
+
 
-        # No conflict - use configured default
-        return self.config.CONFLICT_RESOLUTION
+def _naive(ts: datetime) -> datetime:
+    """Comparable timestamp (Memento's are UTC-aware, PostgreSQL's local naive)"""
+    if ts.tzinfo is not None:
+        return ts.astimezone().replace(tzinfo=None)
+    return ts
 
 
 # Convenience function
 async def check_and_resolve_conflict(
-    db: Session,
+    db: AsyncSession,
     library_id: str,
     library_name: str,
     table_name: str,
@@ -307,7 +531,7 @@ async def check_and_resolve_conflict(
     Check for conflict and resolve it
 
     Returns:
-        Resolution: 'memento_wins' or 'pg_wins'
+        Resolution: 'memento_wins', 'pg_wins' or 'merge'
     """
     resolver = ConflictResolver(db)
     return await resolver.resolve_and_sync(
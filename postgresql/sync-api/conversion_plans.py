@@ -0,0 +1,243 @@
+"""
+Conversion Plans - Precompiled per-table field value converters
+
+For every model in TABLE_TO_MODEL the column types are classified once at
+import time into a plan {column_name: converter}. The ingest hot loop in
+memento_to_pg.prepare_entry_data() then only does a dict lookup
+and a converter call per field, instead of looking up the column and
+building/scanning str(column.type) for every field of every entry.
+
+Converters take (value, column_name) and keep the exact semantics of the
+former MementoToPostgreSQLSync._parse_field_value.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+from datetime import datetime
+
+from models import TABLE_TO_MODEL
+from logging_config import is_tracing
+
+logger = logging.getLogger(__name__)
+
+Converter = Callable[[Any, str], Any]
+
+
+def parse_timestamp(ts: Optional[str]) -> Optional[datetime]:
+    """Parse Memento timestamp string to datetime"""
+    if not ts:
+        return None
+
+    try:
+        # Handle ISO format with Z
+        if ts.endswith('Z'):
+            ts = ts.replace('Z', '+00:00')
+        parsed = datetime.fromisoformat(ts)
+        # Columns are TIMESTAMP WITHOUT TIME ZONE holding server-local time
+        # and asyncpg rejects aware datetimes: convert to the local time of
+        # this process, then drop the offset. Run the API with the same TZ
+        # as the database TimeZone setting or the stored times are shifted.
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+    except Exception as e:
+        logger.warning("Failed to parse timestamp %s: %s", ts, e)
+        return None
+
+
+# ==================================================
+# CONVERTERS
+# ==================================================
+
+def convert_boolean(value: Any, column_name: str) -> Optional[bool]:
+    """BOOLEAN: empty string = False (unchecked Memento checkbox)"""
+    trace = is_tracing()
+    if trace:
+        logger.info("BOOLEAN column %r: value=%r, type=%s", column_name, value, type(value).__name__)
+    # Handle None and empty string for boolean columns
+    if value is None:
+        if trace:
+            logger.info("  → Returning None (value is None)")
+        return None
+    if value == '':
+        if trace:
+            logger.info("  → Returning False (empty string)")
+        return False
+    # Convert various representations to boolean
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        # Common boolean string representations
+        value_lower = value.lower().strip()
+        if value_lower in ('true', 'yes', 'ano', '1', 't', 'y'):
+            return True
+        elif value_lower in ('false', 'no', 'nie', '0', 'f', 'n', ''):
+            return False
+        # Non-empty string = True (Memento checkbox field name = checked)
+        return len(value.strip()) > 0
+    if isinstance(value, (int, float)):
+        return value != 0
+    # Default: truthy values = True
+    return bool(value)
+
+
+def convert_time(value: Any, column_name: str) -> Any:
+    """TIME: extract local time from Memento "1970-01-01T07:00:00.000Z" """
+    if value is None or value == '':
+        return None
+
+    # The 'Z' is misleading - it's actually local time, not UTC!
+    # Extract just the time part WITHOUT timezone conversion
+    if isinstance(value, str):
+        try:
+            # Remove 'Z' and milliseconds, parse as naive datetime
+            time_str = value.replace('Z', '').split('.')[0]  # "1970-01-01T07:00:00"
+            result_time = datetime.fromisoformat(time_str).time()
+            if is_tracing():
+                logger.info("Parsing TIME field %r: raw value = %r -> %r -> %s", column_name, value, time_str, result_time)
+            return result_time  # Returns 07:00:00 (local time)
+        except Exception as e:
+            logger.warning("Failed to parse time value %r: %s", value, e)
+            return None
+    return value
+
+
+def convert_date(value: Any, column_name: str) -> Any:
+    """DATE: parse ISO date/datetime strings"""
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+        except Exception as e:
+            logger.warning("Failed to parse date value %r: %s", value, e)
+            return None
+    return value
+
+
+def convert_timestamp(value: Any, column_name: str) -> Optional[datetime]:
+    """TIMESTAMP: parse ISO datetime strings"""
+    if value is None or value == '':
+        return None
+
+    return parse_timestamp(value)
+
+
+def convert_integer(value: Any, column_name: str) -> Any:
+    """INTEGER: parse numeric strings, invalid values become NULL"""
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        # asyncpg does not cast 3.0 to an integer column
+        return int(value)
+    if isinstance(value, str):
+        # Try to parse string to int
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            # Invalid integer value (like "#" or empty string)
+            logger.warning("Invalid integer value for column %r: %r, setting to NULL", column_name, value)
+            return None
+    return value
+
+
+def convert_numeric(value: Any, column_name: str) -> Any:
+    """NUMERIC/DECIMAL: parse numeric strings, invalid values become NULL"""
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        # Try to parse string to number
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            logger.warning("Invalid numeric value for column %r: %r, setting to NULL", column_name, value)
+            return None
+    return value
+
+
+def convert_other(value: Any, column_name: str) -> Any:
+    """Any other type: unwrap linkToEntry dicts, serialize other dicts"""
+    if value is None or value == '':
+        return None
+
+    # Handle dict/object values (linkToEntry that wasn't processed correctly)
+    if isinstance(value, dict):
+        # If it has an 'id' field, extract it
+        if 'id' in value:
+            if is_tracing():
+                logger.info("Extracting ID from dict value for column %r", column_name)
+            return value['id']
+        # Otherwise, convert to JSON string
+        logger.warning("Converting dict to JSON string for column %r", column_name)
+        return json.dumps(value)
+
+    return value
+
+
+def convert_text(value: Any, column_name: str) -> Any:
+    """VARCHAR/TEXT: numbers to strings, then as convert_other"""
+    # asyncpg does not cast numbers to text (e.g. phone numbers)
+    if isinstance(value, (int, float, bool)):
+        return str(value)
+
+    return convert_other(value, column_name)
+
+
+# ==================================================
+# PLANS
+# ==================================================
+
+def classify_column_type(column) -> Converter:
+    """
+    Pick the converter for a SQLAlchemy column (same precedence as the
+    original string checks on str(column.type))
+    """
+    column_type = str(column.type).upper()
+
+    if 'BOOLEAN' in column_type:
+        return convert_boolean
+    if 'TIME' in column_type and 'TIMESTAMP' not in column_type:
+        return convert_time
+    if 'DATE' in column_type and 'TIME' not in column_type:
+        return convert_date
+    if 'TIMESTAMP' in column_type:
+        return convert_timestamp
+    if 'INTEGER' in column_type:
+        return convert_integer
+    if 'NUMERIC' in column_type or 'DECIMAL' in column_type:
+        return convert_numeric
+    if 'CHAR' in column_type or 'TEXT' in column_type:
+        return convert_text
+    return convert_other
+
+
+def build_conversion_plan(model_class) -> Dict[str, Converter]:
+    """Build {column_name: converter} for a model"""
+    return {
+        column.name: classify_column_type(column)
+        for column in model_class.__table__.columns
+    }
+
+
+# Table name -> {column_name: converter}, built once at startup
+CONVERSION_PLANS: Dict[str, Dict[str, Converter]] = {
+    table_name: build_conversion_plan(model_class)
+    for table_name, model_class in TABLE_TO_MODEL.items()
+}
+
+
+def get_conversion_plan(model_class) -> Dict[str, Converter]:
+    """Get (or build and cache) the conversion plan for a model"""
+    plan = CONVERSION_PLANS.get(model_class.__tablename__)
+    if plan is None:
+        plan = CONVERSION_PLANS[model_class.__tablename__] = build_conversion_plan(model_class)
+    return plan
+
@@ -0,0 +1,85 @@
+"""
+Database - Shared async engine, session factory and pool statistics
+
+One connection pool per process, shared by main.py and all routers.
+Size the pool so that workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays
+below PostgreSQL max_connections.
+
+Async sessions pay off while requests wait on the database: with network
+latency, concurrent syncs overlap their round trips. They do not make a
+single sync faster, and with PostgreSQL on the same host the sync path is
+bound by Python CPU in one process - scale that with more workers.
+Concurrent syncs of one library also queue on its memento_sync_metadata
+row until each commit (see benchmark.py sync-entry --sessions).
+"""
+
+import time
+import logging
+from typing import Dict, Any
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+engine = create_async_engine(
+    Config.get_async_pg_url(),
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT,
+    pool_recycle=Config.DB_POOL_RECYCLE,
+    pool_pre_ping=Config.DB_POOL_PRE_PING
+)
+
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+# Connection acquire statistics (time spent waiting for a pooled connection)
+_acquire_stats = {
+    'count': 0,
+    'total_wait': 0.0,
+    'max_wait': 0.0,
+}
+
+
+async def get_db():
+    """Dependency to get DB session (connection is checked out up front)"""
+    async with SessionLocal() as db:
+        start = time.perf_counter()
+        await db.connection()
+        wait = time.perf_counter() - start
+
+        _acquire_stats['count'] += 1
+        _acquire_stats['total_wait'] += wait
+        if wait > _acquire_stats['max_wait']:
+            _acquire_stats['max_wait'] = wait
+
+        yield db
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Get connection pool statistics
+
+    Returns:
+        Pool configuration, current usage and connection wait times
+    """
+    pool = engine.pool
+    count = _acquire_stats['count']
+
+    return {
+        'pool_size': pool.size(),
+        'max_overflow': Config.DB_MAX_OVERFLOW,
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': pool.overflow(),
+        'acquisitions': count,
+        'avg_wait_ms': round(_acquire_stats['total_wait'] / count * 1000, 3) if count else 0.0,
+        'max_wait_ms': round(_acquire_stats['max_wait'] * 1000, 3),
+    }
+
+
+async def dispose() -> None:
+    """Close all pooled connections"""
+    await engine.dispose()
+    logger.info("Database connection pool closed")
@@ -0,0 +1,174 @@
+"""
+Dead Letters - Inspect and replay PostgreSQL → Memento syncs that gave up
+
+pg_listener.py retries a failed sync with backoff (memento_sync_retry) and
+moves the entry to memento_sync_dead_letter after MAX_RETRY_ATTEMPTS
+failures (migration_sync_retry.sql).
+
+- GET /api/memento/dead-letters - List dead letters (newest first)
+- POST /api/memento/dead-letters/replay - Replay selected (ids) or all dead
+  letters; they go back to memento_sync_retry as due now, with a fresh
+  attempt budget, and the listener picks them up on its next retry poll
+"""
+
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth import verify_api_key
+from database import get_db
+from models import SyncDeadLetter, SyncRetry
+import sys
+sys.path.append('..')
+from library_mapping import get_slovak_name_by_table
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class ReplayRequest(BaseModel):
+    """Request model for dead-letter replay"""
+    ids: Optional[List[int]] = None
+    table_name: Optional[str] = None
+    all: bool = False
+
+
+class ReplayResponse(BaseModel):
+    """Response model for dead-letter replay"""
+    success: bool
+    replayed: int
+    message: str
+
+
+@router.get("/api/memento/dead-letters")
+async def list_dead_letters(
+    limit: int = Query(default=50, le=500),
+    offset: int = Query(default=0, ge=0),
+    table_name: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_api_key)
+):
+    """
+    List dead letters
+
+    Args:
+        limit: Maximum number of dead letters to return
+        offset: Number of dead letters to skip
+        table_name: Filter by PostgreSQL table
+
+    Returns:
+        Dead letters, their total and the number of pending retries
+    """
+    try:
+        query = select(SyncDeadLetter)
+
+        if table_name:
+            query = query.filter_by(table_name=table_name)
+
+        dead_letters = (await db.execute(
+            query.order_by(
+                SyncDeadLetter.dead_at.desc(), SyncDeadLetter.id.desc()
+            ).limit(limit).offset(offset)
+        )).scalars().all()
+
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        pending_retries = await db.scalar(select(func.count()).select_from(SyncRetry))
+
+        return {
+            'dead_letters': [
+                {
+                    'id': d.id,
+                    'table_name': d.table_name,
+                    'library_name': get_slovak_name_by_table(d.table_name),
+                    'entry_id': d.entry_id,
+                    'operation': d.operation,
+                    'attempts': d.attempts,
+                    'last_error': d.last_error,
+                    'first_failed_at': d.first_failed_at.isoformat(),
+                    'dead_at': d.dead_at.isoformat()
+                }
+                for d in dead_letters
+            ],
+            'total': total,
+            'pending_retries': pending_retries,
+            'limit': limit,
+            'offset': offset
+        }
+
+    except Exception as e:
+        logger.error(f"Error listing dead letters: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/api/memento/dead-letters/replay", response_model=ReplayResponse)
+async def replay_dead_letters(
+    request: ReplayRequest,
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_api_key)
+):
+    """
+    Replay dead letters
+
+    Selected by `ids`, or every dead letter (optionally of `table_name`) with
+    `all: true`. Several dead letters of one entry are replayed once, with
+    the operation of the newest.
+    """
+    if not request.ids and not request.all:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Specify ids or set all=true"
+        )
+
+    try:
+        result = await db.execute(
+            text("""
+                WITH replayed AS (
+                    DELETE FROM memento_sync_dead_letter
+                    WHERE (CAST(:ids AS BIGINT[]) IS NULL OR id = ANY(CAST(:ids AS BIGINT[])))
+                      AND (CAST(:table_name AS VARCHAR) IS NULL OR table_name = CAST(:table_name AS VARCHAR))
+                    RETURNING table_name, entry_id, operation, last_error, first_failed_at, dead_at
+                )
+                INSERT INTO memento_sync_retry
+                    (table_name, entry_id, operation, attempts, next_attempt_at, last_error, first_failed_at)
+                SELECT DISTINCT ON (table_name, entry_id)
+                    table_name, entry_id, operation, 0, NOW(), last_error, first_failed_at
+                FROM replayed
+                ORDER BY table_name, entry_id, dead_at DESC
+                ON CONFLICT (table_name, entry_id) DO UPDATE
+                SET attempts = 0,
+                    next_attempt_at = NOW(),
+                    locked_by = NULL,
+                    updated_at = NOW()
+                RETURNING id
+            """),
+            {
+                'ids': request.ids or None,
+                'table_name': request.table_name
+            }
+        )
+        replayed = len(result.fetchall())
+        await db.commit()
+
+        logger.info(f"Replayed {replayed} dead letters")
+
+        return ReplayResponse(
+            success=True,
+            replayed=replayed,
+            message=f"{replayed} entries scheduled for retry"
+        )
+
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error replaying dead letters: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
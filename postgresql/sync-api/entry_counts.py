@@ -0,0 +1,62 @@
+"""
+Entry Counts - Reconciliation of trigger-maintained entry counters
+
+memento_sync_metadata.entry_count is kept up to date incrementally by the
+statement-level triggers from migration_entry_counters.sql. This module
+recomputes exact counts periodically to fix drift (e.g. rows changed while
+the triggers were disabled or before the migration was applied).
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_entry_counts(db: AsyncSession) -> List[Dict[str, Any]]:
+    """
+    Recompute entry counts for all synced tables
+
+    Args:
+        db: Database session
+
+    Returns:
+        List of drifted tables with stored and actual counts
+    """
+    result = await db.execute(text("SELECT * FROM memento_reconcile_entry_counts()"))
+    drift = [dict(row._mapping) for row in result]
+    await db.commit()
+
+    for row in drift:
+        logger.warning(
+            f"Entry count drift fixed for {row['drift_table']}: "
+            f"{row['stored_count']} -> {row['actual_count']}"
+        )
+
+    return drift
+
+
+async def run_reconcile_loop(session_factory, interval: int) -> None:
+    """
+    Reconcile entry counts every `interval` seconds until cancelled
+
+    Args:
+        session_factory: async_sessionmaker for new database sessions
+        interval: Seconds between reconciliations
+    """
+    logger.info(f"Entry count reconciliation every {interval}s")
+
+    while True:
+        await asyncio.sleep(interval)
+
+        async with session_factory() as db:
+            try:
+                drift = await reconcile_entry_counts(db)
+                logger.info(f"Entry count reconciliation done ({len(drift)} tables drifted)")
+            except Exception as e:
+                logger.error(f"Entry count reconciliation failed: {e}")
+                await db.rollback()
@@ -4,10 +4,15 @@ Field Name Mapper - Translates Slovak Memento field names to English PostgreSQL
 This module provides mappings from Slovak field names (as they appear in Memento Database)
 to English column names (as they are defined in PostgreSQL tables).
 
-Each library has its own field mapping dictionary.
+Each library has its own field mapping dictionary. At import the mappings are
+compiled into read-only indexes (forward, reverse, junction fields) keyed by
+library ID and library name, so every lookup on the ingest path is a dict probe.
 """
 
-from typing import Dict, Optional
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 
 # Dochádzka (Attendance) field mappings
 # Library ID: zNoMvrv8U (CORRECT ID - was incorrectly using qU4Br5hU6 before!)
@@ -295,6 +300,58 @@ FIELD_MAPPINGS_BY_NAME: Dict[str, Dict[str, str]] = {
 }
 
 
+# Junction (many-to-many) fields per library ID
+JUNCTION_FIELDS: Dict[str, list] = {
+    "zNoMvrv8U": ["Zamestnanci", "Notifikácie"],  # Dochádzka (CORRECT ID!)
+    "ArdaPo5TU": ["Zamestnanci", "Mechanizácia"],  # Záznam prác
+    "rh7YHaVRM": ["Klienti", "Dokument"],  # Klienti - self-reference and documents
+    "NffZSLRKU": ["Partner"],  # Partneri - self-reference
+}
+
+
+# ==================================================
+# LOOKUP INDEXES (built once at import, read-only)
+# ==================================================
+
+_EMPTY: Mapping[str, str] = MappingProxyType({})
+
+_CAMEL_BOUNDARY = re.compile('(.)([A-Z][a-z]+)')
+_LOWER_UPPER_BOUNDARY = re.compile('([a-z0-9])([A-Z])')
+
+
+def _build_forward_index() -> Mapping[str, Mapping[str, str]]:
+    """Library ID or name -> {Slovak field name: column name}"""
+    index = {}
+    for key, field_map in list(FIELD_MAPPINGS_BY_NAME.items()) + list(FIELD_MAPPINGS.items()):
+        index[key] = MappingProxyType(dict(field_map))
+    return MappingProxyType(index)
+
+
+def _build_reverse_index() -> Mapping[str, Mapping[str, str]]:
+    """Library ID or name -> {column name: Slovak field name} (first Slovak name wins)"""
+    index = {}
+    for key, field_map in list(FIELD_MAPPINGS_BY_NAME.items()) + list(FIELD_MAPPINGS.items()):
+        reverse = {}
+        for slovak, english in field_map.items():
+            reverse.setdefault(english, slovak)
+        index[key] = MappingProxyType(reverse)
+    return MappingProxyType(index)
+
+
+_FORWARD_INDEX = _build_forward_index()
+_REVERSE_INDEX = _build_reverse_index()
+_JUNCTION_INDEX: Mapping[str, frozenset] = MappingProxyType({
+    library_id: frozenset(fields) for library_id, fields in JUNCTION_FIELDS.items()
+})
+
+
+@lru_cache(maxsize=4096)
+def to_snake_case(field_name: str) -> str:
+    """Fallback column name for unmapped fields (cached, regexes precompiled)"""
+    s1 = _CAMEL_BOUNDARY.sub(r'\1_\2', field_name)
+    return _LOWER_UPPER_BOUNDARY.sub(r'\1_\2', s1).lower()
+
+
 def get_column_name(library_id: str, slovak_field_name: str, library_name: Optional[str] = None) -> str:
     """
     Get English PostgreSQL column name for a Slovak Memento field name
@@ -308,21 +365,36 @@ def get_column_name(library_id: str, slovak_field_name: str, library_name: Optio
         English column name (e.g., "date"), or snake_case version of input if not found
     """
     # Try lookup by library ID
-    field_map = FIELD_MAPPINGS.get(library_id)
-    if field_map and slovak_field_name in field_map:
-        return field_map[slovak_field_name]
+    column_name = _FORWARD_INDEX.get(library_id, _EMPTY).get(slovak_field_name)
+    if column_name is not None:
+        return column_name
 
     # Fallback: try lookup by library name
     if library_name:
-        field_map = FIELD_MAPPINGS_BY_NAME.get(library_name)
-        if field_map and slovak_field_name in field_map:
-            return field_map[slovak_field_name]
+        column_name = _FORWARD_INDEX.get(library_name, _EMPTY).get(slovak_field_name)
+        if column_name is not None:
+            return column_name
 
     # Fallback: convert to snake_case
-    import re
-    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', slovak_field_name)
-    s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
-    return s2.lower()
+    return to_snake_case(slovak_field_name)
+
+
+def get_field_name(library_id: Optional[str], column_name: str, library_name: Optional[str] = None) -> Optional[str]:
+    """
+    Get Slovak Memento field name for an English PostgreSQL column name
+
+    Args:
+        library_id: Memento library ID (may be None)
+        column_name: English column name (e.g., "employees")
+        library_name: Optional Slovak library name for fallback lookup
+
+    Returns:
+        Slovak field name (e.g., "Zamestnanci"), or None if not mapped
+    """
+    field_name = _REVERSE_INDEX.get(library_id, _EMPTY).get(column_name)
+    if field_name is None and library_name:
+        field_name = _REVERSE_INDEX.get(library_name, _EMPTY).get(column_name)
+    return field_name
 
 
 def is_junction_field(library_id: str, slovak_field_name: str) -> bool:
@@ -336,11 +408,4 @@ def is_junction_field(library_id: str, slovak_field_name: str) -> bool:
     Returns:
         True if field should use junction table, False otherwise
     """
-    junction_fields = {
-        "zNoMvrv8U": ["Zamestnanci", "Notifikácie"],  # Dochádzka (CORRECT ID!)
-        "ArdaPo5TU": ["Zamestnanci", "Mechanizácia"],  # Záznam prác
-        "rh7YHaVRM": ["Klienti", "Dokument"],  # Klienti - self-reference and documents
-        "NffZSLRKU": ["Partner"],  # Partneri - self-reference
-    }
-
-    return slovak_field_name in junction_fields.get(library_id, [])
+    return slovak_field_name in _JUNCTION_INDEX.get(library_id, ())
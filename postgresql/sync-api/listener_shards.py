@@ -0,0 +1,249 @@
+"""
+Listener Shards - Split PostgreSQL → Memento work between listener processes
+
+With LISTENER_SHARDS > 0 every outbox / retry row belongs to one of
+LISTENER_SHARDS hash buckets of its entry (shard_expression()). Shards are
+leased in memento_listener_shards (migration_listener_shards.sql) and a
+listener only claims rows of its own shards, so one entry is never
+processed by two listeners at once.
+
+Every LISTENER_SHARD_LEASE / 3 seconds each listener heartbeats in
+memento_listener_instances, renews its leases and rebalances to
+ceil(LISTENER_SHARDS / live listeners) shards:
+
+- join: the others stop claiming their excess shards and release each one
+  once its in-flight events are done; the newcomer picks them up
+- death: heartbeat and leases expire after LISTENER_SHARD_LEASE seconds,
+  the remaining listeners take the shards over
+- a listener that cannot renew stops claiming before its leases expire,
+  and its workers drop queued events of shards it no longer holds
+  (holds()) instead of processing them next to the new owner
+
+Usage:
+    shards = ShardManager(listener_id)
+    shards.pool = pool
+    asyncio.create_task(shards.run())
+    ...
+    shards.claimable()  # shard numbers to claim rows of (None = sharding off)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional
+
+import asyncpg
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Stop claiming this share of the lease before it expires
+LEASE_SAFETY_MARGIN = 0.2
+
+
+def shard_expression(table_column: str, entry_column: str, shards_param: str) -> str:
+    """SQL expression of the shard of a row (stable across processes and restarts)"""
+    return f"(hashtext({table_column} || ':' || {entry_column}) & 2147483647) % {shards_param}"
+
+
+class ShardManager:
+    """Shard leases of one listener process"""
+
+    def __init__(self, listener_id: str, num_shards: Optional[int] = None, lease: Optional[float] = None):
+        self.listener_id = listener_id
+        self.num_shards = Config.LISTENER_SHARDS if num_shards is None else num_shards
+        self.lease = float(lease or Config.LISTENER_SHARD_LEASE)
+        self.pool: Optional[asyncpg.Pool] = None
+
+        self.owned: set = set()
+        self.draining: set = set()
+        self.inflight: Dict[int, int] = {}
+        self.valid_until = 0.0
+        self.initialized = False
+
+        # Statistics
+        self.live_listeners = 0
+        self.rebalances = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.num_shards > 0
+
+    def claimable(self) -> Optional[List[int]]:
+        """Shards this listener may claim rows of (None = sharding disabled)"""
+        if not self.enabled:
+            return None
+        if time.monotonic() >= self.valid_until:
+            return []
+        return sorted(self.owned - self.draining)
+
+    def holds(self, shard: Optional[int]) -> bool:
+        """Whether events of a shard may still be processed (lease owned and valid)"""
+        if not self.enabled or shard is None:
+            return True
+        return shard in self.owned and time.monotonic() < self.valid_until
+
+    def acquire(self, shard: Optional[int]) -> None:
+        """Count a claimed event of a shard as in flight"""
+        if shard is not None:
+            self.inflight[shard] = self.inflight.get(shard, 0) + 1
+
+    def release(self, shard: Optional[int]) -> None:
+        """Event of a shard completed"""
+        if shard is None:
+            return
+        count = self.inflight.get(shard, 0) - 1
+        if count > 0:
+            self.inflight[shard] = count
+        else:
+            self.inflight.pop(shard, None)
+
+    async def run(self) -> None:
+        """Heartbeat and rebalance every LISTENER_SHARD_LEASE / 3 seconds"""
+        interval = max(1.0, self.lease / 3)
+
+        while True:
+            if self.pool:
+                try:
+                    await self.rebalance()
+                except Exception as e:
+                    logger.error(f"Shard rebalance failed: {e}")
+
+            await asyncio.sleep(interval)
+
+    async def rebalance(self) -> None:
+        """Heartbeat, renew leases, hand over excess shards and claim missing ones"""
+        started = time.monotonic()
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                if not self.initialized:
+                    await conn.execute(
+                        """
+                        INSERT INTO memento_listener_shards (shard)
+                        SELECT generate_series(0, $1 - 1)
+                        ON CONFLICT (shard) DO NOTHING
+                        """,
+                        self.num_shards
+                    )
+
+                await conn.execute(
+                    """
+                    INSERT INTO memento_listener_instances (listener_id, heartbeat_at)
+                    VALUES ($1, NOW())
+                    ON CONFLICT (listener_id) DO UPDATE SET heartbeat_at = NOW()
+                    """,
+                    self.listener_id
+                )
+                await conn.execute(
+                    "DELETE FROM memento_listener_instances WHERE heartbeat_at < NOW() - make_interval(secs => $1)",
+                    self.lease
+                )
+                live = await conn.fetchval("SELECT COUNT(*) FROM memento_listener_instances")
+                target = -(-self.num_shards // max(1, live))
+
+                owned = {
+                    row['shard'] for row in await conn.fetch(
+                        """
+                        UPDATE memento_listener_shards
+                        SET lease_until = NOW() + make_interval(secs => $2)
+                        WHERE owner = $1 AND shard < $3
+                        RETURNING shard
+                        """,
+                        self.listener_id,
+                        self.lease,
+                        self.num_shards
+                    )
+                }
+
+                # Excess shards: stop claiming, release once drained
+                excess = max(0, len(owned) - target)
+                draining = sorted(self.draining & owned)[:excess]
+                for shard in sorted(owned - set(draining), reverse=True)[:excess - len(draining)]:
+                    draining.append(shard)
+
+                released = [shard for shard in draining if not self.inflight.get(shard)]
+                if released:
+                    await conn.execute(
+                        """
+                        UPDATE memento_listener_shards
+                        SET owner = NULL, lease_until = NULL
+                        WHERE owner = $1 AND shard = ANY($2::int[])
+                        """,
+                        self.listener_id,
+                        released
+                    )
+                    owned.difference_update(released)
+
+                # Missing shards: free ones or those of dead listeners
+                missing = target - len(owned)
+                if missing > 0:
+                    rows = await conn.fetch(
+                        """
+                        UPDATE memento_listener_shards s
+                        SET owner = $1, lease_until = NOW() + make_interval(secs => $2), assigned_at = NOW()
+                        FROM (
+                            SELECT shard FROM memento_listener_shards
+                            WHERE shard < $4 AND (owner IS NULL OR lease_until < NOW())
+                            ORDER BY shard
+                            LIMIT $3
+                            FOR UPDATE SKIP LOCKED
+                        ) free
+                        WHERE s.shard = free.shard
+                        RETURNING s.shard
+                        """,
+                        self.listener_id,
+                        self.lease,
+                        missing,
+                        self.num_shards
+                    )
+                    owned.update(row['shard'] for row in rows)
+
+        self.initialized = True
+        self.draining = set(draining) - set(released)
+        self.valid_until = started + self.lease * (1 - LEASE_SAFETY_MARGIN)
+        self.live_listeners = live
+
+        if owned != self.owned:
+            self.rebalances += 1
+            logger.info(
+                f"Shards: {len(owned)}/{self.num_shards} owned, {len(self.draining)} draining "
+                f"({live} listeners)"
+            )
+        self.owned = owned
+
+    async def release_all(self) -> None:
+        """Give up all shards and deregister (graceful shutdown)"""
+        if not self.enabled or not self.pool:
+            return
+
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        "UPDATE memento_listener_shards SET owner = NULL, lease_until = NULL WHERE owner = $1",
+                        self.listener_id
+                    )
+                    await conn.execute(
+                        "DELETE FROM memento_listener_instances WHERE listener_id = $1",
+                        self.listener_id
+                    )
+            logger.info(f"Released {len(self.owned)} shards")
+        except Exception as e:
+            # Leases expire on their own
+            logger.error(f"Failed to release shards: {e}")
+        finally:
+            self.owned = set()
+            self.valid_until = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Shard ownership"""
+        return {
+            'enabled': self.enabled,
+            'total': self.num_shards,
+            'owned': sorted(self.owned),
+            'draining': sorted(self.draining),
+            'live_listeners': self.live_listeners,
+            'rebalances': self.rebalances,
+        }
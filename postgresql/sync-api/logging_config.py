@@ -0,0 +1,148 @@
+"""
+Logging Config - Queue-based log handlers and per-request debug tracing
+
+- configure_logging(): the root logger gets a single QueueHandler; file and
+  console handlers run on a QueueListener thread, so Config.LOG_FILE writes
+  never block request handling or the event loop
+- LOG_STRUCTURED: one JSON object per line (extra= fields included)
+- Debug traces (per entry / per field) are off by default and enabled per
+  request by the LOG_TRACE_HEADER header, for libraries listed in
+  LOG_TRACE_LIBRARIES, or for a random LOG_TRACE_SAMPLE_RATE share of requests
+
+Hot paths check is_tracing() once and log with lazy %-style arguments:
+
+    if is_tracing():
+        logger.info("Mapping field %r -> column %r", field_name, column_name)
+"""
+
+import json
+import logging
+import queue
+import random
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from starlette.datastructures import Headers
+
+from config import Config
+
+_trace_enabled: ContextVar[bool] = ContextVar('memento_trace_enabled', default=False)
+_trace_libraries = frozenset(Config.LOG_TRACE_LIBRARIES)
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as single-line JSON objects"""
+
+    # Attributes every LogRecord has; anything else was passed via extra=
+    RESERVED = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED:
+                payload[key] = value
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def configure_logging(level: Optional[str] = None) -> QueueListener:
+    """
+    Route all logging through a queue to file/console handlers
+
+    Args:
+        level: Log level name (default Config.LOG_LEVEL)
+
+    Returns:
+        The running QueueListener (stopped by shutdown_logging)
+    """
+    global _listener
+    if _listener:
+        return _listener
+
+    formatter = JsonFormatter() if Config.LOG_STRUCTURED else logging.Formatter(Config.LOG_FORMAT)
+
+    handlers = [logging.StreamHandler()]
+    if Config.LOG_FILE:
+        handlers.insert(0, logging.FileHandler(Config.LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level or Config.LOG_LEVEL))
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued log records and stop the listener thread"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+# ==================================================
+# DEBUG TRACING
+# ==================================================
+
+def is_tracing() -> bool:
+    """True if debug traces are enabled for the current request/task"""
+    return _trace_enabled.get()
+
+
+def start_request_trace(header_value: Optional[str] = None) -> bool:
+    """
+    Decide whether the current request is traced (header or sampling)
+
+    Args:
+        header_value: Value of the LOG_TRACE_HEADER request header
+
+    Returns:
+        True if tracing is enabled
+    """
+    enabled = (
+        (header_value is not None and header_value.lower() in ('1', 'true', 'yes', 'on'))
+        or (Config.LOG_TRACE_SAMPLE_RATE > 0 and random.random() < Config.LOG_TRACE_SAMPLE_RATE)
+    )
+    _trace_enabled.set(enabled)
+    return enabled
+
+
+def trace_library(library_id: Optional[str], library_name: Optional[str]) -> bool:
+    """
+    Enable tracing for allowlisted libraries (LOG_TRACE_LIBRARIES)
+
+    Returns:
+        True if tracing is enabled for the current request/task
+    """
+    if _trace_libraries and (library_id in _trace_libraries or library_name in _trace_libraries):
+        _trace_enabled.set(True)
+    return _trace_enabled.get()
+
+
+class TraceMiddleware:
+    """ASGI middleware: start a debug trace per request (see start_request_trace)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            start_request_trace(Headers(scope=scope).get(Config.LOG_TRACE_HEADER))
+        await self.app(scope, receive, send)
@@ -9,10 +9,15 @@ Endpoints:
 - DELETE /api/memento/from-memento/{library_id}/{entry_id} - Delete entry
 - GET /api/memento/health - Health check
 - GET /api/memento/stats - Sync statistics
-- POST /api/memento/bulk-sync/{library_id} - Bulk sync library
-- GET /api/memento/conflicts - List conflicts
+- POST /api/memento/bulk-sync/{library_id} - Bulk sync library (streamed NDJSON / JSON array)
+- GET /api/memento/conflicts - List conflicts (cursor pagination)
+- GET /api/memento/logs - Sync logs (cursor pagination)
+- GET /api/memento/dead-letters - List syncs to Memento that exhausted their retries
+- POST /api/memento/dead-letters/replay - Replay dead letters
+- GET /api/memento/pool - Database connection pool statistics
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -21,28 +26,29 @@ from fastapi import FastAPI, HTTPException, Depends, status, Query
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import text, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import Config
 from auth import verify_api_key
+from database import engine, SessionLocal, get_db, pool_stats, dispose
 from models import Base, SyncLog, SyncMetadata, SyncConflict
 from memento_to_pg import MementoToPostgreSQLSync
+from entry_counts import run_reconcile_loop
+from sync_log_partitions import run_partition_loop
+from sync_log_buffer import get_sync_log_buffer
+from pagination import COUNT_MODES, keyset_page, count_rows
+from logging_config import configure_logging, shutdown_logging, TraceMiddleware
 from sync_logs import router as logs_router
 from universal_sync_endpoint import router as universal_router
+from bulk_sync import router as bulk_sync_router
+from dead_letters import router as dead_letters_router
 import sys
 sys.path.append('..')
 from library_mapping import get_table_name, get_slovak_name_by_id, LIBRARY_MAP
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, Config.LOG_LEVEL),
-    format=Config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(Config.LOG_FILE) if Config.LOG_FILE else logging.StreamHandler(),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging (queue-based, see logging_config.py)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
@@ -63,23 +69,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request debug tracing (LOG_TRACE_HEADER / LOG_TRACE_SAMPLE_RATE)
+app.add_middleware(TraceMiddleware)
+
 # Include routers
 app.include_router(logs_router)
 app.include_router(universal_router)
-
-# Database setup
-engine = create_engine(Config.get_async_pg_url().replace('+asyncpg', ''))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
+app.include_router(bulk_sync_router)
+app.include_router(dead_letters_router)
 
 # ==================================================
 # REQUEST/RESPONSE MODELS
@@ -128,7 +125,7 @@ class StatsResponse(BaseModel):
 # ==================================================
 
 @app.get("/api/memento/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """
     Health check endpoint
 
@@ -136,7 +133,7 @@ async def health_check(db: Session = Depends(get_db)):
     """
     try:
         # Test database connection
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
 
         return HealthResponse(
             status="healthy",
@@ -154,7 +151,7 @@ async def health_check(db: Session = Depends(get_db)):
 
 @app.get("/api/memento/stats", response_model=StatsResponse)
 async def get_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """
@@ -169,27 +166,31 @@ async def get_stats(
     """
     try:
         # Get total libraries
-        total_libraries = db.query(SyncMetadata).filter_by(sync_enabled=True).count()
+        total_libraries = await db.scalar(
+            select(func.count()).select_from(SyncMetadata).filter_by(sync_enabled=True)
+        )
 
         # Get total entries
-        total_entries = db.query(SyncMetadata).with_entities(
-            text("SUM(entry_count)")
-        ).scalar() or 0
+        total_entries = await db.scalar(
+            select(func.sum(SyncMetadata.entry_count))
+        ) or 0
 
         # Get last sync time
-        last_sync_obj = db.query(SyncMetadata).order_by(
-            SyncMetadata.last_sync.desc()
-        ).first()
-        last_sync = last_sync_obj.last_sync.isoformat() if last_sync_obj and last_sync_obj.last_sync else None
+        last_sync_time = await db.scalar(select(func.max(SyncMetadata.last_sync)))
+        last_sync = last_sync_time.isoformat() if last_sync_time else None
 
         # Get errors in last 24 hours
-        sync_errors_24h = db.query(SyncLog).filter(
-            SyncLog.success == False,
-            SyncLog.sync_time >= text("NOW() - INTERVAL '24 hours'")
-        ).count()
+        sync_errors_24h = await db.scalar(
+            select(func.count()).select_from(SyncLog).filter(
+                SyncLog.success == False,
+                SyncLog.sync_time >= text("NOW() - INTERVAL '24 hours'")
+            )
+        )
 
         # Get unresolved conflicts
-        conflicts_unresolved = db.query(SyncConflict).filter_by(resolved=False).count()
+        conflicts_unresolved = await db.scalar(
+            select(func.count()).select_from(SyncConflict).filter_by(resolved=False)
+        )
 
         return StatsResponse(
             total_libraries=total_libraries,
@@ -211,7 +212,7 @@ async def get_stats(
 async def sync_from_memento(
     library_id: str,
     entry: MementoEntry,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """
@@ -282,7 +283,7 @@ async def sync_from_memento(
 async def delete_from_memento(
     library_id: str,
     entry_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """
@@ -350,34 +351,41 @@ async def delete_from_memento(
 
 @app.get("/api/memento/conflicts")
 async def list_conflicts(
-    limit: int = Query(default=50, le=500),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = None,
     offset: int = Query(default=0, ge=0),
+    count: str = Query(default='estimate', enum=list(COUNT_MODES)),
     resolved: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """
-    List sync conflicts
+    List sync conflicts (newest first)
 
     Args:
         limit: Maximum number of conflicts to return
-        offset: Number of conflicts to skip
+        cursor: next_cursor of the previous page
+        offset: Number of conflicts to skip (without cursor; slow on deep pages)
+        count: Total - 'exact', 'estimate' (planner statistics) or 'none'
         resolved: Filter by resolved status (None = all)
 
     Returns:
-        List of conflicts
+        List of conflicts and the cursor of the next page
     """
     try:
-        query = db.query(SyncConflict)
+        query = select(SyncConflict)
 
         if resolved is not None:
             query = query.filter_by(resolved=resolved)
 
-        conflicts = query.order_by(
-            SyncConflict.conflict_time.desc()
-        ).limit(limit).offset(offset).all()
+        try:
+            conflicts, next_cursor = await keyset_page(
+                db, query, SyncConflict.conflict_time, SyncConflict.id, limit, cursor, offset
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        total = query.count()
+        total = await count_rows(db, query, count)
 
         return {
             'conflicts': [
@@ -394,11 +402,15 @@ async def list_conflicts(
                 }
                 for c in conflicts
             ],
+            'next_cursor': next_cursor,
             'total': total,
+            'total_estimated': count == 'estimate',
             'limit': limit,
             'offset': offset
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing conflicts: {e}")
         raise HTTPException(
@@ -407,9 +419,22 @@ async def list_conflicts(
         )
 
 
+@app.get("/api/memento/pool")
+async def get_pool_stats(
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Get database connection pool statistics
+
+    Returns:
+        Pool size, checked out / overflow connections and connection wait times
+    """
+    return pool_stats()
+
+
 @app.get("/api/memento/libraries")
 async def list_libraries(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """
@@ -419,7 +444,9 @@ async def list_libraries(
         List of libraries and their sync status
     """
     try:
-        libraries = db.query(SyncMetadata).order_by(SyncMetadata.library_name).all()
+        libraries = (await db.execute(
+            select(SyncMetadata).order_by(SyncMetadata.library_name)
+        )).scalars().all()
 
         return {
             'libraries': [
@@ -448,27 +475,31 @@ async def list_libraries(
 
 @app.get("/api/memento/logs")
 async def get_sync_logs(
-    limit: int = Query(default=100, le=1000),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     offset: int = Query(default=0, ge=0),
+    count: str = Query(default='estimate', enum=list(COUNT_MODES)),
     success: Optional[bool] = None,
     library_id: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """
-    Get sync operation logs
+    Get sync operation logs (newest first)
 
     Args:
         limit: Maximum number of logs to return
-        offset: Number of logs to skip
+        cursor: next_cursor of the previous page
+        offset: Number of logs to skip (without cursor; slow on deep pages)
+        count: Total - 'exact', 'estimate' (planner statistics) or 'none'
         success: Filter by success status
         library_id: Filter by library ID
 
     Returns:
-        List of sync logs
+        List of sync logs and the cursor of the next page
     """
     try:
-        query = db.query(SyncLog)
+        query = select(SyncLog)
 
         if success is not None:
             query = query.filter_by(success=success)
@@ -476,11 +507,14 @@ async def get_sync_logs(
         if library_id:
             query = query.filter_by(library_id=library_id)
 
-        logs = query.order_by(
-            SyncLog.sync_time.desc()
-        ).limit(limit).offset(offset).all()
+        try:
+            logs, next_cursor = await keyset_page(
+                db, query, SyncLog.sync_time, SyncLog.id, limit, cursor, offset
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        total = query.count()
+        total = await count_rows(db, query, count)
 
         return {
             'logs': [
@@ -496,11 +530,15 @@ async def get_sync_logs(
                 }
                 for log in logs
             ],
+            'next_cursor': next_cursor,
             'total': total,
+            'total_estimated': count == 'estimate',
             'limit': limit,
             'offset': offset
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting logs: {e}")
         raise HTTPException(
@@ -525,11 +563,25 @@ async def startup_event():
         logger.info("✅ Configuration validated")
 
         # Test database connection
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         logger.info("✅ Database connection successful")
 
+        # Write-behind memento_sync_log inserts
+        get_sync_log_buffer().start()
+
+        # Periodic fix of drift in trigger-maintained entry counts
+        if Config.ENTRY_COUNT_RECONCILE_INTERVAL > 0:
+            app.state.reconcile_task = asyncio.create_task(
+                run_reconcile_loop(SessionLocal, Config.ENTRY_COUNT_RECONCILE_INTERVAL)
+            )
+
+        # Upcoming / expired memento_sync_log partitions
+        if Config.SYNC_LOG_PARTITION_INTERVAL > 0:
+            app.state.partition_task = asyncio.create_task(
+                run_partition_loop(SessionLocal, Config.SYNC_LOG_PARTITION_INTERVAL)
+            )
+
         logger.info("=== Sync API Ready ===")
 
     except Exception as e:
@@ -542,6 +594,15 @@ async def shutdown_event():
     """Run on application shutdown"""
     logger.info("=== Memento PostgreSQL Sync API Shutting Down ===")
 
+    for task_name in ('reconcile_task', 'partition_task'):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+
+    await get_sync_log_buffer().close()
+    await dispose()
+    shutdown_logging()
+
 
 # ==================================================
 # ERROR HANDLERS
@@ -0,0 +1,142 @@
+"""
+Memento HTTP Client - Long-lived pooled aiohttp session for the Memento API
+
+Owned by a long-running process (pg_listener.py) and shared by all
+PostgreSQLToMementoSync instances, so events reuse keep-alive connections
+instead of paying TCP + TLS setup per notification.
+
+- Connection pool: HTTP_POOL_SIZE connections, idle ones kept for
+  HTTP_KEEPALIVE_TIMEOUT seconds
+- DNS cache: HTTP_DNS_CACHE_TTL seconds
+- Timeouts: HTTP_TIMEOUT seconds per request (connect capped at 10s)
+- Latency: every request is timed (p50/p99 in stats(), histogram for
+  metrics), new vs reused connections are counted
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+import aiohttp
+
+from config import Config
+from metrics import Histogram, LATENCY_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept for percentiles
+LATENCY_WINDOW = 1000
+
+
+def _percentile(values, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class MementoHttpClient:
+    """Pooled aiohttp session with request latency statistics"""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or Config.MEMENTO_API_KEY
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.lock = asyncio.Lock()
+
+        # Statistics
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+        self.latency_histogram = Histogram(LATENCY_BUCKETS)
+        self.requests = 0
+        self.errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """Request timing and connection reuse hooks"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.start = time.perf_counter()
+
+        async def on_request_end(session, context, params):
+            elapsed = time.perf_counter() - context.start
+            self.requests += 1
+            self.latencies_ms.append(elapsed * 1000)
+            self.latency_histogram.observe(elapsed)
+
+        async def on_request_exception(session, context, params):
+            self.errors += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session (created on first use)"""
+        if self.session and not self.session.closed:
+            return self.session
+
+        async with self.lock:
+            if not self.session or self.session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=Config.HTTP_POOL_SIZE,
+                    ttl_dns_cache=Config.HTTP_DNS_CACHE_TTL,
+                    keepalive_timeout=Config.HTTP_KEEPALIVE_TIMEOUT
+                )
+                self.session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(
+                        total=Config.HTTP_TIMEOUT,
+                        connect=min(10, Config.HTTP_TIMEOUT)
+                    ),
+                    headers={
+                        'Authorization': f'Bearer {self.api_key}',
+                        'Content-Type': 'application/json'
+                    },
+                    trace_configs=[self._trace_config()]
+                )
+                logger.info(
+                    f"Memento HTTP client started (pool {Config.HTTP_POOL_SIZE}, "
+                    f"timeout {Config.HTTP_TIMEOUT}s)"
+                )
+
+        return self.session
+
+    async def close(self) -> None:
+        """Close pooled connections (graceful shutdown)"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+            # Give SSL transports a moment to close cleanly (aiohttp recommendation)
+            await asyncio.sleep(0.25)
+            logger.info("Memento HTTP client closed")
+        self.session = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Request statistics
+
+        Returns:
+            Request/error counts, connection reuse and latency percentiles (ms)
+        """
+        latencies = list(self.latencies_ms)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'latency_p50_ms': round(_percentile(latencies, 50), 1),
+            'latency_p99_ms': round(_percentile(latencies, 99), 1),
+        }
@@ -5,36 +5,353 @@ Handles sync from Memento Database to PostgreSQL:
 - Receives entry data from Memento trigger scripts
 - Transforms to PostgreSQL format
 - Performs UPSERT (INSERT or UPDATE)
-- Logs sync operations
+- Records the written field values (sync_snapshots.py), so the reverse
+  direction only pushes later changes
+- Logs sync operations (through the write-behind buffer of
+  sync_log_buffer.py once the unit of work is committed)
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, date, time
-from sqlalchemy.orm import Session
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from sqlalchemy import text, select, update, delete, func, literal, bindparam
 
 from models import (
-    Base, SyncLog, SyncMetadata, TABLE_TO_MODEL,
+    Base, SyncLog, SyncMetadata, SyncSnapshot, TABLE_TO_MODEL,
     WorkRecordEmployee, AttendanceEmployee, RideLogCrew, RideLogOrder,
     WorkRecordMachinery, CashBookObligation, CashBookReceivable
 )
 from field_mapper import FieldTypeMapper
-from field_name_mapper import get_column_name, is_junction_field
+from field_name_mapper import get_column_name, get_field_name, is_junction_field
+from conversion_plans import get_conversion_plan, parse_timestamp
+from sync_snapshots import data_snapshot
+from sync_log_buffer import get_sync_log_buffer
+from logging_config import is_tracing, trace_library
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Junction table -> (parent column, child column)
+JUNCTION_COLUMNS = {
+    'memento_work_records_employees': ('work_record_id', 'employee_id'),
+    'memento_attendance_employees': ('attendance_id', 'employee_id'),
+    'memento_ride_log_crew': ('ride_log_id', 'employee_id'),
+    'memento_ride_log_orders': ('ride_log_id', 'order_id'),
+    'memento_work_records_machinery': ('work_record_id', 'machinery_id'),
+    'memento_cash_book_obligations': ('cash_book_id', 'obligation_id'),
+    'memento_cash_book_receivables': ('cash_book_id', 'receivable_id'),
+}
+
+# Main table -> {English field name: (junction table, child column)}
+JUNCTION_MAPPINGS = {
+    'memento_work_records': {
+        'employees': ('memento_work_records_employees', 'employee_id'),
+        'machinery': ('memento_work_records_machinery', 'machinery_id'),
+    },
+    'memento_attendance': {
+        'employees': ('memento_attendance_employees', 'employee_id'),
+    },
+    'memento_ride_log': {
+        'crew': ('memento_ride_log_crew', 'employee_id'),
+        'orders': ('memento_ride_log_orders', 'order_id'),
+    },
+    'memento_cash_book': {
+        'obligations': ('memento_cash_book_obligations', 'obligation_id'),
+        'claims': ('memento_cash_book_receivables', 'receivable_id'),
+    }
+}
+
+# Upper bound of bind parameters per multi-row statement
+# (asyncpg/PostgreSQL protocol limit is 32767)
+MAX_BIND_PARAMS = 30000
+
+
+# ==================================================
+# ENTRY CONVERSION (Memento entry -> table row)
+# ==================================================
+
+def prepare_entry(
+    model_class,
+    library_id: str,
+    library_name: str,
+    table_name: str,
+    entry_data: Dict[str, Any]
+) -> Tuple[str, Dict[str, Any], Dict[str, List[str]]]:
+    """
+    Transform one Memento entry into a table row and junction links
+
+    Used by the Memento -> PostgreSQL sync and by the field merge of
+    PostgreSQLToMementoSync (Memento's values in column form).
+
+    Args:
+        model_class: SQLAlchemy model class
+        library_id: Memento library ID
+        library_name: Slovak library name
+        table_name: PostgreSQL table name
+        entry_data: Entry data from Memento
+
+    Returns:
+        Tuple of (entry_id, row data, junction table links)
+    """
+    # Extract core fields
+    entry_id = entry_data.get('id')
+    if not entry_id:
+        raise ValueError("Entry ID is required")
+
+    status = entry_data.get('status', 'active')
+    created_time = entry_data.get('createdTime')
+    modified_time = entry_data.get('modifiedTime')
+    created_by = entry_data.get('createdBy', {}).get('name') if isinstance(entry_data.get('createdBy'), dict) else entry_data.get('createdBy')
+    modified_by = entry_data.get('modifiedBy', {}).get('name') if isinstance(entry_data.get('modifiedBy'), dict) else entry_data.get('modifiedBy')
+
+    # Extract custom fields
+    fields = entry_data.get('fields', {})
+
+    # Debug tracing - show what fields we received
+    if trace_library(library_id, library_name):
+        logger.info("Entry %s: Received fields: %s", entry_id, list(fields.keys()))
+        if 'Zamestnanci' in fields or 'employees' in fields:
+            logger.info("Entry %s: Zamestnanci field = %s", entry_id, fields.get('Zamestnanci', fields.get('employees')))
+
+    # Prepare data for PostgreSQL
+    pg_data = prepare_entry_data(
+        model_class=model_class,
+        library_id=library_id,
+        library_name=library_name,
+        entry_id=entry_id,
+        status=status,
+        fields=fields,
+        created_time=created_time,
+        modified_time=modified_time,
+        created_by=created_by,
+        modified_by=modified_by
+    )
+
+    # Handle linkToEntry fields (junction tables)
+    junction_data = extract_junction_data(table_name, entry_id, fields, library_name)
+
+    return entry_id, pg_data, junction_data
+
+def prepare_entry_data(
+    model_class,
+    library_id: str,
+    library_name: str,
+    entry_id: str,
+    status: str,
+    fields: Dict[str, Any],
+    created_time: Optional[str],
+    modified_time: Optional[str],
+    created_by: Optional[str],
+    modified_by: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Prepare entry data for PostgreSQL insertion
+
+    Args:
+        model_class: SQLAlchemy model class
+        library_id: Memento library ID
+        library_name: Slovak library name
+        entry_id: Entry ID
+        status: Entry status
+        fields: Custom fields
+        created_time: Created timestamp
+        modified_time: Modified timestamp
+        created_by: Created by user
+        modified_by: Modified by user
+
+    Returns:
+        Dictionary ready for PostgreSQL insertion
+    """
+    pg_data = {
+        'id': entry_id,
+        'status': status,
+        'memento_created_time': parse_timestamp(created_time),
+        'memento_modified_time': parse_timestamp(modified_time),
+        'created_by': created_by,
+        'modified_by': modified_by,
+        'sync_source': 'memento',
+        'synced_at': datetime.now()
+    }
+
+    # Column -> converter, compiled once per model
+    plan = get_conversion_plan(model_class)
+    trace = is_tracing()
+
+    # Map custom fields to PostgreSQL columns
+    for field_name, field_value in fields.items():
+        # Convert Slovak field name to English column name
+        column_name = get_column_name(library_id, field_name, library_name)
+
+        if trace:
+            logger.info("Mapping field %r -> column %r", field_name, column_name)
+
+        # CRITICAL: Never overwrite the primary key 'id' column with custom field data
+        if column_name == 'id':
+            logger.warning("Skipping field %r - would overwrite primary key 'id'", field_name)
+            continue
+
+        # Skip if column doesn't exist in model
+        converter = plan.get(column_name)
+        if converter is None:
+            logger.debug("Skipping unknown column: %s", column_name)
+            continue
+
+        # Parse field value based on column type
+        field_value = converter(field_value, column_name)
+
+        # Handle linkToEntry fields (foreign keys)
+        if isinstance(field_value, dict) and 'id' in field_value:
+            # Single linkToEntry - extract ID
+            pg_data[column_name] = field_value['id']
+        elif isinstance(field_value, list) and len(field_value) > 0:
+            # Multiple linkToEntry - check if first item is dict
+            if isinstance(field_value[0], dict) and 'id' in field_value[0]:
+                # Take first ID for single FK column
+                # (rest will be in junction table)
+                if column_name.endswith('_id'):
+                    pg_data[column_name] = field_value[0]['id']
+                # Skip non-FK columns with multiple values
+                continue
+            else:
+                # Regular list value
+                pg_data[column_name] = field_value
+        else:
+            # Regular value
+            pg_data[column_name] = field_value
+            # DEBUG: Log email fields
+            if trace and 'email' in column_name.lower():
+                logger.info("  → Assigned to pg_data[%r] = %r (type: %s)", column_name, field_value, type(field_value).__name__)
+
+    return pg_data
+
+def extract_junction_data(
+    table_name: str,
+    entry_id: str,
+    fields: Dict[str, Any],
+    library_name: str = None
+) -> Dict[str, List[str]]:
+    """
+    Extract data for junction tables (many-to-many relationships)
+
+    Args:
+        table_name: Main table name
+        entry_id: Entry ID
+        fields: Entry fields
+        library_name: Library name for field mapping lookup
+
+    Returns:
+        Dictionary of junction table names to list of linked IDs
+    """
+    junction_data = {}
+
+    # Get mappings for this table
+    table_mappings = JUNCTION_MAPPINGS.get(table_name, {})
+
+    for field_name, (junction_table, id_column) in table_mappings.items():
+        # Try to find the field value - check both English and Slovak names
+        field_value = fields.get(field_name)
+        if field_value is None:
+            # Slovak name that maps to this English column name
+            slovak_name = get_field_name(None, field_name, library_name)
+            if slovak_name:
+                field_value = fields.get(slovak_name)
+
+        if not field_value:
+            logger.debug("No value found for junction field: %s", field_name)
+            continue
+
+        if is_tracing():
+            logger.info(
+                "Processing junction field %s: %d items",
+                field_name, len(field_value) if isinstance(field_value, list) else 1
+            )
+
+        # Extract IDs
+        linked_ids = []
+        if isinstance(field_value, list):
+            for item in field_value:
+                if isinstance(item, dict) and 'id' in item:
+                    linked_ids.append(item['id'])
+                elif isinstance(item, str):
+                    linked_ids.append(item)
+        elif isinstance(field_value, dict) and 'id' in field_value:
+            linked_ids.append(field_value['id'])
+
+        if linked_ids:
+            junction_data[junction_table] = linked_ids
+
+    return junction_data
+
+
+# ==================================================
+# UPSERT STATEMENTS (built once per table and column set)
+# ==================================================
+
+# (table, column set) -> UPSERT statement of _upsert_entry
+_UPSERT_STATEMENTS: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+
+
+def _upsert_statement(model_class, columns: Tuple[str, ...]):
+    """
+    UPSERT of one row plus its snapshot merge, with bound parameters for
+    the row's columns and snapshot_table / snapshot_fields
+
+    WITH entry AS (INSERT ... ON CONFLICT (id) DO UPDATE ... RETURNING id)
+    INSERT INTO memento_sync_snapshots ... SELECT ... FROM entry
+    """
+    table = model_class.__table__
+    key = (table.name, columns)
+    stmt = _UPSERT_STATEMENTS.get(key)
+    if stmt is not None:
+        return stmt
+
+    upsert = insert(table).values({column: bindparam(column) for column in columns})
+    upsert = upsert.on_conflict_do_update(
+        index_elements=['id'],
+        set_={column: upsert.excluded[column] for column in columns if column != 'id'}
+    )
+    entry = upsert.returning(table.c.id).cte('entry')
+
+    stmt = insert(SyncSnapshot.__table__).from_select(
+        ['table_name', 'entry_id', 'fields', 'direction'],
+        select(
+            bindparam('snapshot_table'),
+            entry.c.id,
+            bindparam('snapshot_fields', type_=JSONB),
+            literal('memento_to_pg')
+        )
+    )
+    stmt = _UPSERT_STATEMENTS[key] = _merge_snapshot(stmt)
+    return stmt
+
+
+def _merge_snapshot(stmt):
+    """Add the ON CONFLICT clause merging written values into an existing sync snapshot"""
+    fields = SyncSnapshot.__table__.c.fields
+    return stmt.on_conflict_do_update(
+        index_elements=['table_name', 'entry_id'],
+        set_={
+            'fields': fields.op('||', return_type=JSONB)(stmt.excluded.fields),
+            'direction': stmt.excluded.direction,
+            'updated_at': func.now()
+        }
+    )
+
 
 class MementoToPostgreSQLSync:
     """Handles synchronization from Memento to PostgreSQL"""
 
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: AsyncSession):
         self.db = db_session
         self.config = Config()
         self.field_mapper = FieldTypeMapper()
 
+        # Log rows of the current unit of work, buffered after its commit
+        self.log_buffer = get_sync_log_buffer()
+        self.pending_logs: List[Dict[str, Any]] = []
+
     async def sync_entry(
         self,
         library_id: str,
@@ -45,6 +362,10 @@ class MementoToPostgreSQLSync:
         """
         Sync a single entry from Memento to PostgreSQL
 
+        The whole entry (row and its sync snapshot, junction links, sync log
+        and metadata) is one unit of work committed once. A failed entry is
+        rolled back as a whole and only its failure log is committed.
+
         Args:
             library_id: Memento library ID
             library_name: Slovak library name
@@ -60,48 +381,20 @@ class MementoToPostgreSQLSync:
             if not model_class:
                 raise ValueError(f"Unknown table: {table_name}")
 
-            # Extract core fields
-            entry_id = entry_data.get('id')
-            if not entry_id:
-                raise ValueError("Entry ID is required")
-
-            status = entry_data.get('status', 'active')
-            created_time = entry_data.get('createdTime')
-            modified_time = entry_data.get('modifiedTime')
-            created_by = entry_data.get('createdBy', {}).get('name') if isinstance(entry_data.get('createdBy'), dict) else entry_data.get('createdBy')
-            modified_by = entry_data.get('modifiedBy', {}).get('name') if isinstance(entry_data.get('modifiedBy'), dict) else entry_data.get('modifiedBy')
-
-            # Extract custom fields
-            fields = entry_data.get('fields', {})
-
-            # Debug logging - show what fields we received
-            logger.info(f"Entry {entry_id}: Received fields: {list(fields.keys())}")
-            if 'Zamestnanci' in fields or 'employees' in fields:
-                logger.info(f"Entry {entry_id}: Zamestnanci field = {fields.get('Zamestnanci', fields.get('employees'))}")
-
-            # Prepare data for PostgreSQL
-            pg_data = self._prepare_entry_data(
+            # Prepare row data and junction links
+            entry_id, pg_data, junction_data = prepare_entry(
                 model_class=model_class,
                 library_id=library_id,
                 library_name=library_name,
-                entry_id=entry_id,
-                status=status,
-                fields=fields,
-                created_time=created_time,
-                modified_time=modified_time,
-                created_by=created_by,
-                modified_by=modified_by
+                table_name=table_name,
+                entry_data=entry_data
             )
 
-            # Handle linkToEntry fields (junction tables)
-            junction_data = self._extract_junction_data(table_name, entry_id, fields, library_name)
+            # Perform UPSERT (with the snapshot) and update junction tables
+            await self._upsert_entry(model_class, table_name, pg_data)
 
-            # Perform UPSERT
-            await self._upsert_entry(model_class, pg_data)
-
-            # Update junction tables
             for junction_table, links in junction_data.items():
-                await self._update_junction_table(junction_table, entry_id, links)
+                await self._sync_junction_links(junction_table, {entry_id: links})
 
             # Log success
             await self._log_sync(
@@ -115,6 +408,8 @@ class MementoToPostgreSQLSync:
             # Update metadata
             await self._update_metadata(library_id, library_name, table_name)
 
+            await self._commit()
+
             return {
                 'success': True,
                 'entry_id': entry_id,
@@ -126,6 +421,9 @@ class MementoToPostgreSQLSync:
         except Exception as e:
             logger.error(f"Error syncing entry {entry_data.get('id')} to {table_name}: {e}", exc_info=True)
 
+            # Discard whatever of the entry was written
+            await self._rollback()
+
             # Log failure
             await self._log_sync(
                 library_id=library_id,
@@ -135,6 +433,7 @@ class MementoToPostgreSQLSync:
                 success=False,
                 error_message=str(e)
             )
+            await self._commit()
 
             return {
                 'success': False,
@@ -144,254 +443,268 @@ class MementoToPostgreSQLSync:
                 'timestamp': datetime.now().isoformat()
             }
 
-    def _prepare_entry_data(
+    async def sync_entries(
         self,
-        model_class,
         library_id: str,
         library_name: str,
-        entry_id: str,
-        status: str,
-        fields: Dict[str, Any],
-        created_time: Optional[str],
-        modified_time: Optional[str],
-        created_by: Optional[str],
-        modified_by: Optional[str]
-    ) -> Dict[str, Any]:
+        table_name: str,
+        entries: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
         """
-        Prepare entry data for PostgreSQL insertion
+        Sync a batch of entries from one library in a single transaction
+
+        All valid entries are written with one multi-row UPSERT per table
+        (plus a single CTE statement per junction table, see
+        _sync_junction_links). If the batch write
+        fails, each entry is retried individually via sync_entry() so the
+        caller still gets an accurate per-entry result.
 
         Args:
-            model_class: SQLAlchemy model class
             library_id: Memento library ID
             library_name: Slovak library name
-            entry_id: Entry ID
-            status: Entry status
-            fields: Custom fields
-            created_time: Created timestamp
-            modified_time: Modified timestamp
-            created_by: Created by user
-            modified_by: Modified by user
+            table_name: PostgreSQL table name
+            entries: List of entry data from Memento
 
         Returns:
-            Dictionary ready for PostgreSQL insertion
+            List of per-entry results, in the same order as entries
         """
-        pg_data = {
-            'id': entry_id,
-            'status': status,
-            'memento_created_time': self._parse_timestamp(created_time),
-            'memento_modified_time': self._parse_timestamp(modified_time),
-            'created_by': created_by,
-            'modified_by': modified_by,
-            'sync_source': 'memento',
-            'synced_at': datetime.now()
-        }
-
-        # Get model columns
-        model_columns = {col.name for col in model_class.__table__.columns}
+        model_class = TABLE_TO_MODEL.get(table_name)
+        if not model_class:
+            raise ValueError(f"Unknown table: {table_name}")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(entries)
+        rows: Dict[str, Dict[str, Any]] = {}
+        junction_links: Dict[str, Dict[str, List[str]]] = {}
+        prepared: List[int] = []
+        log_entries = []
+
+        for index, entry_data in enumerate(entries):
+            try:
+                entry_id, pg_data, junction_data = prepare_entry(
+                    model_class=model_class,
+                    library_id=library_id,
+                    library_name=library_name,
+                    table_name=table_name,
+                    entry_data=entry_data
+                )
+            except Exception as e:
+                logger.error(f"Error preparing entry {entry_data.get('id')} for {table_name}: {e}")
+                results[index] = {
+                    'success': False,
+                    'entry_id': entry_data.get('id'),
+                    'table': table_name,
+                    'error': str(e),
+                    'timestamp': datetime.now().isoformat()
+                }
+                log_entries.append(dict(
+                    library_id=library_id,
+                    library_name=library_name,
+                    entry_id=entry_data.get('id'),
+                    sync_direction='memento_to_pg',
+                    success=False,
+                    error_message=str(e)
+                ))
+                continue
 
-        # Map custom fields to PostgreSQL columns
-        for field_name, field_value in fields.items():
-            # Convert Slovak field name to English column name
-            column_name = get_column_name(library_id, field_name, library_name)
+            # Duplicate IDs in one batch: last occurrence wins
+            # (ON CONFLICT DO UPDATE cannot touch the same row twice)
+            rows[entry_id] = pg_data
+            for junction_table, linked_ids in junction_data.items():
+                junction_links.setdefault(junction_table, {})[entry_id] = linked_ids
+            prepared.append(index)
 
-            logger.info(f"Mapping field '{field_name}' -> column '{column_name}'")
+        for entry_id in rows:
+            log_entries.append(dict(
+                library_id=library_id,
+                library_name=library_name,
+                entry_id=entry_id,
+                sync_direction='memento_to_pg',
+                success=True
+            ))
 
-            # CRITICAL: Never overwrite the primary key 'id' column with custom field data
-            if column_name == 'id':
-                logger.warning(f"Skipping field '{field_name}' - would overwrite primary key 'id'")
-                continue
+        try:
+            if rows:
+                await self._upsert_entries(model_class, list(rows.values()))
 
-            # Skip if column doesn't exist in model
-            if column_name not in model_columns:
-                logger.debug(f"Skipping unknown column: {column_name}")
-                continue
+            for junction_table, links in junction_links.items():
+                await self._sync_junction_links(junction_table, links)
 
-            # Parse field value based on column type
-            field_value = self._parse_field_value(field_value, column_name, model_class)
-
-            # Handle linkToEntry fields (foreign keys)
-            if isinstance(field_value, dict) and 'id' in field_value:
-                # Single linkToEntry - extract ID
-                pg_data[column_name] = field_value['id']
-            elif isinstance(field_value, list) and len(field_value) > 0:
-                # Multiple linkToEntry - check if first item is dict
-                if isinstance(field_value[0], dict) and 'id' in field_value[0]:
-                    # Take first ID for single FK column
-                    # (rest will be in junction table)
-                    if column_name.endswith('_id'):
-                        pg_data[column_name] = field_value[0]['id']
-                    # Skip non-FK columns with multiple values
-                    continue
-                else:
-                    # Regular list value
-                    pg_data[column_name] = field_value
-            else:
-                # Regular value
-                pg_data[column_name] = field_value
-                # DEBUG: Log email fields
-                if 'email' in column_name.lower():
-                    logger.info(f"  → Assigned to pg_data['{column_name}'] = {repr(field_value)} (type: {type(field_value).__name__})")
+            await self._save_snapshots(
+                table_name,
+                {entry_id: data_snapshot(pg_data) for entry_id, pg_data in rows.items()}
+            )
 
-        return pg_data
+            self._add_logs(log_entries)
 
-    def _extract_junction_data(
-        self,
-        table_name: str,
-        entry_id: str,
-        fields: Dict[str, Any],
-        library_name: str = None
-    ) -> Dict[str, List[str]]:
-        """
-        Extract data for junction tables (many-to-many relationships)
+            await self._update_metadata(library_id, library_name, table_name)
 
-        Args:
-            table_name: Main table name
-            entry_id: Entry ID
-            fields: Entry fields
-            library_name: Library name for field mapping lookup
+            await self._commit()
 
-        Returns:
-            Dictionary of junction table names to list of linked IDs
-        """
-        junction_data = {}
-
-        # Define junction table mappings
-        junction_mappings = {
-            'memento_work_records': {
-                'employees': ('memento_work_records_employees', 'employee_id'),
-                'machinery': ('memento_work_records_machinery', 'machinery_id'),
-            },
-            'memento_attendance': {
-                'employees': ('memento_attendance_employees', 'employee_id'),
-            },
-            'memento_ride_log': {
-                'crew': ('memento_ride_log_crew', 'employee_id'),
-                'orders': ('memento_ride_log_orders', 'order_id'),
-            },
-            'memento_cash_book': {
-                'obligations': ('memento_cash_book_obligations', 'obligation_id'),
-                'claims': ('memento_cash_book_receivables', 'receivable_id'),
+        except Exception as e:
+            logger.error(
+                f"Batch sync of {len(rows)} entries to {table_name} failed, "
+                f"retrying entries one by one: {e}",
+                exc_info=True
+            )
+            await self._rollback()
+
+            # Preparation failures were rolled back with the batch
+            for result in results:
+                if result is not None:
+                    await self._log_sync(
+                        library_id=library_id,
+                        library_name=library_name,
+                        entry_id=result['entry_id'],
+                        sync_direction='memento_to_pg',
+                        success=False,
+                        error_message=result['error']
+                    )
+            await self._commit()
+
+            for index in prepared:
+                results[index] = await self.sync_entry(
+                    library_id=library_id,
+                    library_name=library_name,
+                    table_name=table_name,
+                    entry_data=entries[index]
+                )
+            return results
+
+        timestamp = datetime.now().isoformat()
+        for index in prepared:
+            results[index] = {
+                'success': True,
+                'entry_id': entries[index].get('id'),
+                'table': table_name,
+                'operation': 'upsert',
+                'timestamp': timestamp
             }
-        }
-
-        # Get mappings for this table
-        table_mappings = junction_mappings.get(table_name, {})
-
-        for field_name, (junction_table, id_column) in table_mappings.items():
-            # Try to find the field value - check both English and Slovak names
-            field_value = None
 
-            # Try English name first
-            if field_name in fields:
-                field_value = fields.get(field_name)
-            # Try Slovak name from field_name_mapper
-            else:
-                from field_name_mapper import FIELD_MAPPINGS_BY_NAME
-                # Get Slovak name that maps to this English column name
-                field_map = FIELD_MAPPINGS_BY_NAME.get(library_name, {})
-                slovak_name = None
-                for slovak, english in field_map.items():
-                    if english == field_name:
-                        slovak_name = slovak
-                        break
-                if slovak_name:
-                    field_value = fields.get(slovak_name)
-
-            if not field_value:
-                logger.debug(f"No value found for junction field: {field_name}")
-                continue
+        logger.info(
+            f"Batch synced {len(rows)} entries to {table_name} "
+            f"({len(entries) - len(prepared)} failed)"
+        )
+        return results
 
-            logger.info(f"Processing junction field {field_name}: {len(field_value) if isinstance(field_value, list) else 1} items")
+    async def _upsert_entry(self, model_class, table_name: str, data: Dict[str, Any]) -> None:
+        """
+        Perform UPSERT (INSERT or UPDATE) of one entry and merge its values
+        into the entry's sync snapshot, in a single statement
 
-            # Extract IDs
-            linked_ids = []
-            if isinstance(field_value, list):
-                for item in field_value:
-                    if isinstance(item, dict) and 'id' in item:
-                        linked_ids.append(item['id'])
-                    elif isinstance(item, str):
-                        linked_ids.append(item)
-            elif isinstance(field_value, dict) and 'id' in field_value:
-                linked_ids.append(field_value['id'])
+        Core statement on the model's table: the ORM-enabled insert() costs
+        more Python time per entry than the statement itself takes to run.
 
-            if linked_ids:
-                junction_data[junction_table] = linked_ids
+        Args:
+            model_class: SQLAlchemy model class
+            table_name: PostgreSQL table name
+            data: Data to insert/update
+        """
+        stmt = _upsert_statement(model_class, tuple(sorted(data)))
+        await self.db.execute(stmt, {
+            **data,
+            'snapshot_table': table_name,
+            'snapshot_fields': data_snapshot(data)
+        })
+
+    async def _upsert_entries(self, model_class, rows: List[Dict[str, Any]]) -> None:
+        """
+        Perform multi-row UPSERT (INSERT ... ON CONFLICT DO UPDATE)
 
-        return junction_data
+        Rows are grouped by their column set so entries that omit a field
+        keep their stored value, exactly like the single-entry UPSERT.
 
-    async def _upsert_entry(self, model_class, data: Dict[str, Any]) -> None:
+        Args:
+            model_class: SQLAlchemy model class
+            rows: Row data, one dict per entry (unique IDs)
         """
-        Perform UPSERT (INSERT or UPDATE) operation
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        for columns, group in groups.items():
+            chunk_size = max(1, MAX_BIND_PARAMS // len(columns))
+
+            for start in range(0, len(group), chunk_size):
+                stmt = insert(model_class.__table__).values(group[start:start + chunk_size])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['id'],
+                    set_={column: stmt.excluded[column] for column in columns if column != 'id'}
+                )
+                await self.db.execute(stmt)
+
+    async def _save_snapshots(self, table_name: str, snapshots: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Merge written field values into the entries' sync snapshots
 
         Args:
-            model_class: SQLAlchemy model class
-            data: Data to insert/update
+            table_name: PostgreSQL table name
+            snapshots: {entry_id: data_snapshot(row data)}
         """
-        # PostgreSQL UPSERT using INSERT ... ON CONFLICT
-        stmt = insert(model_class).values(**data)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=['id'],
-            set_={k: v for k, v in data.items() if k != 'id'}
-        )
+        rows = [
+            {'table_name': table_name, 'entry_id': entry_id, 'fields': fields, 'direction': 'memento_to_pg'}
+            for entry_id, fields in snapshots.items()
+        ]
+        chunk_size = MAX_BIND_PARAMS // 4
 
-        self.db.execute(stmt)
-        self.db.commit()
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert(SyncSnapshot.__table__).values(rows[start:start + chunk_size])
+            await self.db.execute(_merge_snapshot(stmt))
 
-    async def _update_junction_table(
+    async def _sync_junction_links(
         self,
         junction_table: str,
-        parent_id: str,
-        linked_ids: List[str]
+        links: Dict[str, List[str]]
     ) -> None:
         """
-        Update junction table (many-to-many relationship)
+        Synchronize junction table links for one or many parents
+
+        Set-diff in a single statement: links that are no longer wanted are
+        deleted, missing links are inserted, unchanged rows are not touched
+        (no churn, no triggers fired for them).
 
         Args:
             junction_table: Junction table name
-            parent_id: Parent entry ID
-            linked_ids: List of linked entry IDs
+            links: Parent entry ID -> list of linked entry IDs
         """
-        # Delete existing links
-        parent_column = f"{junction_table.split('_')[-2]}_id"
-        child_column = f"{junction_table.split('_')[-1]}_id"
-
-        # Special handling for specific junction tables
-        if junction_table == 'memento_work_records_employees':
-            parent_column = 'work_record_id'
-            child_column = 'employee_id'
-        elif junction_table == 'memento_attendance_employees':
-            parent_column = 'attendance_id'
-            child_column = 'employee_id'
-        elif junction_table == 'memento_ride_log_crew':
-            parent_column = 'ride_log_id'
-            child_column = 'employee_id'
-        elif junction_table == 'memento_ride_log_orders':
-            parent_column = 'ride_log_id'
-            child_column = 'order_id'
-        elif junction_table == 'memento_work_records_machinery':
-            parent_column = 'work_record_id'
-            child_column = 'machinery_id'
-        elif junction_table == 'memento_cash_book_obligations':
-            parent_column = 'cash_book_id'
-            child_column = 'obligation_id'
-        elif junction_table == 'memento_cash_book_receivables':
-            parent_column = 'cash_book_id'
-            child_column = 'receivable_id'
-
-        # Delete old links
-        delete_stmt = text(f"DELETE FROM {junction_table} WHERE {parent_column} = :parent_id")
-        self.db.execute(delete_stmt, {'parent_id': parent_id})
-
-        # Insert new links
-        for linked_id in linked_ids:
-            insert_stmt = text(f"""
-                INSERT INTO {junction_table} ({parent_column}, {child_column})
-                VALUES (:parent_id, :child_id)
-                ON CONFLICT DO NOTHING
-            """)
-            self.db.execute(insert_stmt, {'parent_id': parent_id, 'child_id': linked_id})
-
-        self.db.commit()
+        parent_column, child_column = JUNCTION_COLUMNS[junction_table]
+
+        parent_ids = []
+        child_ids = []
+        for parent_id, linked_ids in links.items():
+            for linked_id in linked_ids:
+                parent_ids.append(parent_id)
+                child_ids.append(linked_id)
+
+        # Both CTEs see the table as it was before the statement, so the
+        # INSERT skips links that already exist and the DELETE keeps them
+        sync_stmt = text(f"""
+            WITH desired AS (
+                SELECT DISTINCT d.parent_id, d.child_id
+                FROM unnest(CAST(:parent_ids AS VARCHAR[]), CAST(:child_ids AS VARCHAR[])) AS d(parent_id, child_id)
+            ),
+            removed AS (
+                DELETE FROM {junction_table} j
+                WHERE j.{parent_column} = ANY(CAST(:all_parent_ids AS VARCHAR[]))
+                  AND NOT EXISTS (
+                      SELECT 1 FROM desired d
+                      WHERE d.parent_id = j.{parent_column} AND d.child_id = j.{child_column}
+                  )
+                RETURNING 1
+            )
+            INSERT INTO {junction_table} ({parent_column}, {child_column})
+            SELECT d.parent_id, d.child_id
+            FROM desired d
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {junction_table} j
+                WHERE j.{parent_column} = d.parent_id AND j.{child_column} = d.child_id
+            )
+            ON CONFLICT DO NOTHING
+        """)
+        await self.db.execute(sync_stmt, {
+            'parent_ids': parent_ids,
+            'child_ids': child_ids,
+            'all_parent_ids': list(links)
+        })
 
     async def _log_sync(
         self,
@@ -402,17 +715,50 @@ class MementoToPostgreSQLSync:
         success: bool,
         error_message: Optional[str] = None
     ) -> None:
-        """Log sync operation"""
-        log_entry = SyncLog(
+        """Log sync operation (written with the caller's unit of work, see _commit)"""
+        self._add_logs([dict(
             library_id=library_id,
             library_name=library_name,
             entry_id=entry_id,
             sync_direction=sync_direction,
             success=success,
             error_message=error_message
+        )])
+
+    def _add_logs(self, rows: List[Dict[str, Any]]) -> None:
+        """Hold log rows of the unit of work until _commit"""
+        self.pending_logs.extend(rows)
+
+    async def _insert_logs(self, rows: List[Dict[str, Any]]) -> None:
+        """Write log rows synchronously (one executemany INSERT)"""
+        await self.db.execute(
+            insert(SyncLog.__table__),
+            [{'error_message': None, **row} for row in rows]
         )
-        self.db.add(log_entry)
-        self.db.commit()
+
+    async def _commit(self) -> None:
+        """
+        Commit the unit of work, then hand its log rows to the write-behind
+        buffer - or, if the buffer is off or full, write them synchronously
+        (in the same transaction when the buffer is off)
+        """
+        logs, self.pending_logs = self.pending_logs, []
+
+        if logs and not self.log_buffer.running:
+            await self._insert_logs(logs)
+            await self.db.commit()
+            return
+
+        await self.db.commit()
+
+        if logs and not self.log_buffer.extend(logs):
+            await self._insert_logs(logs)
+            await self.db.commit()
+
+    async def _rollback(self) -> None:
+        """Roll back the unit of work including its pending log rows"""
+        self.pending_logs = []
+        await self.db.rollback()
 
     async def _update_metadata(
         self,
@@ -420,191 +766,36 @@ class MementoToPostgreSQLSync:
         library_name: str,
         table_name: str
     ) -> None:
-        """Update sync metadata"""
-        metadata = self.db.query(SyncMetadata).filter_by(library_id=library_id).first()
+        """
+        Update sync metadata
+
+        entry_count is maintained incrementally by the counter triggers
+        (migration_entry_counters.sql) and reconciled by entry_counts.py,
+        so it is only counted here when the metadata row is first created.
+        """
+        # One Core UPDATE instead of loading and flushing the ORM row
+        metadata_table = SyncMetadata.__table__
+        now = datetime.now()
+        result = await self.db.execute(
+            update(metadata_table)
+            .where(metadata_table.c.library_id == library_id)
+            .values(last_sync=now, updated_at=now)
+        )
+
+        if not result.rowcount:
+            # Create if doesn't exist (triggers had no row to update yet)
+            count_stmt = text(f"SELECT COUNT(*) FROM {table_name} WHERE status = 'active'")
+            count = (await self.db.execute(count_stmt)).scalar()
 
-        if metadata:
-            metadata.last_sync = datetime.now()
-            metadata.updated_at = datetime.now()
-        else:
-            # Create if doesn't exist
             metadata = SyncMetadata(
                 library_id=library_id,
                 library_name=library_name,
                 table_name=table_name,
-                last_sync=datetime.now()
+                last_sync=datetime.now(),
+                entry_count=count
             )
             self.db.add(metadata)
 
-        # Update entry count
-        count_stmt = text(f"SELECT COUNT(*) FROM {table_name} WHERE status = 'active'")
-        result = self.db.execute(count_stmt)
-        count = result.scalar()
-        metadata.entry_count = count
-
-        self.db.commit()
-
-    def _parse_field_value(self, value: Any, column_name: str, model_class) -> Any:
-        """
-        Parse field value based on column type
-
-        Handles special conversions:
-        - BOOLEAN columns: Convert string/numeric values to boolean
-        - TIME columns: Extract time from datetime string
-        - DATE columns: Parse date strings
-        - TIMESTAMP columns: Parse datetime strings
-        """
-        # Get column type from model
-        try:
-            column = model_class.__table__.columns[column_name]
-            column_type = str(column.type)
-
-            # Handle BOOLEAN columns BEFORE null check (empty string = False for booleans)
-            if 'BOOLEAN' in column_type.upper():
-                logger.info(f"BOOLEAN column '{column_name}': value={repr(value)}, type={type(value).__name__}")
-                # Handle None and empty string for boolean columns
-                if value is None:
-                    logger.info(f"  → Returning None (value is None)")
-                    return None
-                if value == '':
-                    logger.info(f"  → Returning False (empty string)")
-                    return False
-                # Convert various representations to boolean
-                if isinstance(value, bool):
-                    return value
-                if isinstance(value, str):
-                    # Common boolean string representations
-                    value_lower = value.lower().strip()
-                    if value_lower in ('true', 'yes', 'ano', '1', 't', 'y'):
-                        return True
-                    elif value_lower in ('false', 'no', 'nie', '0', 'f', 'n', ''):
-                        return False
-                    # Non-empty string = True (Memento checkbox field name = checked)
-                    return len(value.strip()) > 0
-                if isinstance(value, (int, float)):
-                    return value != 0
-                # Default: truthy values = True
-                return bool(value)
-        except Exception as e:
-            logger.warning(f"Exception in _parse_field_value for column '{column_name}': {e}")
-
-        # For non-boolean columns, None and empty string = None
-        if value is None or value == '':
-            logger.info(f"Non-boolean column '{column_name}': Returning None for empty/null value={repr(value)}")
-            return None
-
-        # Get column type from model again (for non-boolean types)
-        try:
-            column = model_class.__table__.columns[column_name]
-            column_type = str(column.type)
-
-            # Handle TIME columns
-            if 'TIME' in column_type.upper() and 'TIMESTAMP' not in column_type.upper():
-                # Memento sends time as "1970-01-01T07:00:00.000Z"
-                # The 'Z' is misleading - it's actually local time, not UTC!
-                # Extract just the time part WITHOUT timezone conversion
-                if isinstance(value, str):
-                    try:
-                        logger.info(f"Parsing TIME field '{column_name}': raw value = '{value}'")
-                        # Remove 'Z' and milliseconds, parse as naive datetime
-                        time_str = value.replace('Z', '').split('.')[0]  # "1970-01-01T07:00:00"
-                        logger.info(f"  After removing Z and ms: '{time_str}'")
-                        dt = datetime.fromisoformat(time_str)
-                        result_time = dt.time()
-                        logger.info(f"  Parsed time result: {result_time}")
-                        return result_time  # Returns 07:00:00 (local time)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse time value '{value}': {e}")
-                        return None
-                return value
-
-            # Handle DATE columns
-            elif 'DATE' in column_type.upper() and 'TIME' not in column_type.upper():
-                if isinstance(value, str):
-                    try:
-                        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
-                    except Exception as e:
-                        logger.warning(f"Failed to parse date value '{value}': {e}")
-                        return None
-                return value
-
-            # Handle TIMESTAMP columns
-            elif 'TIMESTAMP' in column_type.upper():
-                return self._parse_timestamp(value)
-
-            # Handle INTEGER and NUMERIC columns
-            elif 'INTEGER' in column_type.upper():
-                if isinstance(value, int):
-                    return value
-                if isinstance(value, str):
-                    # Try to parse string to int
-                    try:
-                        return int(value)
-                    except (ValueError, TypeError):
-                        # Invalid integer value (like "#" or empty string)
-                        logger.warning(f"Invalid integer value for column '{column_name}': {repr(value)}, setting to NULL")
-                        return None
-                return value
-
-            elif 'NUMERIC' in column_type.upper() or 'DECIMAL' in column_type.upper():
-                if isinstance(value, (int, float)):
-                    return value
-                if isinstance(value, str):
-                    # Try to parse string to number
-                    try:
-                        return float(value)
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid numeric value for column '{column_name}': {repr(value)}, setting to NULL")
-                        return None
-                return value
-
-        except Exception as e:
-            logger.debug(f"Could not determine column type for {column_name}: {e}")
-
-        # Handle dict/object values (linkToEntry that wasn't processed correctly)
-        if isinstance(value, dict):
-            # If it has an 'id' field, extract it
-            if 'id' in value:
-                logger.info(f"Extracting ID from dict value for column '{column_name}'")
-                return value['id']
-            # Otherwise, convert to JSON string
-            import json
-            logger.warning(f"Converting dict to JSON string for column '{column_name}'")
-            return json.dumps(value)
-
-        return value
-
-    @staticmethod
-    def _parse_timestamp(ts: Optional[str]) -> Optional[datetime]:
-        """Parse Memento timestamp string to datetime"""
-        if not ts:
-            return None
-
-        try:
-            # Handle ISO format with Z
-            if ts.endswith('Z'):
-                ts = ts.replace('Z', '+00:00')
-            return datetime.fromisoformat(ts)
-        except Exception as e:
-            logger.warning(f"Failed to parse timestamp {ts}: {e}")
-            return None
-
-    @staticmethod
-    def _to_snake_case(text: str) -> str:
-        """Convert text to snake_case"""
-        import re
-        # Insert underscore before uppercase letters
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', text)
-        # Insert underscore before uppercase followed by lowercase
-        s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
-        return s2.lower()
-
-    @staticmethod
-    def _to_camel_case(text: str) -> str:
-        """Convert snake_case to camelCase"""
-        components = text.split('_')
-        return components[0] + ''.join(x.title() for x in components[1:])
-
     async def delete_entry(
         self,
         library_id: str,
@@ -624,23 +815,34 @@ class MementoToPostgreSQLSync:
         Returns:
             Delete result
         """
+        data_written = False
+
         try:
             model_class = TABLE_TO_MODEL.get(table_name)
             if not model_class:
                 raise ValueError(f"Unknown table: {table_name}")
 
-            # Check if soft delete is enabled
-            if self.config.SYNC_DELETED_ENTRIES:
-                # Soft delete - update status
-                entry = self.db.query(model_class).filter_by(id=entry_id).first()
-                if entry:
-                    entry.status = 'deleted'
-                    entry.sync_source = 'memento'
-                    self.db.commit()
-            else:
-                # Hard delete
-                self.db.query(model_class).filter_by(id=entry_id).delete()
-                self.db.commit()
+            # Delete in a SAVEPOINT, log and commit once (same as sync_entry)
+            async with self.db.begin_nested():
+                # Check if soft delete is enabled
+                if self.config.SYNC_DELETED_ENTRIES:
+                    # Soft delete - update status
+                    await self.db.execute(
+                        update(model_class)
+                        .where(model_class.id == entry_id)
+                        .values(status='deleted', sync_source='memento')
+                    )
+                else:
+                    # Hard delete; a deleted row has no sync_source, so mark
+                    # the transaction for the trigger (avoid loop)
+                    await self.db.execute(
+                        text("SELECT set_config('memento_sync.source', 'memento', true)")
+                    )
+                    await self.db.execute(
+                        delete(model_class).where(model_class.id == entry_id)
+                    )
+
+            data_written = True
 
             # Log success
             await self._log_sync(
@@ -651,6 +853,8 @@ class MementoToPostgreSQLSync:
                 success=True
             )
 
+            await self._commit()
+
             return {
                 'success': True,
                 'entry_id': entry_id,
@@ -661,6 +865,9 @@ class MementoToPostgreSQLSync:
         except Exception as e:
             logger.error(f"Error deleting entry {entry_id} from {table_name}: {e}", exc_info=True)
 
+            if data_written:
+                await self._rollback()
+
             # Log failure
             await self._log_sync(
                 library_id=library_id,
@@ -670,6 +877,7 @@ class MementoToPostgreSQLSync:
                 success=False,
                 error_message=str(e)
             )
+            await self._commit()
 
             return {
                 'success': False,
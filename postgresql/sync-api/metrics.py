@@ -0,0 +1,159 @@
+"""
+Metrics - Event-driven counters and histograms in Prometheus text format
+
+Values are updated where the events happen (a request finishes, an entry is
+synced); nothing is sampled on a timer. render_metric() produces the
+Prometheus text exposition format (version 0.0.4), served by
+start_metrics_server() or written to a file for node_exporter's textfile
+collector (write_metrics_file()). No client library is needed.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Default buckets (seconds)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+WAIT_BUCKETS = (0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LAG_BUCKETS = (1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+
+    def samples(self, name: str, labels: str = '') -> List[str]:
+        """_bucket/_sum/_count lines"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            le = 'le="%s"' % bound
+            lines.append(f'{name}_bucket{{{_join(labels, le)}}} {cumulative}')
+        le = 'le="+Inf"'
+        lines.append(f'{name}_bucket{{{_join(labels, le)}}} {self.count}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {self.sum:.6f}')
+        lines.append(f'{name}_count{suffix} {self.count}')
+        return lines
+
+
+class RateMeter:
+    """Events per second over a sliding window (one-second buckets)"""
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.buckets: deque = deque()
+
+    def mark(self, count: int = 1) -> None:
+        now = int(time.monotonic())
+        if self.buckets and self.buckets[-1][0] == now:
+            self.buckets[-1][1] += count
+        else:
+            self.buckets.append([now, count])
+        self._trim(now)
+
+    def rate(self) -> float:
+        self._trim(int(time.monotonic()))
+        return sum(count for _, count in self.buckets) / self.window
+
+    def _trim(self, now: int) -> None:
+        while self.buckets and self.buckets[0][0] <= now - self.window:
+            self.buckets.popleft()
+
+
+def _join(*labels: str) -> str:
+    return ','.join(label for label in labels if label)
+
+
+def render_metric(
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[Tuple[str, object]]
+) -> List[str]:
+    """
+    One metric family
+
+    Args:
+        name: Metric name
+        kind: 'counter', 'gauge' or 'histogram'
+        help_text: HELP line
+        samples: (labels, value) pairs; for histograms value is a Histogram
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        if isinstance(value, Histogram):
+            lines.extend(value.samples(name, labels))
+        else:
+            lines.append(f'{name}{{{labels}}} {value}' if labels else f'{name} {value}')
+    return lines
+
+
+def write_metrics_file(path: str, text: str) -> None:
+    """Atomically replace a textfile collector file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+async def start_metrics_server(
+    routes: Dict[str, Tuple[str, Callable[[], str]]],
+    host: str,
+    port: int
+) -> asyncio.AbstractServer:
+    """
+    Minimal HTTP server for scrapes
+
+    Args:
+        routes: path -> (content type, render function)
+        host: Bind address
+        port: Port
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=5)
+            parts = head.split(b' ', 2)
+            path = parts[1].decode('latin-1').split('?', 1)[0] if len(parts) > 1 else '/'
+
+            route = routes.get(path)
+            if route:
+                content_type, render = route
+                status, body = '200 OK', render().encode('utf-8')
+            else:
+                content_type, status, body = 'text/plain', '404 Not Found', b'Not Found\n'
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return server
@@ -6,9 +6,10 @@ system tables for sync tracking.
 """
 
 from sqlalchemy import (
-    Column, String, Integer, Numeric, Date, Time, DateTime, Boolean, Text,
+    Column, String, Integer, BigInteger, Numeric, Date, Time, DateTime, Boolean, Text,
     ForeignKey, TIMESTAMP, Index, JSON
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -22,7 +23,7 @@ Base = declarative_base()
 # ==================================================
 
 class SyncLog(Base):
-    """Sync operation log"""
+    """Sync operation log (monthly partitions by sync_time, see sync_log_partitions.py)"""
     __tablename__ = 'memento_sync_log'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -71,6 +72,47 @@ class SyncMetadata(Base):
     updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
 
 
+class SyncRetry(Base):
+    """Failed PG → Memento sync waiting for its next attempt"""
+    __tablename__ = 'memento_sync_retry'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    table_name = Column(String(255), nullable=False)
+    entry_id = Column(String(255), nullable=False)
+    operation = Column(String(10), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(TIMESTAMP, default=func.now(), index=True)
+    locked_by = Column(String(255))
+    last_error = Column(Text)
+    first_failed_at = Column(TIMESTAMP, default=func.now())
+    updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
+
+
+class SyncDeadLetter(Base):
+    """PG → Memento sync that failed MAX_RETRY_ATTEMPTS times"""
+    __tablename__ = 'memento_sync_dead_letter'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    table_name = Column(String(255), nullable=False)
+    entry_id = Column(String(255), nullable=False)
+    operation = Column(String(10), nullable=False)
+    attempts = Column(Integer, nullable=False)
+    last_error = Column(Text)
+    first_failed_at = Column(TIMESTAMP, nullable=False)
+    dead_at = Column(TIMESTAMP, default=func.now())
+
+
+class SyncSnapshot(Base):
+    """Field values last synced (either direction) per entry"""
+    __tablename__ = 'memento_sync_snapshots'
+
+    table_name = Column(String(255), primary_key=True)
+    entry_id = Column(String(255), primary_key=True)
+    fields = Column(JSONB, nullable=False, default=dict)
+    direction = Column(String(20), nullable=False)
+    updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
+
+
 # ==================================================
 # MIXIN FOR COMMON FIELDS
 # ==================================================
@@ -0,0 +1,117 @@
+"""
+Pagination - Keyset (cursor) pagination for the log and conflict listings
+
+Pages are ordered newest first by (time, id) and continued with
+`WHERE (time, id) < (last time, last id)`, so every page costs one index
+range scan instead of skipping OFFSET rows. The position is handed to the
+client as an opaque cursor (base64url JSON).
+
+The total is optional: 'exact' counts the filtered rows, 'estimate' takes
+the row estimate of the planner (EXPLAIN, no scan), 'none' skips it.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+def encode_cursor(time_value: datetime, row_id: int) -> str:
+    """Opaque cursor for the position after a row"""
+    payload = json.dumps({'t': time_value.isoformat(), 'i': row_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Position encoded by encode_cursor()
+
+    Raises:
+        ValueError: Malformed cursor
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(payload['t']), int(payload['i'])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def keyset_page(
+    db: AsyncSession,
+    query: Select,
+    time_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of a query, newest first
+
+    Args:
+        db: Database session
+        query: Filtered select of one ORM entity
+        time_column: Timestamp column of the order
+        id_column: Primary key column (tie breaker)
+        limit: Page size
+        cursor: Position from a previous page (None = first page)
+        offset: Rows to skip (legacy; only used without cursor)
+
+    Returns:
+        Tuple of (rows, next_cursor) - next_cursor is None on the last page
+    """
+    if cursor:
+        time_value, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(time_column, id_column) < tuple_(time_value, row_id))
+    elif offset:
+        query = query.offset(offset)
+
+    rows = (await db.execute(
+        query.order_by(time_column.desc(), id_column.desc()).limit(limit + 1)
+    )).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+
+    return rows, next_cursor
+
+
+async def count_rows(db: AsyncSession, query: Select, mode: str) -> Optional[int]:
+    """
+    Total of a filtered query
+
+    Args:
+        db: Database session
+        query: Filtered select (without order / limit)
+        mode: 'exact', 'estimate' (planner statistics) or 'none'
+
+    Returns:
+        Row count, or None with mode 'none'
+    """
+    if mode == 'exact':
+        return await db.scalar(select(func.count()).select_from(query.subquery()))
+
+    if mode == 'estimate':
+        # Filter values stay bound parameters - never inline them into the SQL
+        conn = await db.connection()
+        compiled = query.compile(dialect=conn.dialect)
+        params = compiled.construct_params()
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", params)
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    return None
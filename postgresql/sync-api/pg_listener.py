@@ -4,31 +4,39 @@ PostgreSQL NOTIFY Listener Daemon
 Listens for PostgreSQL NOTIFY events and triggers sync to Memento.
 This daemon runs as a background service and processes change notifications
 in real-time.
+
+Metrics (Prometheus text format) are served on LISTENER_METRICS_PORT
+(/metrics, /stats as JSON) and/or written to LISTENER_METRICS_FILE.
 """
 
 import asyncio
 import asyncpg
 import json
 import logging
+import os
 import signal
+import socket
 import sys
-from typing import Optional
+import time
+import zlib
+from typing import Optional, Dict, Any, List
 from datetime import datetime
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from config import Config
 from pg_to_memento import PostgreSQLToMementoSync
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(Config.LOG_FILE) if Config.LOG_FILE else logging.StreamHandler(),
-        logging.StreamHandler()
-    ]
+from memento_client import MementoHttpClient
+from listener_shards import ShardManager, shard_expression
+from rate_limiter import get_rate_limiter
+from sync_log_buffer import get_sync_log_buffer
+from metrics import (
+    Histogram, RateMeter, LAG_BUCKETS, CONTENT_TYPE,
+    render_metric, start_metrics_server, write_metrics_file
 )
+from logging_config import configure_logging, shutdown_logging
+
+# Configure logging (queue-based, see logging_config.py)
+configure_logging('INFO')
 logger = logging.getLogger(__name__)
 
 
@@ -41,19 +49,78 @@ class PostgreSQLListener:
         self.running = False
         self.reconnect_delay = self.config.LISTENER_RECONNECT_DELAY
 
-        # Setup database session for sync operations
-        engine = create_engine(self.config.get_pg_url())
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        # Async database sessions for sync operations (one connection per
+        # worker), so queries do not block the event loop of the other workers
+        self.num_workers = max(1, self.config.LISTENER_WORKERS)
+        self.engine = create_async_engine(self.config.get_async_pg_url(), pool_size=max(5, self.num_workers))
+        self.SessionLocal = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+
+        # Worker pool: one bounded queue per worker, events routed by (table, id)
+        # so that changes of one entry are processed in order
+        self.queues: List[asyncio.Queue] = []
+        self.enqueue_locks: List[asyncio.Lock] = []
+        self.workers: List[asyncio.Task] = []
+        self.worker_stats: List[Dict[str, Any]] = []
+        self.batch_size = max(1, self.config.LISTENER_BATCH_SIZE)
+
+        # Coalescing: (table, id) -> pending event and its flush timer
+        self.coalesce_window = max(0.0, self.config.LISTENER_COALESCE_WINDOW)
+        self.pending: Dict[tuple, Dict[str, Any]] = {}
+        self.pending_timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self.flush_tasks: set = set()
+
+        # One pooled HTTP client for all events (keep-alive, DNS cache)
+        self.http_client = MementoHttpClient()
+
+        # Durable outbox (migration_sync_outbox.sql): NOTIFY only wakes the drainer
+        self.outbox_enabled = self.config.LISTENER_OUTBOX
+        self.pool: Optional[asyncpg.Pool] = None
+        self.outbox_wakeup = asyncio.Event()
+        self.outbox_inflight: set = set()
+        self.outbox_task: Optional[asyncio.Task] = None
+
+        # Retry scheduler (migration_sync_retry.sql): failed entries are
+        # re-dispatched with backoff, then moved to dead letters
+        self.retry_inflight: set = set()
+        self.retry_task: Optional[asyncio.Task] = None
+        self.lease_task: Optional[asyncio.Task] = None
+        self.listener_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        # Shards (migration_listener_shards.sql): several listeners split the
+        # outbox/retry rows by entry hash
+        self.shards = ShardManager(self.listener_id)
+        self.shard_task: Optional[asyncio.Task] = None
+        if self.shards.enabled and not self.outbox_enabled:
+            logger.warning("LISTENER_SHARDS requires LISTENER_OUTBOX - sharding disabled")
+            self.shards.num_shards = 0
 
         # Statistics
+        self.events_received = 0
+        self.events_coalesced = 0
         self.events_processed = 0
         self.events_failed = 0
+        self.events_retried = 0
+        self.events_dead_lettered = 0
+        self.events_dropped = 0
         self.start_time = datetime.now()
 
+        # Metrics (updated per event, see render_metrics)
+        self.received_rate = RateMeter()
+        self.processed_rate = RateMeter()
+        self.lag_histogram = Histogram(LAG_BUCKETS)
+        self.event_histogram = Histogram(LAG_BUCKETS)
+        self.last_lag_seconds: Optional[float] = None
+        self.metrics_server: Optional[asyncio.AbstractServer] = None
+        self.heartbeat_task: Optional[asyncio.Task] = None
+
+        # Set on shutdown or when the LISTEN connection drops
+        self.wakeup = asyncio.Event()
+
     async def connect(self):
         """Connect to PostgreSQL and setup listener"""
         try:
             logger.info("Connecting to PostgreSQL...")
+            self.wakeup.clear()
 
             # Create asyncpg connection
             self.conn = await asyncpg.connect(
@@ -64,12 +131,31 @@ class PostgreSQLListener:
                 database=self.config.PG_DATABASE
             )
 
+            # Pool for outbox/retry claims and acks (LISTEN connection stays dedicated)
+            if not self.pool:
+                self.pool = await asyncpg.create_pool(
+                    host=self.config.PG_HOST,
+                    port=self.config.PG_PORT,
+                    user=self.config.PG_USER,
+                    password=self.config.PG_PASSWORD,
+                    database=self.config.PG_DATABASE,
+                    min_size=1,
+                    max_size=3
+                )
+                self.shards.pool = self.pool
+
             # Add listener for sync channel
             await self.conn.add_listener(
                 self.config.PG_NOTIFY_CHANNEL,
                 self.handle_notification
             )
 
+            # Reconnect as soon as the connection drops
+            self.conn.add_termination_listener(self.handle_connection_lost)
+
+            # Catch up on changes made while disconnected
+            self.outbox_wakeup.set()
+
             logger.info(f"✅ Connected to PostgreSQL and listening on channel: {self.config.PG_NOTIFY_CHANNEL}")
 
         except Exception as e:
@@ -80,6 +166,7 @@ class PostgreSQLListener:
         """Disconnect from PostgreSQL"""
         if self.conn:
             try:
+                self.conn.remove_termination_listener(self.handle_connection_lost)
                 await self.conn.remove_listener(
                     self.config.PG_NOTIFY_CHANNEL,
                     self.handle_notification
@@ -89,6 +176,10 @@ class PostgreSQLListener:
             except Exception as e:
                 logger.error(f"Error disconnecting: {e}")
 
+    def handle_connection_lost(self, connection) -> None:
+        """LISTEN connection closed unexpectedly - wake up run() to reconnect"""
+        self.wakeup.set()
+
     async def handle_notification(self, connection, pid, channel, payload):
         """
         Handle PostgreSQL NOTIFY event
@@ -97,8 +188,13 @@ class PostgreSQLListener:
             connection: asyncpg connection
             pid: PostgreSQL backend PID
             channel: Notification channel name
-            payload: JSON payload with change details
+            payload: JSON payload with change details (legacy mode)
         """
+        # Outbox mode: the notification only wakes up the drainer
+        if self.outbox_enabled:
+            self.outbox_wakeup.set()
+            return
+
         try:
             # Parse notification payload
             data = json.loads(payload)
@@ -106,30 +202,13 @@ class PostgreSQLListener:
             table_name = data.get('table')
             operation = data.get('operation')  # INSERT, UPDATE, DELETE
             entry_id = data.get('id')
-            pg_modified_time = data.get('pg_modified_time')
+            pg_modified_time = self._parse_pg_time(data.get('pg_modified_time'))
 
             logger.info(
                 f"📨 Received notification: {operation} on {table_name}:{entry_id}"
             )
 
-            # Skip if not a relevant table
-            if not table_name or not table_name.startswith('memento_'):
-                logger.debug(f"Skipping non-memento table: {table_name}")
-                return
-
-            # Skip system tables
-            if table_name in ('memento_sync_log', 'memento_sync_conflicts', 'memento_sync_metadata'):
-                logger.debug(f"Skipping system table: {table_name}")
-                return
-
-            # Process the change
-            await self.process_change(
-                table_name=table_name,
-                entry_id=entry_id,
-                operation=operation.lower()
-            )
-
-            self.events_processed += 1
+            await self.accept_event(table_name, entry_id, operation, pg_modified_time=pg_modified_time)
 
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON payload: {payload} - {e}")
@@ -139,12 +218,699 @@ class PostgreSQLListener:
             logger.error(f"Error handling notification: {e}", exc_info=True)
             self.events_failed += 1
 
+    async def accept_event(
+        self,
+        table_name: Optional[str],
+        entry_id: str,
+        operation: str,
+        outbox_ids: Optional[List[int]] = None,
+        attempt: int = 0,
+        retry_id: Optional[int] = None,
+        shard: Optional[int] = None,
+        pg_modified_time: Optional[datetime] = None
+    ) -> bool:
+        """
+        Filter a change event and pass it on to coalescing / the workers
+
+        Args:
+            outbox_ids: Outbox rows acknowledged once the event is processed
+            attempt: Failed attempts so far (re-dispatched retries)
+            retry_id: memento_sync_retry row of a re-dispatched retry
+            shard: Shard of a claimed row (in flight until completed)
+            pg_modified_time: Time of the change (end-to-end lag)
+
+        Returns:
+            False if the table is not synced to Memento
+        """
+        # Skip if not a relevant table
+        if not table_name or not table_name.startswith('memento_'):
+            logger.debug(f"Skipping non-memento table: {table_name}")
+            return False
+
+        # Skip system tables
+        if table_name in (
+            'memento_sync_log', 'memento_sync_conflicts', 'memento_sync_metadata',
+            'memento_sync_outbox', 'memento_sync_retry', 'memento_sync_dead_letter'
+        ):
+            logger.debug(f"Skipping system table: {table_name}")
+            return False
+
+        self.events_received += 1
+        self.received_rate.mark()
+
+        # Collapse repeated changes, then hand over to the worker owning this entry
+        await self.coalesce({
+            'table_name': table_name,
+            'entry_id': entry_id,
+            'operation': operation.lower(),
+            'received_at': time.monotonic(),
+            'outbox_ids': list(outbox_ids or []),
+            'attempt': attempt,
+            'retry_id': retry_id,
+            'shard': shard,
+            'pg_modified_time': pg_modified_time
+        })
+        return True
+
+    # ==================================================
+    # OUTBOX
+    # ==================================================
+
+    async def drain_outbox(self) -> None:
+        """Claim outbox batches on wake-up (NOTIFY, connect) or every poll interval"""
+        batch_size = max(1, self.config.LISTENER_OUTBOX_BATCH_SIZE)
+        poll_interval = max(0.5, self.config.LISTENER_OUTBOX_POLL_INTERVAL)
+
+        while True:
+            self.outbox_wakeup.clear()
+
+            # Bound claimed-but-unfinished rows (backpressure)
+            limit = min(batch_size, self.config.LISTENER_QUEUE_SIZE - len(self.outbox_inflight))
+            claimed = 0
+            if limit > 0 and self.pool:
+                try:
+                    claimed = await self.claim_outbox(limit)
+                except Exception as e:
+                    logger.error(f"Outbox claim failed: {e}")
+
+            # Full batch: more is probably waiting
+            if claimed and claimed == limit:
+                continue
+
+            try:
+                await asyncio.wait_for(self.outbox_wakeup.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def claim_outbox(self, limit: int) -> int:
+        """
+        Lease the oldest available outbox rows and queue them
+
+        FOR UPDATE SKIP LOCKED lets several listeners claim concurrently
+        without blocking each other; rows of a crashed listener become
+        available again when their lease expires. Leases of queued rows are
+        kept alive by renew_leases().
+
+        With sharding only rows of this listener's shards are claimed.
+
+        Returns:
+            Number of claimed rows
+        """
+        shards = self.shards.claimable()
+        if shards == []:
+            return 0
+
+        shard_sql = shard_expression('table_name', 'entry_id', '$6')
+        rows = await self.pool.fetch(
+            f"""
+            UPDATE memento_sync_outbox o
+            SET locked_until = NOW() + make_interval(secs => $2), locked_by = $3
+            FROM (
+                SELECT id FROM memento_sync_outbox
+                WHERE (locked_until IS NULL OR locked_until < NOW())
+                  AND id <> ALL($4::bigint[])
+                  AND ($5::int[] IS NULL OR {shard_sql} = ANY($5::int[]))
+                ORDER BY id
+                LIMIT $1
+                FOR UPDATE SKIP LOCKED
+            ) claimed
+            WHERE o.id = claimed.id
+            RETURNING o.id, o.table_name, o.entry_id, o.operation, o.pg_modified_time,
+                      {shard_expression('o.table_name', 'o.entry_id', '$6')} AS shard
+            """,
+            limit,
+            float(self.config.LISTENER_OUTBOX_LEASE),
+            self.listener_id,
+            list(self.outbox_inflight),
+            shards,
+            max(1, self.shards.num_shards)
+        )
+
+        for row in sorted(rows, key=lambda r: r['id']):
+            self.outbox_inflight.add(row['id'])
+            self.shards.acquire(row['shard'])
+            accepted = await self.accept_event(
+                row['table_name'], row['entry_id'], row['operation'], [row['id']],
+                shard=row['shard'], pg_modified_time=row['pg_modified_time']
+            )
+            if not accepted:
+                await self.complete_event({'outbox_ids': [row['id']], 'shard': row['shard']}, True)
+
+        if rows:
+            logger.debug(f"Claimed {len(rows)} outbox rows")
+        return len(rows)
+
+    async def renew_leases(self) -> None:
+        """
+        Extend the leases of in-flight outbox and retry rows
+
+        Claimed rows can wait in the coalescing window and the worker queues
+        (up to LISTENER_QUEUE_SIZE of them) for longer than
+        LISTENER_OUTBOX_LEASE; without renewal another listener would claim
+        them again. Runs every LISTENER_OUTBOX_LEASE / 3 seconds.
+        """
+        lease = float(self.config.LISTENER_OUTBOX_LEASE)
+        interval = max(1.0, lease / 3)
+
+        while True:
+            await asyncio.sleep(interval)
+
+            outbox_ids = list(self.outbox_inflight)
+            retry_ids = list(self.retry_inflight)
+            if not self.pool or not (outbox_ids or retry_ids):
+                continue
+
+            try:
+                async with self.pool.acquire() as conn:
+                    renewed = 0
+                    if outbox_ids:
+                        renewed += len(await conn.fetch(
+                            """
+                            UPDATE memento_sync_outbox
+                            SET locked_until = NOW() + make_interval(secs => $2)
+                            WHERE id = ANY($1::bigint[]) AND locked_by = $3
+                            RETURNING id
+                            """,
+                            outbox_ids, lease, self.listener_id
+                        ))
+                    if retry_ids:
+                        # next_attempt_at is the lease of a claimed retry
+                        renewed += len(await conn.fetch(
+                            """
+                            UPDATE memento_sync_retry
+                            SET next_attempt_at = NOW() + make_interval(secs => $2)
+                            WHERE id = ANY($1::bigint[]) AND locked_by = $3
+                            RETURNING id
+                            """,
+                            retry_ids, lease, self.listener_id
+                        ))
+            except Exception as e:
+                logger.error(f"Lease renewal failed: {e}")
+                continue
+
+            # Completed in the meantime, or the lease was lost to another listener
+            missing = len(outbox_ids) + len(retry_ids) - renewed
+            if missing:
+                logger.debug(f"Renewed {renewed} leases, {missing} rows no longer leased by this listener")
+
+    # ==================================================
+    # RETRY SCHEDULER
+    # ==================================================
+
+    async def dispatch_retries(self) -> None:
+        """Re-dispatch due retries every LISTENER_RETRY_POLL_INTERVAL"""
+        batch_size = max(1, self.config.LISTENER_OUTBOX_BATCH_SIZE)
+        poll_interval = max(0.5, self.config.LISTENER_RETRY_POLL_INTERVAL)
+
+        while True:
+            limit = min(batch_size, self.config.LISTENER_QUEUE_SIZE - len(self.retry_inflight))
+            claimed = 0
+            if limit > 0 and self.pool:
+                try:
+                    claimed = await self.claim_retries(limit)
+                except Exception as e:
+                    logger.error(f"Retry claim failed: {e}")
+
+            # Full batch: more is probably due
+            if claimed and claimed == limit:
+                continue
+
+            await asyncio.sleep(poll_interval)
+
+    async def claim_retries(self, limit: int) -> int:
+        """
+        Lease due retries and queue them
+
+        The lease is next_attempt_at itself: a claimed row is not due again
+        until LISTENER_OUTBOX_LEASE passes, unless complete_event reschedules
+        or deletes it first (renew_leases() keeps it alive). With sharding only rows of this listener's
+        shards are claimed.
+
+        Returns:
+            Number of claimed rows
+        """
+        shards = self.shards.claimable()
+        if shards == []:
+            return 0
+
+        shard_sql = shard_expression('table_name', 'entry_id', '$6')
+        rows = await self.pool.fetch(
+            f"""
+            UPDATE memento_sync_retry r
+            SET next_attempt_at = NOW() + make_interval(secs => $2), locked_by = $3
+            FROM (
+                SELECT id FROM memento_sync_retry
+                WHERE next_attempt_at <= NOW()
+                  AND id <> ALL($4::bigint[])
+                  AND ($5::int[] IS NULL OR {shard_sql} = ANY($5::int[]))
+                ORDER BY next_attempt_at
+                LIMIT $1
+                FOR UPDATE SKIP LOCKED
+            ) due
+            WHERE r.id = due.id
+            RETURNING r.id, r.table_name, r.entry_id, r.operation, r.attempts,
+                      {shard_expression('r.table_name', 'r.entry_id', '$6')} AS shard
+            """,
+            limit,
+            float(self.config.LISTENER_OUTBOX_LEASE),
+            self.listener_id,
+            list(self.retry_inflight),
+            shards,
+            max(1, self.shards.num_shards)
+        )
+
+        for row in rows:
+            self.retry_inflight.add(row['id'])
+            self.shards.acquire(row['shard'])
+            self.events_retried += 1
+            logger.info(
+                f"🔁 Retrying {row['operation']} on {row['table_name']}:{row['entry_id']} "
+                f"(attempt {row['attempts'] + 1}/{self.config.MAX_RETRY_ATTEMPTS})"
+            )
+            accepted = await self.accept_event(
+                row['table_name'], row['entry_id'], row['operation'],
+                attempt=row['attempts'], retry_id=row['id'], shard=row['shard']
+            )
+            if not accepted:
+                await self.complete_event({'retry_id': row['id'], 'shard': row['shard']}, True)
+
+        return len(rows)
+
+    async def schedule_retry(self, conn: asyncpg.Connection, event: Dict[str, Any], error: Optional[str]) -> None:
+        """
+        Record a failed event in memento_sync_retry
+
+        The next attempt is due after RETRY_DELAY * 2^(attempts - 1) seconds
+        (capped at RETRY_MAX_DELAY) with jitter (50-100%), so entries that
+        failed together (e.g. during a Memento outage) do not retry in
+        lockstep. After MAX_RETRY_ATTEMPTS failures the entry moves to
+        memento_sync_dead_letter.
+        """
+        row = await conn.fetchrow(
+            """
+            INSERT INTO memento_sync_retry AS r
+                (table_name, entry_id, operation, attempts, next_attempt_at, last_error)
+            VALUES ($1, $2, $3, 1, NOW() + make_interval(secs => $4 * (0.5 + random() / 2)), $6)
+            ON CONFLICT (table_name, entry_id) DO UPDATE
+            SET operation = EXCLUDED.operation,
+                attempts = r.attempts + 1,
+                next_attempt_at = NOW() + make_interval(
+                    secs => LEAST($5, $4 * power(2, r.attempts)) * (0.5 + random() / 2)
+                ),
+                locked_by = NULL,
+                last_error = EXCLUDED.last_error,
+                updated_at = NOW()
+            RETURNING id, attempts, next_attempt_at - NOW() AS delay
+            """,
+            event['table_name'],
+            event['entry_id'],
+            event['operation'],
+            float(self.config.RETRY_DELAY),
+            float(self.config.RETRY_MAX_DELAY),
+            error
+        )
+
+        if row['attempts'] < self.config.MAX_RETRY_ATTEMPTS:
+            logger.warning(
+                f"Retry {row['attempts']}/{self.config.MAX_RETRY_ATTEMPTS} of "
+                f"{event['table_name']}:{event['entry_id']} in {row['delay'].total_seconds():.0f}s"
+            )
+            return
+
+        await conn.execute(
+            """
+            WITH dead AS (
+                DELETE FROM memento_sync_retry WHERE id = $1
+                RETURNING table_name, entry_id, operation, attempts, last_error, first_failed_at
+            )
+            INSERT INTO memento_sync_dead_letter
+                (table_name, entry_id, operation, attempts, last_error, first_failed_at)
+            SELECT table_name, entry_id, operation, attempts, last_error, first_failed_at FROM dead
+            """,
+            row['id']
+        )
+        self.events_dead_lettered += 1
+        logger.error(
+            f"☠️  Giving up on {event['table_name']}:{event['entry_id']} after "
+            f"{row['attempts']} attempts - moved to dead letters"
+        )
+
+    async def complete_event(self, event: Dict[str, Any], success: bool, error: Optional[str] = None) -> None:
+        """
+        Acknowledge a processed event
+
+        Its outbox rows are deleted either way - a failure is handed over to
+        the retry scheduler (schedule_retry) in the same transaction. A
+        successful retry removes the entry from memento_sync_retry.
+        """
+        outbox_ids = event.get('outbox_ids') or []
+        retry_id = event.get('retry_id')
+
+        if success and not outbox_ids and retry_id is None:
+            return
+
+        try:
+            if not self.pool:
+                raise RuntimeError("no database pool")
+
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    if outbox_ids:
+                        await conn.execute(
+                            "DELETE FROM memento_sync_outbox WHERE id = ANY($1::bigint[])",
+                            outbox_ids
+                        )
+
+                    if not success:
+                        await self.schedule_retry(conn, event, error)
+                    elif retry_id is not None:
+                        await conn.execute("DELETE FROM memento_sync_retry WHERE id = $1", retry_id)
+        except Exception as e:
+            # Outbox rows / retries become available again when their lease expires
+            logger.error(f"Failed to acknowledge {event.get('table_name')}:{event.get('entry_id')}: {e}")
+        finally:
+            if outbox_ids:
+                self.outbox_inflight.difference_update(outbox_ids)
+                self.outbox_wakeup.set()
+            if retry_id is not None:
+                self.retry_inflight.discard(retry_id)
+            self.shards.release(event.get('shard'))
+
+    async def drop_event(self, event: Dict[str, Any]) -> None:
+        """
+        Give up a queued event of a shard this listener no longer holds
+
+        Its outbox / retry rows are not acknowledged - the new owner of the
+        shard processes them. The row leases are released (best effort) so
+        it does not have to wait for them to expire.
+        """
+        outbox_ids = event.get('outbox_ids') or []
+        retry_id = event.get('retry_id')
+        self.events_dropped += 1
+        logger.warning(
+            f"Dropping {event['table_name']}:{event['entry_id']} - shard {event.get('shard')} "
+            f"is no longer leased by this listener"
+        )
+
+        try:
+            if self.pool and (outbox_ids or retry_id is not None):
+                async with self.pool.acquire() as conn:
+                    if outbox_ids:
+                        await conn.execute(
+                            """
+                            UPDATE memento_sync_outbox SET locked_until = NULL, locked_by = NULL
+                            WHERE id = ANY($1::bigint[]) AND locked_by = $2
+                            """,
+                            outbox_ids, self.listener_id
+                        )
+                    if retry_id is not None:
+                        await conn.execute(
+                            """
+                            UPDATE memento_sync_retry SET next_attempt_at = NOW(), locked_by = NULL
+                            WHERE id = $1 AND locked_by = $2
+                            """,
+                            retry_id, self.listener_id
+                        )
+        except Exception as e:
+            # Leases expire on their own
+            logger.error(f"Failed to release leases of {event['table_name']}:{event['entry_id']}: {e}")
+        finally:
+            self.outbox_inflight.difference_update(outbox_ids)
+            if retry_id is not None:
+                self.retry_inflight.discard(retry_id)
+            self.shards.release(event.get('shard'))
+
+    # ==================================================
+    # WORKER POOL
+    # ==================================================
+
+    def worker_index(self, table_name: str, entry_id: str) -> int:
+        """Worker owning (table, id) - stable across restarts (crc32, not hash())"""
+        return zlib.crc32(f"{table_name}:{entry_id}".encode()) % self.num_workers
+
+    async def enqueue(self, event: Dict[str, Any]) -> None:
+        """
+        Queue an event for its worker, waiting while the queue is full
+
+        The per-queue lock is FIFO, so events keep their notification order
+        even when several of them wait for a free slot.
+        """
+        index = self.worker_index(event['table_name'], event['entry_id'])
+        async with self.enqueue_locks[index]:
+            await self.queues[index].put(event)
+
+    async def coalesce(self, event: Dict[str, Any]) -> None:
+        """
+        Collapse changes of one entry within LISTENER_COALESCE_WINDOW
+
+        The first change of an entry opens the window; later changes only
+        update the pending event (the worker reads the latest row state
+        anyway). A delete replaces any pending update and is queued
+        immediately.
+        """
+        if not self.coalesce_window:
+            await self.enqueue(event)
+            return
+
+        key = (event['table_name'], event['entry_id'])
+        pending = self.pending.get(key)
+
+        if pending:
+            self.events_coalesced += 1
+            # Keep the first receive/change time for lag measurement
+            event['received_at'] = pending['received_at']
+            event['pg_modified_time'] = pending['pg_modified_time'] or event['pg_modified_time']
+            event['outbox_ids'] = pending['outbox_ids'] + event['outbox_ids']
+            event['attempt'] = max(pending['attempt'], event['attempt'])
+            if event['retry_id'] is None:
+                event['retry_id'] = pending['retry_id']
+            # One in-flight count per pending event
+            if pending['shard'] is not None:
+                self.shards.release(event['shard'])
+                event['shard'] = pending['shard']
+
+        if event['operation'] == 'delete':
+            self.flush_pending(key, event)
+            return
+
+        if pending:
+            pending.update(event)
+            return
+
+        self.pending[key] = event
+        self.pending_timers[key] = asyncio.get_running_loop().call_later(
+            self.coalesce_window, self.flush_pending, key
+        )
+
+    def flush_pending(self, key: tuple, event: Optional[Dict[str, Any]] = None) -> None:
+        """Queue the pending event of an entry (or `event` in its place)"""
+        timer = self.pending_timers.pop(key, None)
+        if timer:
+            timer.cancel()
+
+        pending = self.pending.pop(key, None)
+        event = event or pending
+        if event:
+            # Task creation order = queue order (enqueue locks are FIFO)
+            task = asyncio.get_running_loop().create_task(self.enqueue(event))
+            self.flush_tasks.add(task)
+            task.add_done_callback(self.flush_tasks.discard)
+
+    def flush_all_pending(self) -> None:
+        """Queue all pending events right away (shutdown)"""
+        for key in list(self.pending):
+            self.flush_pending(key)
+
+    def start_workers(self) -> None:
+        """Create worker queues and tasks"""
+        self.queues = [asyncio.Queue(maxsize=self.config.LISTENER_QUEUE_SIZE) for _ in range(self.num_workers)]
+        self.enqueue_locks = [asyncio.Lock() for _ in range(self.num_workers)]
+        self.worker_stats = [
+            {'processed': 0, 'failed': 0, 'busy_seconds': 0.0}
+            for _ in range(self.num_workers)
+        ]
+        self.workers = [
+            asyncio.create_task(self.worker(index), name=f"sync-worker-{index}")
+            for index in range(self.num_workers)
+        ]
+        logger.info(f"Started {self.num_workers} sync workers (queue size {self.config.LISTENER_QUEUE_SIZE})")
+
+    async def stop_workers(self, timeout: float = 30.0) -> None:
+        """Let workers finish queued events (up to timeout), then cancel them"""
+        if not self.workers:
+            return
+
+        async def drain():
+            # Flushed events still waiting for a queue slot first
+            await asyncio.gather(*self.flush_tasks, return_exceptions=True)
+            await asyncio.gather(*(queue.join() for queue in self.queues))
+
+        try:
+            await asyncio.wait_for(drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Workers did not drain within {timeout}s - {self.queue_depth()} events dropped")
+
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def worker(self, index: int) -> None:
+        """
+        Process events of one queue sequentially
+
+        Updates of one table already waiting behind an event are taken
+        along (up to LISTENER_BATCH_SIZE) and synced with one
+        PostgreSQLToMementoSync.sync_entries() call. A batch ends at the
+        first event that does not fit (other table, delete, other attempt,
+        or an entry already in the batch); that event is processed next, so
+        queue order is kept.
+        """
+        queue = self.queues[index]
+        stats = self.worker_stats[index]
+        carry: Optional[Dict[str, Any]] = None
+
+        while True:
+            if carry is None:
+                event = await queue.get()
+            else:
+                event, carry = carry, None
+
+            batch = [event]
+            if event['operation'] != 'delete':
+                entry_ids = {event['entry_id']}
+                while len(batch) < self.batch_size and not queue.empty():
+                    queued = queue.get_nowait()
+                    if (
+                        queued['table_name'] != event['table_name']
+                        or queued['operation'] == 'delete'
+                        or queued['attempt'] != event['attempt']
+                        or queued['entry_id'] in entry_ids
+                    ):
+                        carry = queued
+                        break
+                    batch.append(queued)
+                    entry_ids.add(queued['entry_id'])
+
+            # Shard lease lost while the event was queued: another listener owns it now
+            held = []
+            for queued in batch:
+                if self.shards.holds(queued.get('shard')):
+                    held.append(queued)
+                else:
+                    await self.drop_event(queued)
+                    queue.task_done()
+            if not held:
+                continue
+
+            start = time.monotonic()
+            try:
+                if len(held) == 1:
+                    results = [await self.process_change(
+                        table_name=event['table_name'],
+                        entry_id=held[0]['entry_id'],
+                        operation=held[0]['operation'],
+                        retry_count=held[0]['attempt']
+                    )]
+                else:
+                    results = await self.process_changes(
+                        table_name=event['table_name'],
+                        entry_ids=[queued['entry_id'] for queued in held],
+                        retry_count=event['attempt']
+                    )
+            except Exception as e:
+                logger.error(f"Worker {index} error: {e}", exc_info=True)
+                results = [{'success': False, 'error': str(e)}] * len(held)
+            finally:
+                stats['busy_seconds'] += time.monotonic() - start
+
+            for queued, result in zip(held, results):
+                await self.finish_event(queued, result, stats)
+                queue.task_done()
+
+    async def finish_event(self, event: Dict[str, Any], result: Dict[str, Any], stats: Dict[str, Any]) -> None:
+        """Acknowledge a processed event and record its outcome"""
+        success = bool(result.get('success') or result.get('skipped'))
+        await self.complete_event(event, success, result.get('error'))
+
+        self.processed_rate.mark()
+        self.event_histogram.observe(time.monotonic() - event['received_at'])
+        if result.get('success') and not result.get('skipped') and event['pg_modified_time']:
+            # Change committed in PostgreSQL -> accepted by Memento
+            lag = max(0.0, (datetime.now() - event['pg_modified_time']).total_seconds())
+            self.lag_histogram.observe(lag)
+            self.last_lag_seconds = lag
+
+        if success:
+            stats['processed'] += 1
+            self.events_processed += 1
+        else:
+            stats['failed'] += 1
+            self.events_failed += 1
+
+    @staticmethod
+    def _parse_pg_time(value: Optional[str]) -> Optional[datetime]:
+        """pg_modified_time from a NOTIFY payload (server-local, naive)"""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value).replace(tzinfo=None)
+        except ValueError:
+            return None
+
+    def queue_depth(self) -> int:
+        """Events waiting in all worker queues"""
+        return sum(queue.qsize() for queue in self.queues)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Listener statistics
+
+        Returns:
+            Totals, queue depth and per-worker throughput
+        """
+        uptime = (datetime.now() - self.start_time).total_seconds()
+
+        return {
+            'uptime_seconds': round(uptime, 1),
+            'events_received': self.events_received,
+            'events_coalesced': self.events_coalesced,
+            'pending': len(self.pending),
+            'outbox_inflight': len(self.outbox_inflight),
+            'retry_inflight': len(self.retry_inflight),
+            'shards': self.shards.stats(),
+            'events_retried': self.events_retried,
+            'events_dead_lettered': self.events_dead_lettered,
+            'events_dropped': self.events_dropped,
+            'http': self.http_client.stats(),
+            'events_processed': self.events_processed,
+            'events_failed': self.events_failed,
+            'received_per_second': round(self.received_rate.rate(), 3),
+            'processed_per_second': round(self.processed_rate.rate(), 3),
+            'last_lag_seconds': round(self.last_lag_seconds, 3) if self.last_lag_seconds is not None else None,
+            'rate_limiter': get_rate_limiter().stats(),
+            'sync_log_buffer': get_sync_log_buffer().stats(),
+            'queue_depth': self.queue_depth(),
+            'workers': [
+                {
+                    'worker': index,
+                    'queue_depth': self.queues[index].qsize(),
+                    'processed': stats['processed'],
+                    'failed': stats['failed'],
+                    'events_per_second': round((stats['processed'] + stats['failed']) / uptime, 3) if uptime else 0.0,
+                    'utilization': round(stats['busy_seconds'] / uptime, 3) if uptime else 0.0,
+                }
+                for index, stats in enumerate(self.worker_stats)
+            ]
+        }
+
     async def process_change(
         self,
         table_name: str,
         entry_id: str,
-        operation: str
-    ):
+        operation: str,
+        retry_count: int = 0
+    ) -> Dict[str, Any]:
         """
         Process a change notification by syncing to Memento
 
@@ -152,20 +918,23 @@ class PostgreSQLListener:
             table_name: PostgreSQL table name
             entry_id: Entry ID
             operation: 'insert', 'update', or 'delete'
+            retry_count: Failed attempts so far (logged in memento_sync_log)
+
+        Returns:
+            Sync result ('success' / 'skipped', 'error' on failure)
         """
         try:
             # Create database session
-            db = self.SessionLocal()
-
-            try:
+            async with self.SessionLocal() as db:
                 # Create sync handler
-                sync_handler = PostgreSQLToMementoSync(db)
+                sync_handler = PostgreSQLToMementoSync(db, http_client=self.http_client)
 
                 # Sync to Memento
                 result = await sync_handler.sync_entry(
                     table_name=table_name,
                     entry_id=entry_id,
-                    operation=operation
+                    operation=operation,
+                    retry_count=retry_count
                 )
 
                 if result.get('success'):
@@ -175,14 +944,57 @@ class PostgreSQLListener:
                 else:
                     logger.error(f"❌ Failed to sync {table_name}:{entry_id} - {result.get('error')}")
 
-                # Close aiohttp session
+                # Release aiohttp session (shared client stays open)
                 await sync_handler.close_session()
 
-            finally:
-                db.close()
+                return result
 
         except Exception as e:
             logger.error(f"Error processing change: {e}", exc_info=True)
+            return {'success': False, 'error': str(e)}
+
+    async def process_changes(
+        self,
+        table_name: str,
+        entry_ids: List[str],
+        retry_count: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Sync several inserted / updated entries of one table to Memento
+
+        Args:
+            table_name: PostgreSQL table name
+            entry_ids: Entry IDs (each at most once)
+            retry_count: Failed attempts so far (same for all entries)
+
+        Returns:
+            Sync results in the order of entry_ids
+        """
+        try:
+            async with self.SessionLocal() as db:
+                sync_handler = PostgreSQLToMementoSync(db, http_client=self.http_client)
+
+                results = await sync_handler.sync_entries(
+                    table_name=table_name,
+                    entry_ids=entry_ids,
+                    retry_count=retry_count
+                )
+
+                for entry_id, result in zip(entry_ids, results):
+                    if result.get('success'):
+                        logger.info(f"✅ Synced {table_name}:{entry_id} to Memento")
+                    elif result.get('skipped'):
+                        logger.info(f"⏭️  Skipped {table_name}:{entry_id} - {result.get('reason', 'No reason')}")
+                    else:
+                        logger.error(f"❌ Failed to sync {table_name}:{entry_id} - {result.get('error')}")
+
+                await sync_handler.close_session()
+
+                return results
+
+        except Exception as e:
+            logger.error(f"Error processing {len(entry_ids)} changes of {table_name}: {e}", exc_info=True)
+            return [{'success': False, 'error': str(e)} for _ in entry_ids]
 
     async def run(self):
         """Main listener loop"""
@@ -196,8 +1008,23 @@ class PostgreSQLListener:
         logger.info(f"  Channel: {self.config.PG_NOTIFY_CHANNEL}")
         logger.info(f"  PG → Memento: {'Enabled' if self.config.ENABLE_PG_TO_MEMENTO else 'Disabled'}")
         logger.info(f"  Conflict Resolution: {self.config.CONFLICT_RESOLUTION}")
+        logger.info(f"  Workers: {self.num_workers} (batches of up to {self.batch_size} entries)")
+        logger.info(f"  Outbox: {'Enabled' if self.outbox_enabled else 'Disabled (NOTIFY payloads only)'}")
+        logger.info(f"  Retries: {self.config.MAX_RETRY_ATTEMPTS} attempts, backoff from {self.config.RETRY_DELAY}s")
+        logger.info(f"  Shards: {self.shards.num_shards or 'Disabled (single listener)'}")
         logger.info("=================================================")
 
+        self.start_workers()
+        get_sync_log_buffer().start()
+        if self.outbox_enabled:
+            self.outbox_task = asyncio.create_task(self.drain_outbox(), name="outbox-drainer")
+        self.retry_task = asyncio.create_task(self.dispatch_retries(), name="retry-dispatcher")
+        self.lease_task = asyncio.create_task(self.renew_leases(), name="lease-renewer")
+        if self.shards.enabled:
+            self.shard_task = asyncio.create_task(self.shards.run(), name="shard-manager")
+        self.heartbeat_task = asyncio.create_task(self.heartbeat_loop(), name="heartbeat")
+        await self.start_metrics()
+
         while self.running:
             try:
                 # Connect to PostgreSQL
@@ -205,18 +1032,12 @@ class PostgreSQLListener:
 
                 logger.info("🎧 Listener active - waiting for notifications...")
 
-                # Keep connection alive
-                while self.running:
-                    await asyncio.sleep(1)
-
-                    # Heartbeat every 60 seconds
-                    if int(asyncio.get_event_loop().time()) % 60 == 0:
-                        uptime = datetime.now() - self.start_time
-                        logger.info(
-                            f"💓 Heartbeat - Uptime: {uptime}, "
-                            f"Processed: {self.events_processed}, "
-                            f"Failed: {self.events_failed}"
-                        )
+                # Wait for shutdown or a dropped connection (no polling)
+                await self.wakeup.wait()
+                self.wakeup.clear()
+
+                if self.running:
+                    raise ConnectionError("LISTEN connection lost")
 
             except asyncio.CancelledError:
                 logger.info("Listener cancelled")
@@ -230,12 +1051,184 @@ class PostgreSQLListener:
             finally:
                 await self.disconnect()
 
+        for task in (self.outbox_task, self.retry_task, self.lease_task, self.shard_task, self.heartbeat_task):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        self.flush_all_pending()
+        await self.stop_workers()
+        await get_sync_log_buffer().close()
+        await self.shards.release_all()
+
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+
+        await self.http_client.close()
+        await self.engine.dispose()
+
+        if self.metrics_server:
+            self.metrics_server.close()
+            await self.metrics_server.wait_closed()
+
         logger.info("Listener stopped")
 
+    # ==================================================
+    # HEARTBEAT & METRICS
+    # ==================================================
+
+    async def heartbeat_loop(self) -> None:
+        """Log a heartbeat (and write the metrics file) every LISTENER_HEARTBEAT_INTERVAL"""
+        interval = max(1.0, self.config.LISTENER_HEARTBEAT_INTERVAL)
+        next_beat = time.monotonic() + interval
+
+        while True:
+            # Fixed cadence: sleep to the next deadline, not for a fixed time
+            await asyncio.sleep(max(0.0, next_beat - time.monotonic()))
+            next_beat += interval
+
+            try:
+                self.heartbeat()
+                if self.config.LISTENER_METRICS_FILE:
+                    write_metrics_file(self.config.LISTENER_METRICS_FILE, self.render_metrics())
+            except Exception as e:
+                logger.error(f"Heartbeat failed: {e}")
+
+    def heartbeat(self) -> None:
+        """Log listener statistics"""
+        stats = self.stats()
+        uptime = datetime.now() - self.start_time
+        lag = f"{stats['last_lag_seconds']}s" if stats['last_lag_seconds'] is not None else 'n/a'
+        logger.info(
+            f"💓 Heartbeat - Uptime: {uptime}, "
+            f"Processed: {self.events_processed}, "
+            f"Failed: {self.events_failed}, "
+            f"Coalesced: {self.events_coalesced}, "
+            f"Queued: {self.queue_depth()}, "
+            f"Retried: {self.events_retried}, "
+            f"Dead-lettered: {self.events_dead_lettered}"
+        )
+        logger.info(
+            f"   Throughput: {stats['received_per_second']}/s received, "
+            f"{stats['processed_per_second']}/s processed, last lag {lag}"
+        )
+        logger.info(
+            f"   Memento API: {stats['http']['requests']} requests, "
+            f"p50 {stats['http']['latency_p50_ms']} ms, p99 {stats['http']['latency_p99_ms']} ms, "
+            f"connections {stats['http']['connections_created']} new / "
+            f"{stats['http']['connections_reused']} reused, "
+            f"rate limit waits {stats['rate_limiter']['waited']} ({stats['rate_limiter']['wait_seconds_total']}s)"
+        )
+        if self.shards.enabled:
+            logger.info(
+                f"   Shards: {len(stats['shards']['owned'])}/{self.shards.num_shards} owned, "
+                f"{len(stats['shards']['draining'])} draining, "
+                f"{stats['shards']['live_listeners']} listeners"
+            )
+        for worker in stats['workers']:
+            logger.info(
+                f"   Worker {worker['worker']}: {worker['processed']} ok, "
+                f"{worker['failed']} failed, {worker['events_per_second']}/s, "
+                f"utilization {worker['utilization']:.0%}, queued {worker['queue_depth']}"
+            )
+
+    async def start_metrics(self) -> None:
+        """Serve /metrics and /stats on LISTENER_METRICS_PORT (if set)"""
+        if not self.config.LISTENER_METRICS_PORT or self.metrics_server:
+            return
+
+        try:
+            self.metrics_server = await start_metrics_server(
+                {
+                    '/metrics': (CONTENT_TYPE, self.render_metrics),
+                    '/stats': ('application/json', lambda: json.dumps(self.stats(), default=str)),
+                },
+                self.config.LISTENER_METRICS_HOST,
+                self.config.LISTENER_METRICS_PORT
+            )
+        except OSError as e:
+            logger.error(f"Metrics server not started: {e}")
+
+    def render_metrics(self) -> str:
+        """All listener metrics in Prometheus text format"""
+        prefix = 'memento_listener'
+        http = self.http_client
+        limiter = get_rate_limiter()
+        worker_label = lambda index: f'worker="{index}"'
+
+        lines = []
+        lines += render_metric(f'{prefix}_events_total', 'counter', 'Change events by outcome', [
+            ('outcome="received"', self.events_received),
+            ('outcome="coalesced"', self.events_coalesced),
+            ('outcome="processed"', self.events_processed),
+            ('outcome="failed"', self.events_failed),
+            ('outcome="retried"', self.events_retried),
+            ('outcome="dead_lettered"', self.events_dead_lettered),
+            ('outcome="dropped"', self.events_dropped),
+        ])
+        lines += render_metric(f'{prefix}_events_per_second', 'gauge', 'Events per second over the last minute', [
+            ('kind="received"', round(self.received_rate.rate(), 3)),
+            ('kind="processed"', round(self.processed_rate.rate(), 3)),
+        ])
+        lines += render_metric(f'{prefix}_queue_depth', 'gauge', 'Events waiting per worker queue', [
+            (worker_label(index), queue.qsize()) for index, queue in enumerate(self.queues)
+        ])
+        lines += render_metric(f'{prefix}_inflight', 'gauge', 'Events not yet completed', [
+            ('stage="coalescing"', len(self.pending)),
+            ('stage="outbox"', len(self.outbox_inflight)),
+            ('stage="retry"', len(self.retry_inflight)),
+        ])
+        lines += render_metric(f'{prefix}_worker_busy_seconds_total', 'counter', 'Time workers spent syncing', [
+            (worker_label(index), round(stats['busy_seconds'], 3)) for index, stats in enumerate(self.worker_stats)
+        ])
+        lines += render_metric(
+            f'{prefix}_sync_lag_seconds', 'histogram',
+            'PostgreSQL change (pg_modified_time) to successful Memento update',
+            [('', self.lag_histogram)]
+        )
+        lines += render_metric(
+            f'{prefix}_event_duration_seconds', 'histogram',
+            'Event received to processed (coalescing, queueing, sync)',
+            [('', self.event_histogram)]
+        )
+        lines += render_metric(f'{prefix}_memento_request_duration_seconds', 'histogram', 'Memento API request latency', [
+            ('', http.latency_histogram)
+        ])
+        lines += render_metric(f'{prefix}_memento_requests_total', 'counter', 'Memento API requests', [
+            ('outcome="completed"', http.requests),
+            ('outcome="error"', http.errors),
+        ])
+        lines += render_metric(f'{prefix}_memento_connections_total', 'counter', 'Memento API connections', [
+            ('kind="created"', http.connections_created),
+            ('kind="reused"', http.connections_reused),
+        ])
+        lines += render_metric(f'{prefix}_rate_limit_wait_seconds', 'histogram', 'Wait for a Memento API rate limit token', [
+            ('', limiter.wait_histogram)
+        ])
+        log_buffer = get_sync_log_buffer()
+        lines += render_metric(f'{prefix}_sync_log_buffered_rows', 'gauge', 'memento_sync_log rows waiting for a flush', [
+            ('', len(log_buffer.rows))
+        ])
+        lines += render_metric(f'{prefix}_sync_log_rows_total', 'counter', 'memento_sync_log rows flushed by the buffer or written synchronously on overflow', [
+            ('path="flushed"', log_buffer.flushed),
+            ('path="overflow"', log_buffer.overflows),
+        ])
+        if self.shards.enabled:
+            lines += render_metric(f'{prefix}_shards_owned', 'gauge', 'Shards leased by this listener', [
+                ('', len(self.shards.owned))
+            ])
+            lines += render_metric(f'{prefix}_shard_rebalances_total', 'counter', 'Changes of the owned shard set', [
+                ('', self.shards.rebalances)
+            ])
+
+        return '\n'.join(lines) + '\n'
+
     def stop(self):
         """Stop the listener"""
         logger.info("Stopping listener...")
         self.running = False
+        self.wakeup.set()
 
     async def shutdown(self, signal_name: str):
         """Graceful shutdown"""
@@ -291,3 +1284,5 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        shutdown_logging()
@@ -4,22 +4,35 @@ PostgreSQL to Memento Sync Handler
 Handles sync from PostgreSQL to Memento Database:
 - Receives notifications from PostgreSQL triggers
 - Fetches changed data from PostgreSQL
-- Checks for conflicts
-- Updates entries in Memento via API
+- Checks for conflicts, or merges both sides' field changes with
+  CONFLICT_RESOLUTION=merge (with CONFLICT_CHECK_MODE=local, entries synced
+  from Memento within CONFLICT_CHECK_MAX_AGE are pushed without a check,
+  saving a GET per update); sync_entries() loads rows, snapshots and
+  conflict checks of a batch with one query per table
+- Updates entries in Memento via API (only fields changed since the last
+  sync, see sync_snapshots.py)
 - Handles rate limiting
+- Retries transient API errors (429, 5xx, connection) in place; lasting
+  failures are retried later by the listener (memento_sync_retry)
 """
 
-import logging
 import asyncio
-from typing import Dict, Any, Optional, List
+import logging
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import aiohttp
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert, JSONB
 
-from models import SyncLog, TABLE_TO_MODEL
+from models import SyncLog, SyncSnapshot, TABLE_TO_MODEL
+from sync_snapshots import SYSTEM_COLUMNS, row_snapshot, data_snapshot, changed_columns
 from conflict_resolver import ConflictResolver
+from memento_to_pg import prepare_entry
 from config import Config
+from rate_limiter import get_rate_limiter
+from sync_log_buffer import get_sync_log_buffer
+from memento_client import MementoHttpClient
 import sys
 sys.path.append('..')
 from library_mapping import get_slovak_name_by_table, get_library_id
@@ -30,7 +43,7 @@ logger = logging.getLogger(__name__)
 class PostgreSQLToMementoSync:
     """Handles synchronization from PostgreSQL to Memento"""
 
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: AsyncSession, http_client: Optional[MementoHttpClient] = None):
         self.db = db_session
         self.config = Config()
         self.conflict_resolver = ConflictResolver(db_session)
@@ -38,43 +51,43 @@ class PostgreSQLToMementoSync:
         self.api_key = self.config.MEMENTO_API_KEY
         self.session: Optional[aiohttp.ClientSession] = None
 
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 60.0 / self.config.MEMENTO_RATE_LIMIT  # seconds between requests
+        # Shared pooled client (listener) or a private one closed by close_session()
+        self.http_client = http_client
+        self.owns_http_client = http_client is None
+
+        # Rate limiting (process-wide token buckets, see rate_limiter.py)
+        self.rate_limiter = get_rate_limiter()
+
+        # Failed attempts of the entry being synced (memento_sync_log.retry_count)
+        self.retry_count = 0
+
+        # Write-behind memento_sync_log buffer (listener)
+        self.log_buffer = get_sync_log_buffer()
 
     async def init_session(self):
         """Initialize aiohttp session"""
         if not self.session:
-            self.session = aiohttp.ClientSession(
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                }
-            )
+            if self.http_client is None:
+                self.http_client = MementoHttpClient(self.api_key)
+            self.session = await self.http_client.get_session()
 
     async def close_session(self):
-        """Close aiohttp session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
-
-    async def rate_limit(self):
-        """Enforce rate limiting (10 requests/minute)"""
-        now = asyncio.get_event_loop().time()
-        time_since_last = now - self.last_request_time
-
-        if time_since_last < self.min_request_interval:
-            wait_time = self.min_request_interval - time_since_last
-            logger.debug(f"Rate limiting: waiting {wait_time:.2f}s")
-            await asyncio.sleep(wait_time)
+        """Release aiohttp session (a shared client stays open)"""
+        if self.owns_http_client and self.http_client:
+            await self.http_client.close()
+            self.http_client = None
+        self.session = None
 
-        self.last_request_time = asyncio.get_event_loop().time()
+    async def rate_limit(self, library_id: Optional[str] = None):
+        """Enforce MEMENTO_RATE_LIMIT across all events and processes"""
+        await self.rate_limiter.acquire(library_id)
 
     async def sync_entry(
         self,
         table_name: str,
         entry_id: str,
-        operation: str = 'update'
+        operation: str = 'update',
+        retry_count: int = 0
     ) -> Dict[str, Any]:
         """
         Sync single entry from PostgreSQL to Memento
@@ -83,10 +96,13 @@ class PostgreSQLToMementoSync:
             table_name: PostgreSQL table name
             entry_id: Entry ID
             operation: 'update' or 'delete'
+            retry_count: Failed attempts so far (listener retry scheduler)
 
         Returns:
             Sync result
         """
+        self.retry_count = retry_count
+
         try:
             # Get library info
             library_name = get_slovak_name_by_table(table_name)
@@ -118,7 +134,7 @@ class PostgreSQLToMementoSync:
             if not model_class:
                 raise ValueError(f"Model not found for table: {table_name}")
 
-            pg_entry = self.db.query(model_class).filter_by(id=entry_id).first()
+            pg_entry = (await self.conflict_resolver.load_entries([(table_name, entry_id)])).get((table_name, entry_id))
 
             if not pg_entry and operation != 'delete':
                 raise ValueError(f"Entry {entry_id} not found in {table_name}")
@@ -140,14 +156,26 @@ class PostgreSQLToMementoSync:
                     'reason': 'Change originated from Memento'
                 }
 
-            # Get Memento entry to check for conflicts
-            memento_entry = await self._fetch_memento_entry(library_id, entry_id)
+            # Fields changed since the last sync (all if never synced)
+            snapshot = row_snapshot(pg_entry)
+            base = await self._load_snapshot(table_name, entry_id)
+            columns = changed_columns(snapshot, base)
+
+            if columns is not None and not columns:
+                logger.info(f"No field changes in {table_name}:{entry_id} since last sync - skipping")
+                return {
+                    'success': True,
+                    'skipped': True,
+                    'reason': 'No field changes since last sync'
+                }
+
+            # Get Memento version of the entry to check for conflicts
+            memento_exists = False
+            if not self._skip_conflict_check(entry_id, pg_entry):
+                memento_exists, memento_modified = await self._memento_version(library_id, entry_id)
 
-            if memento_entry:
+            if memento_exists:
                 # Check for conflict
-                memento_modified = self._parse_memento_timestamp(
-                    memento_entry.get('modifiedTime')
-                )
                 pg_modified = pg_entry.pg_modified_time if hasattr(pg_entry, 'pg_modified_time') else datetime.now()
 
                 resolution = await self.conflict_resolver.resolve_and_sync(
@@ -156,7 +184,8 @@ class PostgreSQLToMementoSync:
                     table_name=table_name,
                     entry_id=entry_id,
                     pg_modified_time=pg_modified,
-                    memento_modified_time=memento_modified
+                    memento_modified_time=memento_modified,
+                    pg_entry=pg_entry
                 )
 
                 if resolution == 'memento_wins':
@@ -168,33 +197,25 @@ class PostgreSQLToMementoSync:
                         'reason': 'Memento has newer version (conflict resolved)'
                     }
 
-            # Prepare entry data for Memento
-            entry_data = self._prepare_memento_data(pg_entry)
-
-            # Update Memento entry
-            result = await self._update_memento_entry(
-                library_id=library_id,
-                entry_id=entry_id,
-                entry_data=entry_data
-            )
+                if resolution == 'merge':
+                    return await self._merge_entry(
+                        library_id=library_id,
+                        library_name=library_name,
+                        table_name=table_name,
+                        pg_entry=pg_entry,
+                        snapshot=snapshot,
+                        base=base
+                    )
 
-            # Log success
-            await self._log_sync(
+            return await self._push_entry(
                 library_id=library_id,
                 library_name=library_name,
-                entry_id=entry_id,
-                sync_direction='pg_to_memento',
-                success=True
+                table_name=table_name,
+                pg_entry=pg_entry,
+                snapshot=snapshot,
+                columns=columns
             )
 
-            return {
-                'success': True,
-                'entry_id': entry_id,
-                'library': library_name,
-                'operation': 'update',
-                'timestamp': datetime.now().isoformat()
-            }
-
         except Exception as e:
             logger.error(f"Error syncing {table_name}:{entry_id} to Memento: {e}", exc_info=True)
 
@@ -218,12 +239,321 @@ class PostgreSQLToMementoSync:
                 'timestamp': datetime.now().isoformat()
             }
 
-    def _prepare_memento_data(self, pg_entry) -> Dict[str, Any]:
+    async def sync_entries(
+        self,
+        table_name: str,
+        entry_ids: List[str],
+        retry_count: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Sync several updated entries of one table from PostgreSQL to Memento
+
+        Rows and snapshots are loaded with one query each and conflicts are
+        checked in one batch (ConflictResolver.resolve_conflicts); only the
+        PATCHes (and, with CONFLICT_CHECK_MODE=remote, the GETs) stay per
+        entry. Used by the listener workers for queued updates of one table
+        (LISTENER_BATCH_SIZE).
+
+        Args:
+            table_name: PostgreSQL table name
+            entry_ids: Entry IDs
+            retry_count: Failed attempts so far
+
+        Returns:
+            List of per-entry results (as sync_entry()), in the same order
+            as entry_ids
+        """
+        self.retry_count = retry_count
+
+        library_name = get_slovak_name_by_table(table_name)
+        library_id = get_library_id(library_name) if library_name else None
+
+        if not library_name or not library_id or not self.config.ENABLE_PG_TO_MEMENTO:
+            # Same outcome for every entry
+            return [
+                await self.sync_entry(table_name, entry_id, retry_count=retry_count)
+                for entry_id in entry_ids
+            ]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, Tuple[Any, Dict[str, Any], Optional[List[str]]]] = {}
+        checks = []
+
+        try:
+            entries = await self.conflict_resolver.load_entries((table_name, entry_id) for entry_id in entry_ids)
+            bases = await self._load_snapshots(table_name, entry_ids)
+        except Exception as e:
+            logger.error(f"Error loading {table_name} batch, syncing entries one by one: {e}")
+            await self.db.rollback()
+            return [
+                await self.sync_entry(table_name, entry_id, retry_count=retry_count)
+                for entry_id in entry_ids
+            ]
+
+        for entry_id in dict.fromkeys(entry_ids):
+            pg_entry = entries.get((table_name, entry_id))
+
+            if not pg_entry:
+                results[entry_id] = await self._entry_failed(
+                    library_id, library_name, entry_id, f"Entry {entry_id} not found in {table_name}"
+                )
+                continue
+
+            if hasattr(pg_entry, 'sync_source') and pg_entry.sync_source == 'memento':
+                results[entry_id] = {
+                    'success': True,
+                    'skipped': True,
+                    'reason': 'Change originated from Memento'
+                }
+                continue
+
+            snapshot = row_snapshot(pg_entry)
+            columns = changed_columns(snapshot, bases.get(entry_id))
+
+            if columns is not None and not columns:
+                results[entry_id] = {
+                    'success': True,
+                    'skipped': True,
+                    'reason': 'No field changes since last sync'
+                }
+                continue
+
+            if not self._skip_conflict_check(entry_id, pg_entry):
+                memento_exists, memento_modified = await self._memento_version(library_id, entry_id)
+                if memento_exists:
+                    checks.append((table_name, entry_id, memento_modified))
+
+            pending[entry_id] = (pg_entry, snapshot, columns)
+
+        resolutions = await self.conflict_resolver.resolve_conflicts(
+            library_id=library_id,
+            library_name=library_name,
+            checks=checks,
+            loaded=entries
+        )
+
+        for entry_id, (pg_entry, snapshot, columns) in pending.items():
+            resolution = resolutions.get((table_name, entry_id))
+
+            if resolution == 'memento_wins':
+                results[entry_id] = {
+                    'success': False,
+                    'skipped': True,
+                    'reason': 'Memento has newer version (conflict resolved)'
+                }
+                continue
+
+            try:
+                if resolution == 'merge':
+                    results[entry_id] = await self._merge_entry(
+                        library_id=library_id,
+                        library_name=library_name,
+                        table_name=table_name,
+                        pg_entry=pg_entry,
+                        snapshot=snapshot,
+                        base=bases.get(entry_id)
+                    )
+                    continue
+
+                results[entry_id] = await self._push_entry(
+                    library_id=library_id,
+                    library_name=library_name,
+                    table_name=table_name,
+                    pg_entry=pg_entry,
+                    snapshot=snapshot,
+                    columns=columns
+                )
+            except Exception as e:
+                logger.error(f"Error syncing {table_name}:{entry_id} to Memento: {e}", exc_info=True)
+                results[entry_id] = await self._entry_failed(library_id, library_name, entry_id, str(e))
+
+        pushed = sum(1 for result in results.values() if result.get('success') and not result.get('skipped'))
+        logger.info(
+            f"Synced {table_name} batch to Memento: {len(entry_ids)} entries, "
+            f"{pushed} pushed, {len(checks)} conflict checks"
+        )
+
+        return [results[entry_id] for entry_id in entry_ids]
+
+    async def _push_entry(
+        self,
+        library_id: str,
+        library_name: str,
+        table_name: str,
+        pg_entry,
+        snapshot: Dict[str, Any],
+        columns: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """PATCH the changed fields of an entry, then record snapshot and log"""
+        entry_id = pg_entry.id
+
+        # Prepare entry data for Memento (changed fields only)
+        entry_data = self._prepare_memento_data(pg_entry, columns)
+
+        # Update Memento entry
+        await self._update_memento_entry(
+            library_id=library_id,
+            entry_id=entry_id,
+            entry_data=entry_data
+        )
+
+        # Memento now has the current field values
+        await self._save_snapshot(table_name, entry_id, snapshot)
+
+        # Log success
+        await self._log_sync(
+            library_id=library_id,
+            library_name=library_name,
+            entry_id=entry_id,
+            sync_direction='pg_to_memento',
+            success=True
+        )
+
+        return {
+            'success': True,
+            'entry_id': entry_id,
+            'library': library_name,
+            'operation': 'update',
+            'timestamp': datetime.now().isoformat()
+        }
+
+    async def _merge_entry(
+        self,
+        library_id: str,
+        library_name: str,
+        table_name: str,
+        pg_entry,
+        snapshot: Dict[str, Any],
+        base: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Three-way merge of an entry changed on both sides (CONFLICT_RESOLUTION=merge)
+
+        Memento's field changes since the last sync are written to
+        PostgreSQL (as sync_source 'memento', so the trigger does not send
+        them back), PostgreSQL's are PATCHed to Memento. Only fields changed
+        on both sides are logged to memento_sync_conflicts.
+        """
+        entry_id = pg_entry.id
+
+        memento_entry = await self._fetch_memento_entry(library_id, entry_id)
+        if not memento_entry:
+            raise Exception(f"Memento entry {entry_id} could not be fetched for merge")
+
+        # Memento's values in PostgreSQL column form
+        _, memento_data, _ = prepare_entry(
+            model_class=type(pg_entry),
+            library_id=library_id,
+            library_name=library_name,
+            table_name=table_name,
+            entry_data=memento_entry
+        )
+        memento_fields = data_snapshot(memento_data)
+        memento_modified = memento_data.get('memento_modified_time')
+        pg_modified = getattr(pg_entry, 'pg_modified_time', None)
+
+        to_memento, to_pg, collisions = self.conflict_resolver.merge_fields(
+            base=base,
+            pg_fields=snapshot,
+            memento_fields=memento_fields,
+            pg_ts=pg_modified,
+            memento_ts=memento_modified
+        )
+
+        if to_pg:
+            # pg_entry is a detached copy (ConflictResolver.load_entries)
+            model_class = type(pg_entry)
+            values = {column: memento_data.get(column) for column in to_pg}
+            values.update(
+                sync_source='memento',
+                memento_modified_time=memento_modified,
+                synced_at=datetime.now()
+            )
+            await self.db.execute(
+                update(model_class).where(model_class.id == entry_id).values(**values)
+            )
+            await self.db.commit()
+
+        if to_memento:
+            await self._update_memento_entry(
+                library_id=library_id,
+                entry_id=entry_id,
+                entry_data=self._prepare_memento_data(pg_entry, to_memento)
+            )
+
+        # Both sides now have the merged values
+        merged = dict(memento_fields)
+        merged.update({column: snapshot.get(column) for column in to_memento})
+        await self._save_snapshot(table_name, entry_id, merged)
+
+        if collisions:
+            conflict_data = {
+                'table_name': table_name,
+                'entry_id': entry_id,
+                'pg_modified': (pg_modified or datetime.now()).isoformat(),
+                'memento_modified': (memento_modified or datetime.now()).isoformat(),
+                'resolution': 'merge',
+                'fields': collisions
+            }
+            await self.conflict_resolver.log_conflicts(
+                library_id, library_name, [(entry_id, conflict_data, 'merge')]
+            )
+
+        logger.info(
+            f"Merged {table_name}:{entry_id} - {len(to_memento)} fields to Memento, "
+            f"{len(to_pg)} to PostgreSQL, {len(collisions)} collisions"
+        )
+
+        await self._log_sync(
+            library_id=library_id,
+            library_name=library_name,
+            entry_id=entry_id,
+            sync_direction='pg_to_memento',
+            success=True
+        )
+
+        return {
+            'success': True,
+            'entry_id': entry_id,
+            'library': library_name,
+            'operation': 'merge',
+            'to_memento': to_memento,
+            'to_pg': to_pg,
+            'collisions': sorted(collisions),
+            'timestamp': datetime.now().isoformat()
+        }
+
+    async def _entry_failed(
+        self,
+        library_id: str,
+        library_name: str,
+        entry_id: str,
+        error: str
+    ) -> Dict[str, Any]:
+        """Log a failed entry of a batch and return its result"""
+        await self._log_sync(
+            library_id=library_id,
+            library_name=library_name,
+            entry_id=entry_id,
+            sync_direction='pg_to_memento',
+            success=False,
+            error_message=error
+        )
+
+        return {
+            'success': False,
+            'entry_id': entry_id,
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def _prepare_memento_data(self, pg_entry, columns: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Prepare PostgreSQL entry data for Memento API
 
         Args:
             pg_entry: SQLAlchemy model instance
+            columns: Only these columns (None = all)
 
         Returns:
             Dictionary formatted for Memento API
@@ -234,12 +564,10 @@ class PostgreSQLToMementoSync:
         for column in pg_entry.__table__.columns:
             column_name = column.name
 
-            # Skip system columns
-            if column_name in (
-                'id', 'status', 'memento_created_time', 'memento_modified_time',
-                'pg_modified_time', 'created_by', 'modified_by', 'synced_at',
-                'sync_source', 'created_at', 'updated_at'
-            ):
+            # Skip system columns and unchanged columns
+            if column_name in SYSTEM_COLUMNS:
+                continue
+            if columns is not None and column_name not in columns:
                 continue
 
             # Get value
@@ -260,6 +588,49 @@ class PostgreSQLToMementoSync:
 
         return fields
 
+    def _skip_conflict_check(self, entry_id: str, pg_entry) -> bool:
+        """
+        Whether to push without checking Memento for conflicts
+
+        With CONFLICT_CHECK_MODE=local an entry last synced from Memento
+        (synced_at) within CONFLICT_CHECK_MAX_AGE is pushed without a GET.
+        The row's memento_modified_time is the value the conflict check
+        compares against, so it cannot stand in for Memento's version:
+        there is no conflict detection (and no merge) inside that window,
+        and a Memento edit made in it is overwritten. Entries that never
+        came from Memento or were synced longer ago are fetched and checked.
+        """
+        if self.config.CONFLICT_CHECK_MODE != 'local':
+            return False
+
+        synced_at = getattr(pg_entry, 'synced_at', None)
+        if not getattr(pg_entry, 'memento_modified_time', None) or not synced_at:
+            return False
+
+        age = (datetime.now() - synced_at).total_seconds()
+        if age > self.config.CONFLICT_CHECK_MAX_AGE:
+            logger.debug(f"Last Memento sync of {entry_id} is {age:.0f}s old - checking for conflicts")
+            return False
+
+        return True
+
+    async def _memento_version(
+        self,
+        library_id: str,
+        entry_id: str
+    ) -> Tuple[bool, Optional[datetime]]:
+        """
+        Fetch Memento's version of an entry for conflict detection
+
+        Returns:
+            Tuple of (exists in Memento, Memento modifiedTime)
+        """
+        memento_entry = await self._fetch_memento_entry(library_id, entry_id)
+        if not memento_entry:
+            return False, None
+
+        return True, self._parse_memento_timestamp(memento_entry.get('modifiedTime'))
+
     async def _fetch_memento_entry(
         self,
         library_id: str,
@@ -277,7 +648,7 @@ class PostgreSQLToMementoSync:
         """
         try:
             await self.init_session()
-            await self.rate_limit()
+            await self.rate_limit(library_id)
 
             url = f"{self.memento_api_url}/libraries/{library_id}/entries/{entry_id}"
 
@@ -314,7 +685,6 @@ class PostgreSQLToMementoSync:
             API response
         """
         await self.init_session()
-        await self.rate_limit()
 
         url = f"{self.memento_api_url}/libraries/{library_id}/entries/{entry_id}"
 
@@ -323,19 +693,46 @@ class PostgreSQLToMementoSync:
         }
 
         try:
-            async with self.session.patch(url, json=payload) as response:
-                if response.status in (200, 204):
-                    logger.info(f"Successfully updated Memento entry {entry_id}")
-                    return {'success': True}
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Memento API error {response.status}: {error_text}")
-                    raise Exception(f"Memento API error: {response.status} - {error_text}")
+            await self._patch_entry(library_id, url, payload)
+            logger.info(f"Successfully updated Memento entry {entry_id}")
+            return {'success': True}
 
         except Exception as e:
             logger.error(f"Error updating Memento entry: {e}", exc_info=True)
             raise
 
+    async def _patch_entry(self, library_id: str, url: str, payload: Dict[str, Any]) -> None:
+        """
+        PATCH an entry, retrying transient failures in place
+
+        429, 5xx and connection errors are retried up to WEBHOOK_MAX_RETRIES
+        times (WEBHOOK_RETRY_DELAY, doubled per retry). Other errors and the
+        last transient one are raised.
+        """
+        for attempt in range(self.config.WEBHOOK_MAX_RETRIES + 1):
+            await self.rate_limit(library_id)
+
+            try:
+                async with self.session.patch(url, json=payload) as response:
+                    if response.status in (200, 204):
+                        return
+
+                    error_text = await response.text()
+                    logger.error(f"Memento API error {response.status}: {error_text}")
+                    error = Exception(f"Memento API error: {response.status} - {error_text}")
+                    transient = response.status == 429 or response.status >= 500
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                transient = True
+
+            if not transient or attempt >= self.config.WEBHOOK_MAX_RETRIES:
+                raise error
+
+            delay = self.config.WEBHOOK_RETRY_DELAY * 2 ** attempt
+            logger.warning(f"Transient Memento API error, retrying in {delay}s: {error}")
+            await asyncio.sleep(delay)
+
     async def _delete_memento_entry(
         self,
         library_id: str,
@@ -355,7 +752,6 @@ class PostgreSQLToMementoSync:
         """
         try:
             await self.init_session()
-            await self.rate_limit()
 
             url = f"{self.memento_api_url}/libraries/{library_id}/entries/{entry_id}"
 
@@ -365,26 +761,22 @@ class PostgreSQLToMementoSync:
                 'status': 'deleted'
             }
 
-            async with self.session.patch(url, json=payload) as response:
-                if response.status in (200, 204):
-                    logger.info(f"Successfully deleted Memento entry {entry_id}")
+            await self._patch_entry(library_id, url, payload)
+            logger.info(f"Successfully deleted Memento entry {entry_id}")
 
-                    await self._log_sync(
-                        library_id=library_id,
-                        library_name=library_name,
-                        entry_id=entry_id,
-                        sync_direction='pg_to_memento',
-                        success=True
-                    )
+            await self._log_sync(
+                library_id=library_id,
+                library_name=library_name,
+                entry_id=entry_id,
+                sync_direction='pg_to_memento',
+                success=True
+            )
 
-                    return {
-                        'success': True,
-                        'entry_id': entry_id,
-                        'operation': 'delete'
-                    }
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Memento API error: {response.status} - {error_text}")
+            return {
+                'success': True,
+                'entry_id': entry_id,
+                'operation': 'delete'
+            }
 
         except Exception as e:
             logger.error(f"Error deleting Memento entry: {e}", exc_info=True)
@@ -403,6 +795,56 @@ class PostgreSQLToMementoSync:
                 'error': str(e)
             }
 
+    async def _load_snapshot(self, table_name: str, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Field values last synced for an entry (None = never synced)"""
+        try:
+            result = await self.db.execute(
+                select(SyncSnapshot.fields).where(
+                    SyncSnapshot.table_name == table_name,
+                    SyncSnapshot.entry_id == entry_id
+                )
+            )
+            return result.scalar()
+        except Exception as e:
+            # No snapshot = full push, as before
+            logger.warning(f"Error loading sync snapshot: {e}")
+            await self.db.rollback()
+            return None
+
+    async def _load_snapshots(self, table_name: str, entry_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Field values last synced for several entries (never synced ones are missing)"""
+        rows = await self.db.execute(
+            select(SyncSnapshot.entry_id, SyncSnapshot.fields).where(
+                SyncSnapshot.table_name == table_name,
+                SyncSnapshot.entry_id.in_(set(entry_ids))
+            )
+        )
+        return {entry_id: fields for entry_id, fields in rows}
+
+    async def _save_snapshot(self, table_name: str, entry_id: str, snapshot: Dict[str, Any]) -> None:
+        """Merge pushed field values into the entry's snapshot"""
+        try:
+            stmt = insert(SyncSnapshot).values(
+                table_name=table_name,
+                entry_id=entry_id,
+                fields=snapshot,
+                direction='pg_to_memento'
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['table_name', 'entry_id'],
+                set_={
+                    'fields': SyncSnapshot.fields.op('||', return_type=JSONB)(stmt.excluded.fields),
+                    'direction': stmt.excluded.direction,
+                    'updated_at': func.now()
+                }
+            )
+            await self.db.execute(stmt)
+            await self.db.commit()
+        except Exception as e:
+            # Next push of this entry is a larger delta, nothing is lost
+            logger.error(f"Error saving sync snapshot: {e}")
+            await self.db.rollback()
+
     async def _log_sync(
         self,
         library_id: Optional[str],
@@ -412,21 +854,25 @@ class PostgreSQLToMementoSync:
         success: bool,
         error_message: Optional[str] = None
     ) -> None:
-        """Log sync operation"""
+        """Log sync operation (buffered; synchronous if the buffer is off or full)"""
+        row = dict(
+            library_id=library_id,
+            library_name=library_name,
+            entry_id=entry_id,
+            sync_direction=sync_direction,
+            success=success,
+            error_message=error_message,
+            retry_count=self.retry_count
+        )
+        if self.log_buffer.add(**row):
+            return
+
         try:
-            log_entry = SyncLog(
-                library_id=library_id,
-                library_name=library_name,
-                entry_id=entry_id,
-                sync_direction=sync_direction,
-                success=success,
-                error_message=error_message
-            )
-            self.db.add(log_entry)
-            self.db.commit()
+            self.db.add(SyncLog(**row))
+            await self.db.commit()
         except Exception as e:
             logger.error(f"Error logging sync: {e}")
-            self.db.rollback()
+            await self.db.rollback()
 
     @staticmethod
     def _parse_memento_timestamp(ts: Optional[str]) -> Optional[datetime]:
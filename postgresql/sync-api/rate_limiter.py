@@ -0,0 +1,204 @@
+"""
+Rate Limiter - Token buckets for the Memento API
+
+One limiter per process (get_rate_limiter()), shared by every
+PostgreSQLToMementoSync instance. Tokens refill at MEMENTO_RATE_LIMIT per
+minute up to MEMENTO_RATE_BURST; with MEMENTO_RATE_LIMIT_PER_LIBRARY each
+library additionally has its own bucket.
+
+Backends:
+- postgres (default): buckets live in memento_rate_limit_buckets
+  (migration_rate_limiter.sql), so the listener, the API and CLI scripts
+  share one budget. While the database call fails, local buckets are used
+  and postgres is tried again every POSTGRES_RETRY_DELAY seconds.
+- local: in-process buckets only
+
+Usage:
+    limiter = get_rate_limiter()
+    await limiter.acquire(library_id)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from config import Config
+from metrics import Histogram, WAIT_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_BUCKET = 'memento_api'
+
+# Seconds on local buckets after a failed shared-bucket call
+POSTGRES_RETRY_DELAY = 30.0
+
+
+class TokenBucket:
+    """In-process token bucket"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 = available now)"""
+        self.refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token-bucket rate limiter with optional per-library buckets"""
+
+    def __init__(
+        self,
+        rate_per_minute: Optional[float] = None,
+        burst: Optional[float] = None,
+        library_rate_per_minute: Optional[float] = None,
+        backend: Optional[str] = None
+    ):
+        rate_per_minute = rate_per_minute or Config.MEMENTO_RATE_LIMIT
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(max(1, burst or Config.MEMENTO_RATE_BURST))
+
+        library_rate = library_rate_per_minute if library_rate_per_minute is not None else Config.MEMENTO_RATE_LIMIT_PER_LIBRARY
+        self.library_rate = library_rate / 60.0 if library_rate else 0.0
+
+        self.backend = backend or Config.MEMENTO_RATE_LIMIT_BACKEND
+        self.local_buckets: Dict[str, TokenBucket] = {}
+        self.lock = asyncio.Lock()
+
+        # Shared buckets unavailable: local fallback until this time (monotonic)
+        self.postgres_retry_at = 0.0
+
+        # Statistics
+        self.acquired = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.fallbacks = 0
+        self.wait_histogram = Histogram(WAIT_BUCKETS)
+
+    def _buckets(self, library_id: Optional[str]) -> List[Tuple[str, float, float]]:
+        """(bucket, tokens per second, capacity) sorted by name"""
+        buckets = [(GLOBAL_BUCKET, self.rate, self.capacity)]
+        if library_id and self.library_rate:
+            buckets.append((f"library:{library_id}", self.library_rate, self.capacity))
+        return sorted(buckets)
+
+    async def acquire(self, library_id: Optional[str] = None) -> float:
+        """
+        Wait until a request to the Memento API is allowed
+
+        Args:
+            library_id: Memento library ID (for per-library buckets)
+
+        Returns:
+            Seconds waited
+        """
+        buckets = self._buckets(library_id)
+        start = time.monotonic()
+
+        while True:
+            wait = None
+            if self.backend == 'postgres' and time.monotonic() >= self.postgres_retry_at:
+                try:
+                    wait = await self._take_postgres(buckets)
+                except Exception as e:
+                    logger.warning(
+                        f"Shared rate limiter unavailable, using local buckets "
+                        f"for {POSTGRES_RETRY_DELAY:.0f}s: {e}"
+                    )
+                    self.postgres_retry_at = time.monotonic() + POSTGRES_RETRY_DELAY
+                    self.fallbacks += 1
+
+            if wait is None:
+                wait = await self._take_local(buckets)
+
+            if wait <= 0:
+                break
+
+            logger.debug(f"Rate limiting: waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.wait_histogram.observe(waited)
+        if waited > 0.001:
+            self.waited += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return waited
+
+    async def _take_local(self, buckets: List[Tuple[str, float, float]]) -> float:
+        """Take one token from all in-process buckets, or return the wait time"""
+        async with self.lock:
+            local = []
+            for name, rate, capacity in buckets:
+                bucket = self.local_buckets.get(name)
+                if bucket is None:
+                    bucket = self.local_buckets[name] = TokenBucket(rate, capacity)
+                local.append(bucket)
+
+            wait = max(bucket.wait_time() for bucket in local)
+            if wait <= 0:
+                for bucket in local:
+                    bucket.tokens -= 1
+            return wait
+
+    async def _take_postgres(self, buckets: List[Tuple[str, float, float]]) -> float:
+        """Take one token from all shared buckets, or return the wait time"""
+        # Imported here: the API engine is only created when this backend is used
+        from database import engine
+
+        async with engine.begin() as conn:
+            wait = await conn.scalar(
+                text("""
+                    SELECT memento_take_tokens(
+                        CAST(:buckets AS VARCHAR[]),
+                        CAST(:rates AS DOUBLE PRECISION[]),
+                        CAST(:capacities AS DOUBLE PRECISION[])
+                    )
+                """),
+                {
+                    'buckets': [name for name, _, _ in buckets],
+                    'rates': [rate for _, rate, _ in buckets],
+                    'capacities': [capacity for _, _, capacity in buckets],
+                }
+            )
+        return float(wait or 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Limiter configuration and wait statistics"""
+        return {
+            'backend': self.backend,
+            'local_fallback': self.backend == 'postgres' and time.monotonic() < self.postgres_retry_at,
+            'fallbacks': self.fallbacks,
+            'rate_per_minute': round(self.rate * 60, 3),
+            'burst': self.capacity,
+            'library_rate_per_minute': round(self.library_rate * 60, 3),
+            'acquired': self.acquired,
+            'waited': self.waited,
+            'wait_seconds_total': round(self.wait_seconds, 3),
+            'max_wait_seconds': round(self.max_wait_seconds, 3),
+        }
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide rate limiter"""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,277 @@
+"""
+Sync Log Buffer - Write-behind buffer for memento_sync_log rows
+
+Every synced entry used to add and commit its own SyncLog row, which on
+bulk runs cost as much as the data writes. Sync handlers now hand their log
+rows to one buffer per process (get_sync_log_buffer()); a background task
+writes them with a single COPY every SYNC_LOG_FLUSH_ROWS rows or
+SYNC_LOG_FLUSH_INTERVAL milliseconds, whichever comes first.
+
+- sync_time is taken when the row is added, not when it is flushed
+- a failed flush keeps its rows for the next one; after COPY_ATTEMPTS
+  failed flushes in a row the rows are inserted one by one, and rows the
+  database rejects (bad data) are logged and dropped, so one poison row
+  cannot block the buffer
+- add()/extend() return False when the buffer is not running or would
+  exceed SYNC_LOG_BUFFER_MAX rows - the caller then writes the rows
+  synchronously, as before
+- close() flushes what is left (API / listener shutdown)
+
+Usage:
+    buffer = get_sync_log_buffer()
+    buffer.start()
+    ...
+    if not buffer.add(library_id=..., entry_id=..., sync_direction=..., success=True):
+        db.add(SyncLog(...))
+    ...
+    await buffer.close()
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# memento_sync_log columns written by the buffer (COPY column order)
+COLUMNS = (
+    'library_id', 'library_name', 'entry_id', 'sync_direction',
+    'sync_time', 'success', 'error_message', 'retry_count'
+)
+
+INSERT_SQL = (
+    f"INSERT INTO memento_sync_log ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join(f'${i}' for i in range(1, len(COLUMNS) + 1))})"
+)
+
+# Failed COPY flushes in a row before rows are inserted one by one
+COPY_ATTEMPTS = 3
+
+
+class SyncLogBuffer:
+    """In-process write-behind buffer for memento_sync_log"""
+
+    def __init__(
+        self,
+        flush_rows: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_rows: Optional[int] = None
+    ):
+        self.flush_rows = max(1, flush_rows or Config.SYNC_LOG_FLUSH_ROWS)
+        self.flush_interval = (flush_interval_ms or Config.SYNC_LOG_FLUSH_INTERVAL) / 1000.0
+        self.max_rows = max(self.flush_rows, max_rows or Config.SYNC_LOG_BUFFER_MAX)
+
+        self.rows: List[tuple] = []
+        self.wakeup = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self.closing = False
+
+        # Statistics
+        self.buffered = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.failed_in_row = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done() and not self.closing
+
+    def start(self) -> None:
+        """Start the flush task (needs a running event loop)"""
+        if not Config.SYNC_LOG_BUFFER or self.running:
+            return
+        self.closing = False
+        self.task = asyncio.create_task(self.run())
+        logger.info(
+            f"Sync log buffer started (flush every {self.flush_rows} rows or "
+            f"{self.flush_interval * 1000:.0f}ms, max {self.max_rows} rows)"
+        )
+
+    def add(self, **row: Any) -> bool:
+        """
+        Queue one log row (SyncLog column values)
+
+        Returns:
+            False if the row was not taken - write it synchronously
+        """
+        return self.extend([row])
+
+    def extend(self, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Queue several log rows, all or none
+
+        Returns:
+            False if the rows were not taken - write them synchronously
+        """
+        if not self.running:
+            return False
+
+        if len(self.rows) + len(rows) > self.max_rows:
+            self.overflows += len(rows)
+            logger.warning(f"Sync log buffer full ({len(self.rows)} rows) - writing {len(rows)} rows synchronously")
+            return False
+
+        now = datetime.now()
+        for row in rows:
+            self.rows.append((
+                row.get('library_id'),
+                row.get('library_name'),
+                row.get('entry_id'),
+                row['sync_direction'],
+                row.get('sync_time') or now,
+                row.get('success', True),
+                row.get('error_message'),
+                row.get('retry_count') or 0,
+            ))
+        self.buffered += len(rows)
+
+        if len(self.rows) >= self.flush_rows:
+            self.wakeup.set()
+        return True
+
+    async def run(self) -> None:
+        """Flush every flush_interval or as soon as flush_rows rows are queued"""
+        while not self.closing:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write all queued rows with one COPY
+
+        After COPY_ATTEMPTS failed flushes in a row the rows are inserted
+        one by one instead (_insert_each).
+
+        Returns:
+            Number of rows written
+        """
+        async with self.lock:
+            if not self.rows:
+                return 0
+
+            records, self.rows = self.rows, []
+            try:
+                if self.failed_in_row >= COPY_ATTEMPTS:
+                    written, dropped = await self._insert_each(records)
+                else:
+                    await self._copy(records)
+                    written, dropped = len(records), 0
+            except Exception as e:
+                # Keep them (ahead of newer rows) for the next flush
+                self.rows = records + self.rows
+                self.failed_flushes += 1
+                self.failed_in_row += 1
+                self.last_error = str(e)
+                logger.error(f"Failed to flush {len(records)} sync log rows: {e}")
+                return 0
+
+            self.failed_in_row = 0
+            self.flushed += written
+            self.flushes += 1
+            if dropped:
+                logger.error(f"Sync log flush wrote {written} rows one by one, dropped {dropped}")
+            return written
+
+    async def _copy(self, records: List[tuple]) -> None:
+        """COPY rows into memento_sync_log over a pooled connection"""
+        # Imported here: the API engine is only created when the buffer is used
+        from database import engine
+
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                'memento_sync_log',
+                records=records,
+                columns=COLUMNS
+            )
+
+    async def _insert_each(self, records: List[tuple]) -> Tuple[int, int]:
+        """
+        INSERT rows one at a time, dropping the ones the database rejects
+
+        Only data / constraint errors drop a row; any other error (e.g. the
+        connection) is raised. Rows already written or dropped are removed
+        from `records` either way, so the caller keeps just the rest.
+
+        Returns:
+            Tuple of (rows written, rows dropped)
+        """
+        # Imported here: asyncpg is the driver of the API engine
+        import asyncpg
+        from database import engine
+
+        written = dropped = done = 0
+        try:
+            async with engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                for record in records:
+                    try:
+                        # No transaction: every row commits on its own
+                        await raw.driver_connection.execute(INSERT_SQL, *record)
+                        written += 1
+                    except (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError) as e:
+                        dropped += 1
+                        self.dropped += 1
+                        logger.error(f"Dropping sync log row {dict(zip(COLUMNS, record))}: {e}")
+                    done += 1
+        finally:
+            del records[:done]
+
+        return written, dropped
+
+    async def close(self) -> None:
+        """Stop the flush task and write what is left"""
+        if self.task is None:
+            return
+
+        self.closing = True
+        self.wakeup.set()
+        try:
+            await self.task
+        except Exception as e:
+            logger.error(f"Sync log flush task failed: {e}")
+        self.task = None
+
+        await self.flush()
+        if self.rows:
+            logger.error(f"Sync log buffer closed with {len(self.rows)} unwritten rows")
+        else:
+            logger.info(f"Sync log buffer closed ({self.flushed} rows in {self.flushes} flushes)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Buffer state and flush statistics"""
+        return {
+            'running': self.running,
+            'pending': len(self.rows),
+            'buffered': self.buffered,
+            'flushed': self.flushed,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'dropped': self.dropped,
+            'overflows': self.overflows,
+            'last_error': self.last_error,
+        }
+
+
+_buffer: Optional[SyncLogBuffer] = None
+
+
+def get_sync_log_buffer() -> SyncLogBuffer:
+    """Process-wide sync log buffer"""
+    global _buffer
+    if _buffer is None:
+        _buffer = SyncLogBuffer()
+    return _buffer
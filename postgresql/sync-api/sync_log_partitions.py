@@ -0,0 +1,76 @@
+"""
+Sync Log Partitions - Monthly partitions and retention of memento_sync_log
+
+memento_sync_log is range-partitioned by month on sync_time
+(migration_sync_log_partitions.sql). memento_sync_log_maintain() creates
+the partitions of the current and the next SYNC_LOG_PARTITIONS_AHEAD months
+and drops whole monthly partitions older than SYNC_LOG_RETENTION_DAYS, so
+old log rows go with a DROP TABLE instead of a DELETE and vacuum.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+async def maintain_sync_log_partitions(
+    db: AsyncSession,
+    months_ahead: Optional[int] = None,
+    retention_days: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Create upcoming and drop expired memento_sync_log partitions
+
+    Args:
+        db: Database session
+        months_ahead: Months to create partitions for in advance
+        retention_days: Days of logs to keep (0 = keep everything)
+
+    Returns:
+        List of created / dropped partitions
+    """
+    result = await db.execute(
+        text("SELECT * FROM memento_sync_log_maintain(:months_ahead, :retention_days)"),
+        {
+            'months_ahead': Config.SYNC_LOG_PARTITIONS_AHEAD if months_ahead is None else months_ahead,
+            'retention_days': Config.SYNC_LOG_RETENTION_DAYS if retention_days is None else retention_days,
+        }
+    )
+    changes = [dict(row._mapping) for row in result]
+    await db.commit()
+
+    for change in changes:
+        logger.info(f"Sync log partition {change['action']}: {change['partition_name']}")
+
+    return changes
+
+
+async def run_partition_loop(session_factory, interval: int) -> None:
+    """
+    Maintain partitions now and every `interval` seconds until cancelled
+
+    Args:
+        session_factory: async_sessionmaker for new database sessions
+        interval: Seconds between runs
+    """
+    logger.info(
+        f"Sync log partition maintenance every {interval}s "
+        f"(retention {Config.SYNC_LOG_RETENTION_DAYS or 'unlimited'} days)"
+    )
+
+    while True:
+        async with session_factory() as db:
+            try:
+                await maintain_sync_log_partitions(db)
+            except Exception as e:
+                logger.error(f"Sync log partition maintenance failed: {e}")
+                await db.rollback()
+
+        await asyncio.sleep(interval)
@@ -11,30 +11,13 @@ import json
 from pathlib import Path
 
 from auth import verify_api_key
-from sqlalchemy.orm import Session
+from database import get_db
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-# Database dependency (copied from main.py to avoid circular import)
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from config import Config
-
-engine = create_engine(Config.get_async_pg_url().replace('+asyncpg', ''))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-def get_db():
-    """Dependency to get DB session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # Log storage directory
 LOG_DIR = Path("/opt/memento-sync/logs/script-logs")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -83,19 +66,22 @@ async def save_bulk_sync_log(
             RETURNING id
         """)
 
-        result = db.execute(sql, {
+        result = await db.execute(sql, {
             'library_id': request.library_id,
             'library_name': request.library_name,
-            'sync_timestamp': request.timestamp,
+            # asyncpg needs a naive local datetime for the TIMESTAMP column
+            'sync_timestamp': datetime.fromisoformat(
+                request.timestamp.replace('Z', '+00:00')
+            ).astimezone().replace(tzinfo=None),
             'total_entries': request.stats.get('total') if request.stats else None,
             'success_count': request.stats.get('success') if request.stats else None,
             'failed_count': request.stats.get('failed') if request.stats else None,
             'log_content': request.log,
             'errors': json.dumps(request.stats.get('errors', [])) if request.stats else None
         })
-        db.commit()
+        log_id = result.scalar_one()
+        await db.commit()
 
-        log_id = result.fetchone()[0]
         logger.info(f"Saved sync log to database: ID={log_id}, library={request.library_name}")
 
         # Also save to file for backup (continue with existing code)
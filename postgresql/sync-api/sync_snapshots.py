@@ -0,0 +1,77 @@
+"""
+Sync Snapshots - Last synced field state per entry (delta pushes)
+
+memento_sync_snapshots (migration_sync_snapshots.sql) keeps, per entry, the
+user field values last synced in either direction - i.e. the state Memento
+and PostgreSQL last agreed on:
+
+- Memento → PostgreSQL: the written row values are merged in
+- PostgreSQL → Memento: only columns whose value differs from the snapshot
+  are PATCHed, and the API call is skipped entirely when nothing changed
+  (e.g. only updated_at moved); the pushed values are merged in afterwards
+
+Values are stored in a canonical JSON form (numbers as floats, dates and
+times as ISO strings), so a row read back from PostgreSQL compares equal to
+the converted Memento values it was written from.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+# Columns maintained by the sync itself, never pushed to Memento
+SYSTEM_COLUMNS = frozenset({
+    'id', 'status', 'memento_created_time', 'memento_modified_time',
+    'pg_modified_time', 'created_by', 'modified_by', 'synced_at',
+    'sync_source', 'created_at', 'updated_at'
+})
+
+
+def snapshot_value(value: Any) -> Any:
+    """Canonical JSON form of a column value"""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [snapshot_value(item) for item in value]
+    return str(value)
+
+
+def row_snapshot(pg_entry) -> Dict[str, Any]:
+    """User column values of an ORM row (NULLs left out - they are not pushed)"""
+    snapshot = {}
+    for column in pg_entry.__table__.columns:
+        if column.name in SYSTEM_COLUMNS:
+            continue
+        value = getattr(pg_entry, column.name, None)
+        if value is not None:
+            snapshot[column.name] = snapshot_value(value)
+    return snapshot
+
+
+def data_snapshot(pg_data: Dict[str, Any]) -> Dict[str, Any]:
+    """User column values of a row written by the Memento → PostgreSQL sync"""
+    return {
+        column: snapshot_value(value)
+        for column, value in pg_data.items()
+        if column not in SYSTEM_COLUMNS
+    }
+
+
+def changed_columns(snapshot: Dict[str, Any], base: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+    """
+    Columns of snapshot that differ from the last synced state
+
+    Returns:
+        Changed column names, or None if there is no last synced state
+        (everything has to be sent)
+    """
+    if base is None:
+        return None
+    return [
+        column for column, value in snapshot.items()
+        if column not in base or base[column] != value
+    ]
@@ -0,0 +1,27 @@
+"""
+Test setup - sync-api modules are imported as top-level modules (as the API
+and the listener do), so the sync-api directory goes on sys.path
+"""
+
+import os
+import sys
+import types
+from importlib.util import find_spec
+
+SYNC_API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SYNC_API_DIR)
+
+# Log to stdout instead of the production log file
+os.environ.setdefault('LOG_FILE', '')
+
+# library_mapping is generated per deployment and not part of the repository.
+# The tested helpers never look libraries up, so an empty mapping is enough
+# for the modules that import it at load time.
+if find_spec('library_mapping') is None:
+    library_mapping = types.ModuleType('library_mapping')
+    library_mapping.LIBRARY_MAP = {}
+    library_mapping.get_table_name = lambda library_name: None
+    library_mapping.get_slovak_name_by_id = lambda library_id: None
+    library_mapping.get_slovak_name_by_table = lambda table_name: None
+    library_mapping.get_library_id = lambda library_name: None
+    sys.modules['library_mapping'] = library_mapping
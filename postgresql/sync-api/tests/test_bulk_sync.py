@@ -0,0 +1,40 @@
+"""Tests for bulk_sync.iter_ndjson - streaming NDJSON parsing"""
+
+import asyncio
+import json
+
+import pytest
+
+from bulk_sync import iter_ndjson
+
+
+def parse(chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [value async for value in iter_ndjson(stream())]
+
+    return asyncio.run(collect())
+
+
+def test_one_value_per_line():
+    assert parse([b'{"id": "a"}\n{"id": "b"}\n']) == [{'id': 'a'}, {'id': 'b'}]
+
+
+def test_lines_split_across_chunks_and_no_trailing_newline():
+    body = b'{"id": "a"}\n\n  \r\n{"id": "b", "n": [1, 2]}'
+    chunks = [body[i:i + 3] for i in range(0, len(body), 3)]
+    assert parse(chunks) == [{'id': 'a'}, {'id': 'b', 'n': [1, 2]}]
+
+
+def test_multibyte_character_split_across_chunks():
+    body = '{"name": "Dochádzka"}\n'.encode('utf-8')
+    split = body.index('á'.encode('utf-8')) + 1
+    assert parse([body[:split], body[split:]]) == [{'name': 'Dochádzka'}]
+
+
+def test_invalid_line_raises():
+    with pytest.raises(json.JSONDecodeError):
+        parse([b'{"id": "a"}\n{oops}\n'])
@@ -0,0 +1,76 @@
+"""Tests for ConflictResolver.merge_fields - field-level three-way merge"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conflict_resolver import ConflictResolver
+
+PG_TIME = datetime(2026, 10, 18, 10, 0)
+
+
+@pytest.fixture
+def resolver():
+    # merge_fields does not touch the database
+    return ConflictResolver(db_session=None)
+
+
+def test_merge_one_side_changes(resolver):
+    base = {'name': 'Ján', 'hours': 8.0, 'note': 'a'}
+    pg = {'name': 'Ján', 'hours': 7.5, 'note': 'a'}
+    memento = {'name': 'Jano', 'hours': 8.0, 'note': 'a'}
+
+    to_memento, to_pg, collisions = resolver.merge_fields(base, pg, memento, PG_TIME, PG_TIME)
+
+    assert to_memento == ['hours']
+    assert to_pg == ['name']
+    assert collisions == {}
+
+
+def test_merge_same_change_on_both_sides_is_no_collision(resolver):
+    base = {'hours': 8.0}
+    assert resolver.merge_fields(base, {'hours': 7.0}, {'hours': 7.0}, PG_TIME, PG_TIME) == ([], [], {})
+
+
+def test_merge_collision_newer_memento_wins(resolver):
+    base = {'hours': 8.0}
+    to_memento, to_pg, collisions = resolver.merge_fields(
+        base, {'hours': 7.0}, {'hours': 9.0}, PG_TIME, PG_TIME + timedelta(minutes=1)
+    )
+
+    assert (to_memento, to_pg) == ([], ['hours'])
+    assert collisions == {'hours': {'base': 8.0, 'pg': 7.0, 'memento': 9.0, 'winner': 'memento'}}
+
+
+def test_merge_collision_newer_postgresql_wins(resolver):
+    base = {'hours': 8.0}
+    to_memento, to_pg, collisions = resolver.merge_fields(
+        base, {'hours': 7.0}, {'hours': 9.0}, PG_TIME, PG_TIME - timedelta(minutes=1)
+    )
+
+    assert (to_memento, to_pg) == (['hours'], [])
+    assert collisions['hours']['winner'] == 'postgresql'
+
+
+def test_merge_compares_aware_and_naive_timestamps(resolver):
+    memento_time = (PG_TIME + timedelta(hours=1)).astimezone(timezone.utc)
+    _, to_pg, _ = resolver.merge_fields({'hours': 8.0}, {'hours': 7.0}, {'hours': 9.0}, PG_TIME, memento_time)
+    assert to_pg == ['hours']
+
+
+def test_merge_without_base_every_difference_collides(resolver):
+    to_memento, to_pg, collisions = resolver.merge_fields(
+        None, {'hours': 7.0, 'name': 'Ján'}, {'hours': 9.0, 'name': 'Ján'}, PG_TIME, None
+    )
+
+    assert (to_memento, to_pg) == (['hours'], [])
+    assert list(collisions) == ['hours']
+
+
+def test_merge_column_missing_in_memento_counts_as_unchanged(resolver):
+    base = {'hours': 8.0, 'note': 'a'}
+    to_memento, to_pg, collisions = resolver.merge_fields(
+        base, {'hours': 8.0, 'note': 'b'}, {'hours': 8.0}, PG_TIME, PG_TIME
+    )
+
+    assert (to_memento, to_pg, collisions) == (['note'], [], {})
@@ -0,0 +1,38 @@
+"""Tests for metrics.Histogram - Prometheus cumulative buckets"""
+
+from metrics import Histogram
+
+
+def test_histogram_counts_values_into_their_bucket():
+    histogram = Histogram([0.1, 1, 10])
+    for value in (0.05, 0.1, 0.5, 5, 50):
+        histogram.observe(value)
+
+    # Upper bounds are inclusive (le), values above the last bound only count in +Inf
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == 55.65
+
+
+def test_histogram_samples_are_cumulative():
+    histogram = Histogram([10, 1])
+    histogram.observe(0.5)
+    histogram.observe(2)
+    histogram.observe(20)
+
+    assert histogram.samples('lag_seconds', 'worker="0"') == [
+        'lag_seconds_bucket{worker="0",le="1"} 1',
+        'lag_seconds_bucket{worker="0",le="10"} 2',
+        'lag_seconds_bucket{worker="0",le="+Inf"} 3',
+        'lag_seconds_sum{worker="0"} 22.500000',
+        'lag_seconds_count{worker="0"} 3',
+    ]
+
+
+def test_empty_histogram_without_labels():
+    assert Histogram([1]).samples('wait_seconds') == [
+        'wait_seconds_bucket{le="1"} 0',
+        'wait_seconds_bucket{le="+Inf"} 0',
+        'wait_seconds_sum 0.000000',
+        'wait_seconds_count 0',
+    ]
@@ -0,0 +1,24 @@
+"""Tests for pagination - opaque keyset cursors"""
+
+from datetime import datetime
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    position = (datetime(2026, 10, 18, 9, 1, 2, 345), 12345)
+    assert decode_cursor(encode_cursor(*position)) == position
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime(2026, 10, 18, 23, 59, 59, 999999), 2 ** 40)
+    assert '=' not in cursor
+    assert all(ch.isalnum() or ch in '-_' for ch in cursor)
+
+
+@pytest.mark.parametrize('cursor', ['', 'garbage!', 'e30', encode_cursor(datetime(2026, 1, 1), 1)[:-3]])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,43 @@
+"""Tests for sync_snapshots - canonical values and changed column detection"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sync_snapshots import changed_columns, data_snapshot, snapshot_value
+
+
+def test_changed_columns_without_base_sends_everything():
+    assert changed_columns({'name': 'Ján'}, None) is None
+
+
+def test_changed_columns_unchanged():
+    snapshot = {'name': 'Ján', 'hours': 8.0}
+    assert changed_columns(snapshot, dict(snapshot)) == []
+
+
+def test_changed_columns_changed_and_new():
+    snapshot = {'name': 'Ján', 'hours': 7.5, 'note': 'x'}
+    base = {'name': 'Ján', 'hours': 8.0}
+    assert changed_columns(snapshot, base) == ['hours', 'note']
+
+
+def test_changed_columns_ignores_columns_only_in_base():
+    # NULLs are left out of row snapshots - a cleared column is not pushed
+    assert changed_columns({'name': 'Ján'}, {'name': 'Ján', 'note': 'x'}) == []
+
+
+def test_snapshot_value_canonical_forms():
+    assert snapshot_value(8) == 8.0
+    assert snapshot_value(Decimal('8.50')) == 8.5
+    assert snapshot_value(True) is True
+    assert snapshot_value(date(2026, 10, 18)) == '2026-10-18'
+    assert snapshot_value(time(7, 30)) == '07:30:00'
+    assert snapshot_value(datetime(2026, 10, 18, 7, 30)) == '2026-10-18T07:30:00'
+    assert snapshot_value([1, Decimal('2')]) == [1.0, 2.0]
+
+
+def test_data_snapshot_matches_row_values():
+    # Converted Memento values and the row read back compare equal
+    written = data_snapshot({'id': 'e1', 'synced_at': datetime.now(), 'hours': Decimal('8'), 'day': date(2026, 1, 2)})
+    assert written == {'hours': 8.0, 'day': '2026-01-02'}
+    assert changed_columns({'hours': snapshot_value(8.0), 'day': snapshot_value(date(2026, 1, 2))}, written) == []
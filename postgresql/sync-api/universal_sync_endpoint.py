@@ -7,7 +7,7 @@ Designed for Universal.BulkAction.SyncToPostgreSQL.js v4.0
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import logging
 
 from auth import verify_api_key
@@ -15,28 +15,13 @@ import sys
 sys.path.append('..')
 from library_mapping import get_table_name
 from memento_to_pg import MementoToPostgreSQLSync
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from database import get_db
 from config import Config
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Database setup (copied from main.py to avoid circular import)
-engine = create_engine(Config.get_async_pg_url().replace('+asyncpg', ''))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-def get_db():
-    """Dependency to get DB session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 class UniversalSyncRequest(BaseModel):
     """Request model for universal sync endpoint"""
     library_id: Optional[str] = None  # Internal Memento ID (optional)
@@ -53,6 +38,31 @@ class UniversalSyncResponse(BaseModel):
     message: Optional[str] = None
 
 
+class UniversalBatchSyncRequest(BaseModel):
+    """Request model for universal batch sync endpoint"""
+    library_id: Optional[str] = None  # Internal Memento ID (optional)
+    library_name: str  # Slovak library name (e.g., "Dochádzka")
+    entries: List[Dict[str, Any]]  # Entry data, same format as UniversalSyncRequest.entry
+
+
+class BatchEntryResult(BaseModel):
+    """Per-entry result of a batch sync"""
+    entry_id: Optional[str] = None
+    success: bool
+    error: Optional[str] = None
+
+
+class UniversalBatchSyncResponse(BaseModel):
+    """Response model for universal batch sync"""
+    success: bool
+    library_name: str
+    table_name: str
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchEntryResult]
+
+
 @router.post("/api/memento/sync", response_model=UniversalSyncResponse)
 async def universal_sync_entry(
     request: UniversalSyncRequest,
@@ -131,6 +141,91 @@ async def universal_sync_entry(
         )
 
 
+@router.post("/api/memento/sync/batch", response_model=UniversalBatchSyncResponse)
+async def universal_sync_batch(
+    request: UniversalBatchSyncRequest,
+    db=Depends(get_db),
+    _=Depends(verify_api_key)
+):
+    """
+    Universal batch sync endpoint - many entries of one library per request
+
+    All entries are written in a single transaction with one multi-row
+    UPSERT per table. The response lists success/failure for every entry,
+    in the same order as the request.
+
+    Example request:
+    ```json
+    {
+        "library_id": "zNoMvrv8U",
+        "library_name": "Dochádzka",
+        "entries": [
+            {"id": "abc123", "status": "active", "fields": {"Dátum": "2026-03-18"}},
+            {"id": "def456", "status": "active", "fields": {"Dátum": "2026-03-19"}}
+        ]
+    }
+    ```
+    """
+    library_name = request.library_name
+    library_id = request.library_id
+    entries = request.entries
+
+    logger.info(f"Universal batch sync: library='{library_name}', entries={len(entries)}")
+
+    if len(entries) > Config.SYNC_BATCH_MAX_ENTRIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(entries)} entries "
+                   f"(max {Config.SYNC_BATCH_MAX_ENTRIES})"
+        )
+
+    # Map library name to table
+    table_name = get_table_name(library_name)
+
+    if not table_name:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Library '{library_name}' is not supported for sync. "
+                   f"Check library_table_mapper.py for supported libraries."
+        )
+
+    try:
+        sync_handler = MementoToPostgreSQLSync(db)
+
+        results = await sync_handler.sync_entries(
+            library_id=library_id,
+            library_name=library_name,
+            table_name=table_name,
+            entries=entries
+        )
+
+    except Exception as e:
+        logger.error(f"Universal batch sync failed for {library_name}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch sync failed: {str(e)}"
+        )
+
+    succeeded = sum(1 for r in results if r['success'])
+
+    return UniversalBatchSyncResponse(
+        success=succeeded == len(results),
+        library_name=library_name,
+        table_name=table_name,
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=[
+            BatchEntryResult(
+                entry_id=r.get('entry_id'),
+                success=r['success'],
+                error=r.get('error')
+            )
+            for r in results
+        ]
+    )
+
+
 # ============================================================================
 # ADD TO main.py:
 # ============================================================================